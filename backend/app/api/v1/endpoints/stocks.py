@@ -1,50 +1,345 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any, List
-from app.services.alpha_vantage_service import AlphaVantageService
+import asyncio
+import json
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Callable, List, Optional
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.responses import MEDIA_TYPES, SERIES_FORMATS, FastJSONResponse, encode_arrow, encode_msgpack, negotiate
+from app.services.alpha_vantage_service import AlphaVantageService, alpha_vantage_quota
+from app.services.backtester import BacktestConfig, Backtester
+from app.services.indicator_engine import IndicatorEngine, legacy_spec, parse_specs
+from app.services.news_index import NewsIngestor, company_names, from_ts, news_index, to_ts
 from app.services.news_service import NewsService
-from app.services.prediction_service import PredictionService
+from app.services.ohlcv_store import ohlcv_store
+from app.services.persistence_service import persistence_service
+from app.services.prediction_service import FORECAST_MODES, MODEL_VERSIONS, PredictionService
+from app.services.prewarm import Prewarmer, authorized, symbol_popularity
+from app.services.quote_stream import QuoteStreamHub
+from app.services.sentiment_engine import sentiment_engine
+from app.services.time_series import bar_columns, columns_to_json, indicator_payload, parse_series
+from app.services.training_pool import training_pool
 
-router = APIRouter()
+def _track_symbol(request: Request) -> None:
+    """Count requests per ``{symbol}`` so the pre-warmer knows which symbols are hot."""
+    symbol = request.path_params.get("symbol")
+    if symbol:
+        symbol_popularity.record(symbol)
+
+router = APIRouter(dependencies=[Depends(_track_symbol)])
 alpha_vantage_service = AlphaVantageService()
 news_service = NewsService()
 prediction_service = PredictionService()
+backtester = Backtester(training_pool, prediction_service.load_history)
+quote_stream = QuoteStreamHub(alpha_vantage_service.get_stock_quote, alpha_vantage_quota)
+prewarmer = Prewarmer(alpha_vantage_service, prediction_service, alpha_vantage_quota)
+news_ingestor = NewsIngestor(news_service, alpha_vantage_service, news_index, company_names)
+indicator_engine = IndicatorEngine(
+    alpha_vantage_service.get_daily_bars, alpha_vantage_service.get_technical_indicators
+)
+
+class TrainingRequest(BaseModel):
+    symbols: List[str]
+    mode: Optional[str] = None
+
+class QuotesRequest(BaseModel):
+    symbols: List[str]
+
+class NewsIngestRequest(BaseModel):
+    symbols: List[str]
+    days: int = 7
+
+class BatchPredictionRequest(BaseModel):
+    symbols: List[str]
+    days: int = Field(7, ge=1, le=30)
+    mode: Optional[str] = None
+
+class BacktestRequest(BaseModel):
+    symbols: List[str]
+    mode: Optional[str] = None
+    window: str = "expanding"
+    horizon: int = 5
+    train_size: int = 250
+    test_size: int = 20
+    max_folds: Optional[int] = 12
+
+SERIES_FORMAT = Query(
+    None, pattern=f"^({'|'.join(SERIES_FORMATS)})$",
+    description="json (raw payload), columnar, msgpack or arrow; defaults to the Accept header"
+)
+
+def _encode_series(
+    symbol: str,
+    format: str,
+    payload: Callable[[], Dict[str, Any]],
+    columns: Callable[[], Dict[str, Any]]
+) -> Response:
+    """Encode a series in the negotiated ``format``.
+
+    ``json`` is ``payload()``; the other formats hold ``columns()``, oldest first.
+    Responses are rendered directly, skipping ``jsonable_encoder``.
+    """
+    headers = {"Vary": "Accept"}
+    if format == "json":
+        return FastJSONResponse(payload(), headers=headers)
+    try:
+        if format == "arrow":
+            body = encode_arrow(columns(), {"symbol": symbol.upper()})
+        else:
+            content = {"symbol": symbol.upper(), **columns_to_json(columns())}
+            if format == "columnar":
+                return FastJSONResponse(content, headers=headers)
+            body = encode_msgpack(content)
+    except RuntimeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    return Response(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+def _series_response(
+    symbol: str,
+    data: Dict[str, Any],
+    format: str,
+    columns: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Response:
+    """An Alpha Vantage series payload as-is for ``json``, else as ``columns(data)``."""
+    if "Error Message" in data:
+        raise HTTPException(status_code=400, detail=data["Error Message"])
+    return _encode_series(symbol, format, lambda: data, lambda: columns(data))
+
+def _forecast_mode(mode: Optional[str]) -> str:
+    mode = mode or settings.FORECAST_MODE
+    if mode not in FORECAST_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(FORECAST_MODES)}")
+    return mode
+
+async def _get_quotes(symbols: List[str], session: Optional[AsyncSession]) -> Dict[str, Any]:
+    """Serve a watchlist: fresh stored quotes first, then one batched upstream fetch."""
+    # Upper-case and de-duplicate, keeping the caller's order
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbols) > settings.QUOTE_BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.QUOTE_BATCH_MAX_SYMBOLS} symbols per request"
+        )
+
+    for symbol in symbols:
+        symbol_popularity.record(symbol)
+
+    start = time.perf_counter()
+    quotes: Dict[str, Any] = {}
+    if session is not None:
+        quotes = await persistence_service.get_fresh_quotes(session, symbols)
+
+    data = await alpha_vantage_service.get_stock_quotes([s for s in symbols if s not in quotes])
+    for symbol, quote in data["quotes"].items():
+        persistence_service.record_quote(symbol, quote)
+    quotes.update(data["quotes"])
+
+    return {
+        "quotes": {symbol: quotes[symbol] for symbol in symbols if symbol in quotes},
+        "errors": data["errors"],
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss/eviction counters for the upstream response cache."""
+    return response_cache.stats()
+
+@router.get("/quota/stats")
+async def get_quota_stats() -> Dict[str, Any]:
+    """Get Alpha Vantage scheduler queue depth, wait times and remaining call budget."""
+    return alpha_vantage_quota.stats()
+
+@router.get("/store/stats")
+async def get_store_stats() -> Dict[str, Any]:
+    """Get file and bar counts for the local OHLCV store."""
+    return await asyncio.to_thread(ohlcv_store.stats)
+
+@router.get("/indicators/stats")
+async def get_indicator_stats() -> Dict[str, Any]:
+    """Get local vs upstream indicator counts and memo hit rates."""
+    return indicator_engine.stats()
+
+@router.post("/store/compact")
+async def compact_store() -> Dict[str, Any]:
+    """Rewrite local OHLCV files sorted and de-duplicated."""
+    return await asyncio.to_thread(ohlcv_store.compact)
+
+@router.get("/persistence/stats")
+async def get_persistence_stats() -> Dict[str, Any]:
+    """Get pending and written row counters for quote/prediction persistence."""
+    return persistence_service.stats()
 
 @router.get("/quote/{symbol}")
-async def get_stock_quote(symbol: str) -> Dict[str, Any]:
+async def get_stock_quote(
+    symbol: str,
+    session: Optional[AsyncSession] = Depends(get_session)
+) -> Dict[str, Any]:
     """Get real-time stock quote data."""
     try:
+        if session is not None:
+            stored = await persistence_service.get_fresh_quote(session, symbol)
+            if stored is not None:
+                return stored
+
         data = await alpha_vantage_service.get_stock_quote(symbol)
         if "Error Message" in data:
             raise HTTPException(status_code=400, detail=data["Error Message"])
+        persistence_service.record_quote(symbol, data)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/quotes")
+async def get_stock_quotes(
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    session: Optional[AsyncSession] = Depends(get_session)
+) -> Dict[str, Any]:
+    """Get quotes for many symbols; per-symbol failures are listed under ``errors``."""
+    return await _get_quotes(symbols.split(","), session)
+
+@router.post("/quotes")
+async def post_stock_quotes(
+    request: QuotesRequest,
+    session: Optional[AsyncSession] = Depends(get_session)
+) -> Dict[str, Any]:
+    """Get quotes for a watchlist posted as ``{"symbols": [...]}``."""
+    return await _get_quotes(request.symbols, session)
+
+@router.get("/stream/quotes")
+async def stream_quotes(
+    request: Request,
+    symbols: str = Query(..., description="Comma-separated symbols")
+) -> StreamingResponse:
+    """Live quotes as server-sent events, one ``quote`` event per changed symbol.
+
+    All clients share one upstream poller per symbol. A slow client only
+    receives the newest quote of each symbol it fell behind on.
+    """
+    symbol_list = [s for s in symbols.split(",") if s.strip()]
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbol_list) > settings.QUOTE_STREAM_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.QUOTE_STREAM_MAX_SYMBOLS} symbols per stream"
+        )
+    subscription = quote_stream.subscribe(symbol_list)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                batch = await subscription.get(timeout=settings.QUOTE_STREAM_KEEPALIVE)
+                if not batch:
+                    yield ": keepalive\n\n"
+                    continue
+                yield "".join(f"event: quote\ndata: {json.dumps(event)}\n\n" for event in batch)
+        finally:
+            quote_stream.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stream/stats")
+async def get_stream_stats() -> Dict[str, Any]:
+    """Get live quote stream pollers, subscriptions and delivery counters."""
+    return quote_stream.stats()
+
+@router.get("/prewarm/stats")
+async def get_prewarm_stats() -> Dict[str, Any]:
+    """Get the pre-warm schedule, next symbol set, call budget and last run."""
+    return prewarmer.stats()
+
+@router.post("/prewarm/run")
+async def run_prewarm(token: Optional[str] = Header(None, alias="X-Admin-Token")) -> Dict[str, Any]:
+    """Run one pre-warm pass now, outside the schedule (requires ``PREWARM_ADMIN_TOKEN``)."""
+    if not authorized(token):
+        raise HTTPException(status_code=403, detail="Pre-warm admin token required")
+    if prewarmer.busy:
+        raise HTTPException(status_code=409, detail="A pre-warm run is already in progress")
+    return await prewarmer.run_once()
+
 @router.get("/comprehensive/{symbol}")
-async def get_comprehensive_stock_data(symbol: str) -> Dict[str, Any]:
-    """Get comprehensive stock data including previous day OHLC and current day data."""
+async def get_comprehensive_stock_data(
+    symbol: str,
+    timeout: Optional[float] = Query(None, gt=0, description="Deadline per sub-fetch in seconds")
+) -> Dict[str, Any]:
+    """Get comprehensive stock data including previous day OHLC and current day data.
+
+    Each section reports its status and ``elapsed_ms`` under ``sections``; partial
+    results are returned when only some of the sub-fetches succeed.
+    """
     try:
-        data = await alpha_vantage_service.get_comprehensive_stock_data(symbol)
+        data = await alpha_vantage_service.get_comprehensive_stock_data(symbol, timeout)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
         return data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/predictions/{symbol}")
-async def get_stock_predictions(symbol: str, days: int = 7) -> Dict[str, Any]:
-    """Get future stock price predictions."""
+async def get_stock_predictions(
+    symbol: str,
+    days: int = Query(7, ge=1, le=30),
+    mode: Optional[str] = None,
+    session: Optional[AsyncSession] = Depends(get_session)
+) -> Dict[str, Any]:
+    """Get future stock price predictions (``mode``: recursive or direct)."""
     try:
-        if days > 30:
-            raise HTTPException(status_code=400, detail="Maximum prediction days is 30")
+        mode = _forecast_mode(mode)
         
-        data = await prediction_service.predict_future_prices(symbol, days)
+        if session is not None:
+            stored = await persistence_service.get_fresh_predictions(session, symbol, days, MODEL_VERSIONS[mode])
+            if stored is not None:
+                return stored
+
+        data = await prediction_service.predict_future_prices(symbol, days, mode)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
+        if data.get("status") == "training":
+            return JSONResponse(status_code=202, content=data)
+        if not data.get("demo_mode"):
+            persistence_service.record_predictions(symbol, data, data["model_version"])
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/predictions/batch")
+async def get_batch_predictions(request: BatchPredictionRequest) -> StreamingResponse:
+    """Predict many symbols, streamed as newline-delimited JSON, one line per symbol.
+
+    Lines arrive in completion order; symbols without a model yield a
+    ``"status": "training"`` line and failures an ``"error"`` line.
+    """
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(request.symbols) > settings.PREDICTION_BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.PREDICTION_BATCH_MAX_SYMBOLS} symbols per request"
+        )
+    mode = _forecast_mode(request.mode)
+
+    async def lines():
+        async for result in prediction_service.predict_batch(request.symbols, request.days, mode):
+            if "predictions" in result and not result.get("demo_mode"):
+                persistence_service.record_predictions(result["symbol"], result, result["model_version"])
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.get("/prediction-summary/{symbol}")
 async def get_prediction_summary(symbol: str) -> Dict[str, Any]:
     """Get a summary of stock predictions with key insights."""
@@ -52,10 +347,71 @@ async def get_prediction_summary(symbol: str) -> Dict[str, Any]:
         data = await prediction_service.get_prediction_summary(symbol)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
+        if data.get("status") == "training":
+            return JSONResponse(status_code=202, content=data)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/training", status_code=202)
+async def enqueue_training(request: TrainingRequest) -> Dict[str, Any]:
+    """Queue background model training for one or many symbols."""
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    return {"jobs": prediction_service.enqueue_training(request.symbols, _forecast_mode(request.mode))}
+
+@router.get("/training/stats")
+async def get_training_stats() -> Dict[str, Any]:
+    """Get training queue, process pool and model registry counters."""
+    return {
+        "queue": prediction_service.training_jobs.stats(),
+        "pool": training_pool.stats(),
+        "registry": prediction_service.registry.stats()
+    }
+
+@router.get("/training/jobs/{job_id}")
+async def get_training_job(job_id: str) -> Dict[str, Any]:
+    """Get the status of a training job."""
+    job = prediction_service.training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
+
+@router.get("/training/{symbol}/metrics")
+async def get_training_metrics(symbol: str, mode: Optional[str] = None) -> Dict[str, Any]:
+    """Get train/test scores of the current model for a stock."""
+    data = await prediction_service.get_training_metrics(symbol, _forecast_mode(mode))
+    if "error" in data:
+        raise HTTPException(status_code=404, detail=data["error"])
+    return data
+
+@router.post("/backtest")
+async def run_backtest(request: BacktestRequest) -> Dict[str, Any]:
+    """Walk-forward backtest: per-horizon MAE, MAPE and directional accuracy.
+
+    Folds run in the training process pool; use the backtester CLI for large
+    symbol lists.
+    """
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(request.symbols) > settings.BACKTEST_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.BACKTEST_MAX_SYMBOLS} symbols per request"
+        )
+    config = BacktestConfig(
+        mode=_forecast_mode(request.mode),
+        window=request.window,
+        horizon=request.horizon,
+        train_size=request.train_size,
+        test_size=request.test_size,
+        max_folds=request.max_folds
+    )
+    data = await backtester.run(request.symbols, config)
+    if "error" in data:
+        raise HTTPException(status_code=400, detail=data["error"])
+    return data
+
 @router.get("/overview/{symbol}")
 async def get_company_overview(symbol: str) -> Dict[str, Any]:
     """Get company overview and fundamental data."""
@@ -72,16 +428,44 @@ async def get_technical_indicators(
     symbol: str,
     indicator: str = "SMA",
     interval: str = "daily",
-    time_period: int = 20
-) -> Dict[str, Any]:
-    """Get technical indicators for a stock."""
+    time_period: int = Query(20, ge=1),
+    indicators: Optional[str] = Query(
+        None, description="Several at once, e.g. SMA:20,EMA:50,RSI:14,MACD:12:26:9 (overrides indicator)"
+    ),
+    format: Optional[str] = SERIES_FORMAT,
+    limit: Optional[int] = Query(None, ge=1, description="Latest N values"),
+    accept: Optional[str] = Header(None)
+) -> Response:
+    """Get technical indicators for a stock.
+
+    Common indicators on daily, weekly and monthly bars are computed from the
+    stored price history; others fall back to Alpha Vantage. With ``indicators``
+    the output fields carry their parameters (``SMA_20``, ``MACD_Signal_12_26_9``).
+    """
     try:
-        data = await alpha_vantage_service.get_technical_indicators(
-            symbol, indicator, interval, time_period
+        specs = parse_specs(indicators) if indicators else [legacy_spec(indicator, time_period)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = await indicator_engine.compute(
+            symbol, specs, interval, suffix=indicators is not None, limit=limit
         )
-        if "Error Message" in data:
-            raise HTTPException(status_code=400, detail=data["Error Message"])
-        return data
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        name = ",".join(spec.label for spec in specs) if indicators else specs[0].name
+        meta = {
+            "1: Symbol": symbol.upper(),
+            "2: Indicator": name,
+            "3: Interval": interval,
+            "4: Sources": result["sources"]
+        }
+        return _encode_series(
+            symbol, negotiate(format, accept),
+            lambda: indicator_payload(result["columns"], meta, name),
+            lambda: result["columns"]
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -89,14 +473,41 @@ async def get_technical_indicators(
 async def get_historical_data(
     symbol: str,
     interval: str = "daily",
-    output_size: str = "compact"
-) -> Dict[str, Any]:
-    """Get historical price data."""
+    output_size: str = "compact",
+    format: Optional[str] = SERIES_FORMAT,
+    limit: Optional[int] = Query(None, ge=1, description="Latest N bars (non-json formats)"),
+    accept: Optional[str] = Header(None)
+) -> Response:
+    """Get historical price data (``format=columnar|msgpack|arrow`` for OHLCV columns)."""
     try:
         data = await alpha_vantage_service.get_historical_data(symbol, interval, output_size)
-        if "Error Message" in data:
-            raise HTTPException(status_code=400, detail=data["Error Message"])
-        return data
+        return _series_response(
+            symbol, data, negotiate(format, accept),
+            lambda payload: bar_columns(parse_series(payload, limit=limit))
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/intraday/{symbol}")
+async def get_intraday_data(
+    symbol: str,
+    interval: str = "1min",
+    output_size: str = "compact",
+    format: Optional[str] = SERIES_FORMAT,
+    limit: Optional[int] = Query(None, ge=1, description="Latest N bars (non-json formats)"),
+    accept: Optional[str] = Header(None)
+) -> Response:
+    """Get intraday price data (``format=columnar|msgpack|arrow`` for OHLCV columns)."""
+    try:
+        data = await alpha_vantage_service.get_intraday_data(symbol, interval, output_size)
+        return _series_response(
+            symbol, data, negotiate(format, accept),
+            lambda payload: bar_columns(parse_series(payload, limit=limit))
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -111,22 +522,62 @@ async def search_stocks(keywords: str) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/news/index/stats")
+async def get_news_index_stats() -> Dict[str, Any]:
+    """Get article index size, NewsAPI call counts and sentiment memo stats."""
+    return {**news_ingestor.stats(), "sentiment": sentiment_engine.stats()}
+
+@router.post("/news/ingest")
+async def ingest_news(request: NewsIngestRequest) -> Dict[str, Any]:
+    """Bring the article index up to date for several symbols at once."""
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(request.symbols) > settings.NEWS_INGEST_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.NEWS_INGEST_MAX_SYMBOLS} symbols per request"
+        )
+    days = min(max(request.days, 1), settings.NEWS_RETENTION_DAYS)
+    return {"results": await news_ingestor.ingest_many(request.symbols, days)}
+
 @router.get("/news/{symbol}")
-async def get_stock_news(symbol: str, days: int = 7) -> Dict[str, Any]:
-    """Get news and sentiment analysis for a stock."""
+async def get_stock_news(
+    symbol: str,
+    days: int = Query(7, ge=1),
+    since: Optional[datetime] = Query(None, description="Window start (UTC unless an offset is given); overrides days"),
+    until: Optional[datetime] = Query(None, description="Window end, defaults to now"),
+    limit: Optional[int] = Query(None, ge=1, description="Newest N articles in the window")
+) -> Dict[str, Any]:
+    """Get news and sentiment analysis for a stock.
+
+    Articles are served from the local index, which is first brought up to
+    date: only articles newer than the newest indexed one (and any part of the
+    window never fetched before) are requested from NewsAPI.
+    """
     try:
-        # Get company overview to get company name
-        overview = await alpha_vantage_service.get_company_overview(symbol)
-        company_name = overview.get("Name", symbol)
-        
-        # Get news articles
-        news_data = await news_service.get_company_news(company_name, days)
-        
-        # Analyze sentiment
-        if "articles" in news_data:
-            sentiment_analysis = await news_service.analyze_sentiment(news_data["articles"])
-            news_data["sentiment_analysis"] = sentiment_analysis
-            
-        return news_data
+        now = time.time()
+        start = to_ts(since) if since else now - days * 86400
+        start = max(start, now - settings.NEWS_RETENTION_DAYS * 86400)
+        end = to_ts(until) if until else None
+        if end is not None and end < start:
+            raise HTTPException(status_code=400, detail="until must be after since")
+
+        ingest = await news_ingestor.ingest(symbol, start)
+        articles = await asyncio.to_thread(news_index.query, symbol, start, end, limit)
+        if "error" in ingest and not articles:
+            raise HTTPException(status_code=400, detail=ingest["error"])
+
+        return {
+            "status": "ok",
+            "symbol": symbol.upper(),
+            "company_name": await news_ingestor.company_name(symbol),
+            "window": {"since": from_ts(start).isoformat(), "until": from_ts(end or now).isoformat()},
+            "ingest": ingest,
+            "totalResults": len(articles),
+            "articles": articles,
+            "sentiment_analysis": await news_service.analyze_sentiment(articles)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
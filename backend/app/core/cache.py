@@ -0,0 +1,179 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from app.core.config import settings
+
+class LRUCache:
+    """In-process LRU cache with per-entry TTL and a bound on the number of entries."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class InMemoryBackend:
+    """Shared-cache stand-in with the same async get/set surface as RedisBackend."""
+
+    def __init__(self):
+        self._store: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._store[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._store[key] = (time.monotonic() + ttl, value)
+
+    async def close(self) -> None:
+        self._store.clear()
+
+class RedisBackend:
+    """Shared cache backed by any Redis-compatible server (requires the ``redis`` package)."""
+
+    def __init__(self, url: str, prefix: str = "stock-analytics:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_REDIS_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def close(self) -> None:
+        await self._client.close()
+
+class ResponseCache:
+    """Two-tier cache: an in-process LRU in front of an optional shared backend.
+
+    Values must be JSON-serializable so they can be stored in the shared tier.
+    Shared-tier failures are counted and treated as misses rather than raised.
+    """
+
+    def __init__(self, local: LRUCache, shared=None):
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            raw = await self.shared.get(key)
+        except Exception:
+            self.shared_errors += 1
+            return None
+
+        if raw is None:
+            self.shared_misses += 1
+            return None
+
+        self.shared_hits += 1
+        # The shared tier does not expose the remaining TTL, so keep the local copy briefly
+        value = json.loads(raw)
+        self.local.set(key, value, ttl=5)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.local.set(key, value, ttl)
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(key, json.dumps(value), ttl)
+        except Exception:
+            self.shared_errors += 1
+
+    async def close(self) -> None:
+        if self.shared is not None:
+            await self.shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        local = self.local.stats()
+        lookups = local["hits"] + local["misses"]
+        hits = local["hits"] + self.shared_hits
+        return {
+            "local": local,
+            "shared": None if self.shared is None else {
+                "backend": type(self.shared).__name__,
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "errors": self.shared_errors
+            },
+            "hit_ratio": round(hits / lookups, 4) if lookups else None
+        }
+
+def make_cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Build a stable cache key from request parameters, ignoring credentials."""
+    parts = [
+        f"{key}={value}"
+        for key, value in sorted(params.items())
+        if key.lower() not in ("apikey", "api_key") and value is not None
+    ]
+    return f"{namespace}:" + "&".join(parts)
+
+response_cache = ResponseCache(
+    LRUCache(settings.CACHE_MAX_ENTRIES),
+    RedisBackend(settings.CACHE_REDIS_URL) if settings.CACHE_REDIS_URL else None
+)
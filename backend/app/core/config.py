@@ -16,6 +16,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "stock_analytics")
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Async SQLAlchemy URL overriding the Postgres settings (e.g. sqlite+aiosqlite:///./stock.db)
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+    # Quote/prediction persistence (write-behind batches) and freshness windows for reads
+    PERSISTENCE_ENABLED: bool = os.getenv("PERSISTENCE_ENABLED", "false").lower() == "true"
+    PERSIST_FLUSH_INTERVAL: float = float(os.getenv("PERSIST_FLUSH_INTERVAL", "2"))
+    PERSIST_BATCH_SIZE: int = int(os.getenv("PERSIST_BATCH_SIZE", "500"))
+    QUOTE_DB_MAX_AGE: float = float(os.getenv("QUOTE_DB_MAX_AGE", "15"))
+    PREDICTION_DB_MAX_AGE: float = float(os.getenv("PREDICTION_DB_MAX_AGE", str(6 * 60 * 60)))
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -25,6 +36,100 @@ class Settings(BaseSettings):
     # External APIs
     ALPHA_VANTAGE_API_KEY: str = os.getenv("ALPHA_VANTAGE_API_KEY", "")
     NEWS_API_KEY: str = os.getenv("NEWS_API_KEY", "")
+
+    # Upstream HTTP client
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "10"))
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+    HTTP_RETRY_BACKOFF: float = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+
+    # Alpha Vantage call budget (free tier defaults) and throttle handling
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+    ALPHA_VANTAGE_CALLS_PER_DAY: int = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "500"))
+    ALPHA_VANTAGE_QUEUE_TIMEOUT: float = float(os.getenv("ALPHA_VANTAGE_QUEUE_TIMEOUT", "30"))
+    ALPHA_VANTAGE_THROTTLE_BACKOFF: float = float(os.getenv("ALPHA_VANTAGE_THROTTLE_BACKOFF", "60"))
+
+    # Batch quotes: REALTIME_BULK_QUOTES needs a premium key, otherwise per-symbol calls are used
+    ALPHA_VANTAGE_BULK_QUOTES: bool = os.getenv("ALPHA_VANTAGE_BULK_QUOTES", "false").lower() == "true"
+    QUOTE_BATCH_SIZE: int = int(os.getenv("QUOTE_BATCH_SIZE", "100"))
+    QUOTE_BATCH_CONCURRENCY: int = int(os.getenv("QUOTE_BATCH_CONCURRENCY", "10"))
+    QUOTE_BATCH_MAX_SYMBOLS: int = int(os.getenv("QUOTE_BATCH_MAX_SYMBOLS", "200"))
+
+    # Live quote stream: pollers share at most QUOTE_STREAM_QUOTA_SHARE of the call budget
+    QUOTE_STREAM_MIN_INTERVAL: float = float(os.getenv("QUOTE_STREAM_MIN_INTERVAL", "15"))
+    QUOTE_STREAM_QUOTA_SHARE: float = float(os.getenv("QUOTE_STREAM_QUOTA_SHARE", "0.5"))
+    QUOTE_STREAM_MAX_SYMBOLS: int = int(os.getenv("QUOTE_STREAM_MAX_SYMBOLS", "50"))
+    QUOTE_STREAM_KEEPALIVE: float = float(os.getenv("QUOTE_STREAM_KEEPALIVE", "15"))
+
+    # Pre-warm of hot symbols: PREWARM_SYMBOLS are always included, then the PREWARM_TOP_N most
+    # requested; runs every PREWARM_INTERVAL seconds inside PREWARM_WINDOW (New York time, weekdays)
+    PREWARM_ENABLED: bool = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+    PREWARM_SYMBOLS: str = os.getenv("PREWARM_SYMBOLS", "")
+    PREWARM_TOP_N: int = int(os.getenv("PREWARM_TOP_N", "20"))
+    PREWARM_INTERVAL: float = float(os.getenv("PREWARM_INTERVAL", "600"))
+    PREWARM_WINDOW: str = os.getenv("PREWARM_WINDOW", "08:00-16:30")
+    PREWARM_QUOTA_SHARE: float = float(os.getenv("PREWARM_QUOTA_SHARE", "0.2"))
+    # Request counts kept for at most this many symbols; the least requested are dropped first
+    PREWARM_MAX_TRACKED: int = int(os.getenv("PREWARM_MAX_TRACKED", "1000"))
+    # Required in X-Admin-Token to trigger a run by hand; manual runs are refused while unset
+    PREWARM_ADMIN_TOKEN: str = os.getenv("PREWARM_ADMIN_TOKEN", "")
+
+    # Upstream response cache (CACHE_REDIS_URL enables the shared tier)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "")
+
+    # Local OHLCV bar store (layout documented in app/services/ohlcv_store.py)
+    OHLCV_STORE_DIR: str = os.getenv("OHLCV_STORE_DIR", "data/ohlcv")
+
+    # Prediction models
+    MODEL_DIR: str = os.getenv("MODEL_DIR", "data/models")
+    MODEL_CACHE_BYTES: int = int(os.getenv("MODEL_CACHE_BYTES", str(256 * 1024 * 1024)))
+    MODEL_HISTORY_DAYS: int = int(os.getenv("MODEL_HISTORY_DAYS", "365"))
+    TRAINING_MAX_WORKERS: int = int(os.getenv("TRAINING_MAX_WORKERS", "2"))
+    TRAINING_QUEUE_WORKERS: int = int(os.getenv("TRAINING_QUEUE_WORKERS", "2"))
+    # "recursive" (next-day model rolled forward) or "direct" (one multi-horizon model)
+    FORECAST_MODE: str = os.getenv("FORECAST_MODE", "recursive")
+    PREDICTION_BATCH_MAX_SYMBOLS: int = int(os.getenv("PREDICTION_BATCH_MAX_SYMBOLS", "100"))
+    # Walk-forward backtests (the CLI takes any number of symbols)
+    BACKTEST_HISTORY_DAYS: int = int(os.getenv("BACKTEST_HISTORY_DAYS", "1825"))
+    BACKTEST_MAX_SYMBOLS: int = int(os.getenv("BACKTEST_MAX_SYMBOLS", "10"))
+
+    # Local news article index (layout documented in app/services/news_index.py)
+    NEWS_INDEX_DIR: str = os.getenv("NEWS_INDEX_DIR", "data/news")
+    NEWS_REFRESH_INTERVAL: float = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))
+    NEWS_RETENTION_DAYS: int = int(os.getenv("NEWS_RETENTION_DAYS", "30"))
+    NEWS_PAGE_SIZE: int = int(os.getenv("NEWS_PAGE_SIZE", "100"))
+    NEWS_MAX_PAGES: int = int(os.getenv("NEWS_MAX_PAGES", "3"))
+    NEWS_INGEST_CONCURRENCY: int = int(os.getenv("NEWS_INGEST_CONCURRENCY", "4"))
+    NEWS_INGEST_MAX_SYMBOLS: int = int(os.getenv("NEWS_INGEST_MAX_SYMBOLS", "50"))
+    # Memoized per-article sentiment scores (app/services/sentiment_engine.py)
+    SENTIMENT_CACHE_ENTRIES: int = int(os.getenv("SENTIMENT_CACHE_ENTRIES", "50000"))
+
+    # /technical indicators computed from stored daily bars (app/services/indicator_engine.py)
+    INDICATOR_MAX_PER_REQUEST: int = int(os.getenv("INDICATOR_MAX_PER_REQUEST", "20"))
+    INDICATOR_CACHE_ENTRIES: int = int(os.getenv("INDICATOR_CACHE_ENTRIES", "1024"))
+
+    # Prometheus /metrics and hot-path timers
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Request profiling: requests carrying PROFILING_ADMIN_TOKEN (X-Profile header or ?profile=)
+    # are profiled, plus 1 in PROFILING_SAMPLE_RATE requests when it is above 0
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_ADMIN_TOKEN: str = os.getenv("PROFILING_ADMIN_TOKEN", "")
+    PROFILING_SAMPLE_RATE: int = int(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "50"))
+    PROFILING_INTERVAL: float = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+
+    # JSON is rendered with orjson when installed; complete responses of at least
+    # RESPONSE_COMPRESSION_MIN_SIZE bytes are brotli/gzip compressed (0 disables)
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+
+    # Per sub-call deadline (seconds) for /comprehensive fan-out
+    COMPREHENSIVE_SUBCALL_TIMEOUT: float = float(os.getenv("COMPREHENSIVE_SUBCALL_TIMEOUT", "8"))
     
     class Config:
         case_sensitive = True
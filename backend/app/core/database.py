@@ -0,0 +1,55 @@
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.models.base import Base
+
+def async_database_url() -> str:
+    """DATABASE_URL if set, else the Postgres URI from settings with the asyncpg driver."""
+    if settings.DATABASE_URL:
+        return settings.DATABASE_URL
+    return settings.SQLALCHEMY_DATABASE_URI.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+class Database:
+    """Async engine and session factory, created by the app lifespan when persistence is on."""
+
+    def __init__(self):
+        self.engine: Optional[AsyncEngine] = None
+        self.sessionmaker: Optional[async_sessionmaker] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    async def connect(self, url: Optional[str] = None, create_tables: bool = True) -> None:
+        url = url or async_database_url()
+        options = {}
+        if not url.startswith("sqlite"):
+            options = {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_pre_ping": True
+            }
+        self.engine = create_async_engine(url, **options)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        if create_tables:
+            # Register every model on the shared metadata before create_all
+            from app.models import stock, user  # noqa: F401
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+    async def disconnect(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+        self.engine = None
+        self.sessionmaker = None
+
+database = Database()
+
+async def get_session() -> AsyncIterator[Optional[AsyncSession]]:
+    """FastAPI dependency: a pooled session, or None when persistence is disabled."""
+    if not database.enabled:
+        yield None
+        return
+    async with database.sessionmaker() as session:
+        yield session
@@ -0,0 +1,82 @@
+import asyncio
+import aiohttp
+from typing import Dict, Any, Optional
+from app.core.config import settings
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class HTTPClient:
+    """Shared pooled aiohttp session used by every upstream service.
+
+    The session is opened and closed by the FastAPI lifespan in ``app.main``.
+    Calls made outside the lifespan (scripts, benchmarks) open it lazily.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        max_connections_per_host: int = settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        timeout: float = settings.HTTP_TIMEOUT,
+        max_retries: int = settings.HTTP_MAX_RETRIES,
+        retry_backoff: float = settings.HTTP_RETRY_BACKOFF
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        """Open the pooled session (no-op if it is already open)."""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def close(self) -> None:
+        """Close the session and release pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET ``url`` and decode the JSON body, retrying transient failures with backoff."""
+        await self.start()
+        if params:
+            # Match requests' behaviour of dropping unset parameters (e.g. a missing API key)
+            params = {key: value for key, value in params.items() if value is not None}
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session.get(url, params=params) as response:
+                    if response.status in RETRYABLE_STATUS and attempt < self.max_retries:
+                        last_error = aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                            message=response.reason or ""
+                        )
+                    else:
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                last_error = e
+                if attempt >= self.max_retries:
+                    raise
+
+            # Exponential backoff: backoff, 2*backoff, 4*backoff, ...
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        raise last_error
+
+http_client = HTTPClient()
@@ -0,0 +1,267 @@
+import asyncio
+import bisect
+import functools
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+# Seconds; covers cache hits through slow upstream calls and model fits
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format (version 0.0.4)."""
+
+    def __init__(self):
+        self._metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: MetricsRegistry = registry):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class _ValueMetric(Metric):
+    """One value per label set, updated in place or read from ``fn`` at scrape time.
+
+    ``fn`` returns ``{label values tuple: value}``; it lets stats that services
+    already keep be exported without touching their hot paths.
+    """
+
+    def __init__(self, *args: Any, fn: Optional[Callable[[], Dict[Tuple[Any, ...], float]]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[Any, ...], float] = {}
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        values = self._values
+        if self.fn is not None:
+            try:
+                values = self.fn()
+            except Exception as e:
+                print(f"Metric {self.name} callback failed: {e}")
+                values = {}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items() if value is not None
+        ]
+
+class Counter(_ValueMetric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_ValueMetric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[Tuple[Any, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+_DISABLED = nullcontext()
+
+def timed(histogram: Histogram, **labels: Any):
+    """Context manager observing the enclosed block's duration; a shared no-op when metrics are off."""
+    if not settings.METRICS_ENABLED:
+        return _DISABLED
+    return _Timer(histogram, labels)
+
+def instrument(histogram: Histogram, **labels: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of ``timed`` for sync and async functions.
+
+    Decided at import time: with metrics off the function is returned unwrapped.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not settings.METRICS_ENABLED:
+            return fn
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with _Timer(histogram, labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _Timer(histogram, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Shared metrics; services import these and time their hot paths with ``timed``/``instrument``
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ("method", "route", "status")
+)
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total", "Upstream API calls by service, endpoint and outcome",
+    ("service", "endpoint", "outcome")
+)
+BULK_QUOTE_FALLBACKS = Counter(
+    "bulk_quote_fallbacks_total", "Watchlist quote chunks the bulk call could not serve, by reason",
+    ("reason",)
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds", "Upstream API call latency (network only, after quota wait)",
+    ("service", "endpoint")
+)
+MODEL_TRAIN_SECONDS = Histogram(
+    "model_train_duration_seconds", "Model fit time in the training pool", ("mode",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+MODEL_INFERENCE_SECONDS = Histogram("model_inference_duration_seconds", "Forecast time per symbol", ("mode",))
+FEATURE_BUILD_SECONDS = Histogram(
+    "feature_build_duration_seconds", "History load and indicator build time", ("kind",)
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "Delay of a periodic event loop wakeup past its deadline",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency labelled by route template, not raw path."""
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._routes: Optional[Dict[Any, str]] = None
+
+    def _route_path(self, scope: Dict[str, Any]) -> str:
+        if self._routes is None:
+            self._routes = {
+                getattr(route, "endpoint", None): route.path
+                for route in scope["app"].routes if hasattr(route, "path")
+            }
+        # Unmatched paths share one label so scanners cannot blow up the series count
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=self._route_path(scope),
+                status=status["code"]
+            )
+
+class EventLoopLagMonitor:
+    """Sleep ``interval`` seconds in a loop and record how late each wakeup is."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - deadline))
+
+event_loop_monitor = EventLoopLagMonitor()
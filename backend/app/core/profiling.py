@@ -0,0 +1,213 @@
+import hmac
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from urllib.parse import parse_qs
+from app.core.config import settings
+
+# (function, file, first line) of one frame
+FrameKey = Tuple[str, str, int]
+# Files whose frames at the top of a worker thread mean the thread is parked, not working
+IDLE_FILES = ("threading.py", "queue.py")
+
+class StackSampler:
+    """Sample the Python stacks of every thread at a fixed interval.
+
+    Work that a request hands to ``asyncio.to_thread`` (downloads, indicator
+    builds, model calls) runs outside the event loop thread, so a tracer on
+    that thread alone would miss it; sampling all threads does not. Idle pool
+    workers are skipped. Other requests running at the same time show up too.
+    """
+
+    def __init__(self, interval: float = settings.PROFILING_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident != main and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                self.samples[(names.get(ident, str(ident)), tuple(reversed(stack)))] += 1
+
+class Profile:
+    """One profiled request: its sampled stacks plus request metadata."""
+
+    def __init__(self, method: str, path: str, trigger: str, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger  # "request" (explicit) or "sampled"
+        self.interval = interval
+        self.started_at = datetime.utcnow()
+        self.status: Optional[int] = None
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration": round(self.duration, 4),
+            "samples": sum(self.samples.values())
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (``flamegraph.pl``, speedscope, inferno)."""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = [thread] + [f"{name} ({os.path.basename(file)}:{line})" for name, file, line in stack]
+            lines.append(f"{';'.join(frame.replace(';', ':') for frame in frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope.app file format, one sampled profile per thread."""
+        frame_index: Dict[FrameKey, int] = {}
+        frames: List[Dict[str, Any]] = []
+        by_thread: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        for (thread, stack), count in self.samples.items():
+            indices = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indices.append(frame_index[key])
+            samples, weights = by_thread.setdefault(thread, ([], []))
+            samples.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "stock-analytics",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights
+                }
+                for thread, (samples, weights) in by_thread.items()
+            ]
+        }
+
+class ProfileStore:
+    """Ring buffer of the latest ``size`` profiles."""
+
+    def __init__(self, size: int = settings.PROFILING_BUFFER_SIZE):
+        self._profiles: "deque[Profile]" = deque(maxlen=size)
+
+    def add(self, profile: Profile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self._profiles)]
+
+profile_store = ProfileStore()
+
+def authorized(token: Optional[str]) -> bool:
+    """True if ``token`` matches ``PROFILING_ADMIN_TOKEN``; never true while no token is configured."""
+    expected = settings.PROFILING_ADMIN_TOKEN
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling selected requests into ``profile_store``.
+
+    With ``PROFILING_ENABLED``, a request is profiled when it carries the admin
+    token in an ``X-Profile`` header or ``profile`` query parameter, or when it
+    is the ``PROFILING_SAMPLE_RATE``-th request since the last sampled one.
+    Profiled responses carry an ``X-Profile-Id`` header.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._requests = itertools.count(1)
+        self._sampling = threading.Lock()
+
+    def _trigger(self, scope: Dict[str, Any]) -> Optional[str]:
+        token = dict(scope["headers"]).get(b"x-profile")
+        if token is None:
+            token = next(iter(parse_qs(scope.get("query_string", b"").decode()).get("profile", [])), None)
+        else:
+            token = token.decode()
+        if token is not None and authorized(token):
+            return "request"
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate > 0 and next(self._requests) % rate == 0:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        # Background sampling never overlaps itself, so it stays cheap under load
+        if trigger is None or (trigger == "sampled" and not self._sampling.acquire(blocking=False)):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], trigger, settings.PROFILING_INTERVAL)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode())
+                ]}
+            await send(message)
+
+        sampler = StackSampler(profile.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.samples = sampler.stop()
+            profile.duration = time.perf_counter() - start
+            profile_store.add(profile)
+            if trigger == "sampled":
+                self._sampling.release()
+
+def render(profile: Profile, fmt: str) -> Tuple[str, str]:
+    """``(body, media type)`` of ``profile`` as ``speedscope`` JSON or ``collapsed`` stacks."""
+    if fmt == "collapsed":
+        return profile.collapsed(), "text/plain"
+    return json.dumps(profile.speedscope()), "application/json"
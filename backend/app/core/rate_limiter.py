@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Priority classes, lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BULK: "bulk",
+}
+
+# Priority used by upstream calls made in the current task; background jobs override it
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+@contextmanager
+def upstream_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed upstream calls under ``priority``.
+
+    A call shared through ``SingleFlight`` runs in the task its first caller
+    started, so it keeps that caller's priority for everyone awaiting it.
+    """
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+class QuotaScheduler:
+    """Token-bucket scheduler for a quota-limited upstream API.
+
+    A per-minute bucket refills continuously and a per-day budget resets every
+    24 hours. Callers wait in a priority queue, so interactive requests are
+    granted tokens before background refreshes and bulk backfills. When the
+    upstream reports throttling, ``backoff`` pauses all grants for a while.
+    """
+
+    def __init__(self, per_minute: int, per_day: int):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self._tokens = float(per_minute)
+        self._refilled_at = time.monotonic()
+        self._day_started_at = time.monotonic()
+        self._day_used = 0
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.granted: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        self.total_wait: Dict[int, float] = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self.max_wait: Dict[int, float] = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            float(self.per_minute),
+            self._tokens + (now - self._refilled_at) * self.per_minute / 60.0
+        )
+        self._refilled_at = now
+        if now - self._day_started_at >= 86400:
+            self._day_started_at = now
+            self._day_used = 0
+
+    def _next_grant_delay(self, now: float) -> float:
+        """Seconds until a token can be granted (0 if one is available now)."""
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self._day_used >= self.per_day:
+            return self._day_started_at + 86400 - now
+        if self._tokens < 1:
+            return (1 - self._tokens) * 60.0 / self.per_minute
+        return 0.0
+
+    def _dispatch(self) -> None:
+        """Grant tokens to queued waiters in priority order, then schedule the next wakeup."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)  # cancelled while queued
+                continue
+            delay = self._next_grant_delay(now)
+            if delay > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            _, _, future = heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._day_used += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: Optional[int] = None) -> float:
+        """Wait for an upstream call slot and return how long the caller waited."""
+        if priority is None:
+            priority = request_priority.get()
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted after all, but cancelled before resuming: hand the unused token back
+                self._tokens = min(float(self.per_minute), self._tokens + 1)
+                self._day_used = max(0, self._day_used - 1)
+            # Waking the queue keeps it moving
+            self._dispatch()
+            raise
+
+        waited = time.monotonic() - start
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        self.total_wait[priority] = self.total_wait.get(priority, 0.0) + waited
+        self.max_wait[priority] = max(self.max_wait.get(priority, 0.0), waited)
+        return waited
+
+    def backoff(self, seconds: float) -> None:
+        """Pause all grants for ``seconds`` after the upstream signalled throttling."""
+        self.throttled += 1
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._refill(now)
+        queued: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+
+        return {
+            "queue_depth": sum(queued.values()),
+            "queued": queued,
+            "remaining_minute": int(self._tokens),
+            "remaining_day": max(0, self.per_day - self._day_used),
+            "paused_for": round(max(0.0, self._paused_until - now), 2),
+            "throttled": self.throttled,
+            "wait_times": {
+                PRIORITY_NAMES.get(priority, str(priority)): {
+                    "granted": count,
+                    "avg_wait": round(self.total_wait[priority] / count, 4) if count else 0.0,
+                    "max_wait": round(self.max_wait[priority], 4)
+                }
+                for priority, count in self.granted.items()
+            }
+        }
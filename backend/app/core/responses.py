@@ -0,0 +1,160 @@
+import asyncio
+import gzip
+import json
+from typing import Dict, Any, Callable, Optional, Set
+import numpy as np
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.config import settings
+
+# Optional fast paths; without them JSON uses the stdlib encoder and compression is gzip only
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Series formats: the raw upstream payload, or column-oriented JSON, MessagePack or Arrow IPC
+SERIES_FORMATS = ("json", "columnar", "msgpack", "arrow")
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+ACCEPT_FORMATS = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow"
+}
+BROTLI_QUALITY = 4
+# Bodies at least this large are compressed in a worker thread instead of on the event loop
+THREAD_COMPRESS_SIZE = 256 * 1024
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes via orjson when installed; NumPy arrays and scalars are accepted."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class: ``JSONResponse`` rendered with ``dumps``."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def negotiate(format: Optional[str], accept: Optional[str]) -> str:
+    """An explicit ``format`` wins, then the first binary media type listed in ``Accept``, else ``json``."""
+    if format:
+        return format
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media_type]
+    return "json"
+
+def encode_msgpack(content: Any) -> bytes:
+    try:
+        import msgpack
+    except ImportError as e:
+        raise RuntimeError("format=msgpack requires the 'msgpack' package") from e
+    return msgpack.packb(content, default=_default)
+
+def encode_arrow(columns: Dict[str, np.ndarray], metadata: Dict[str, str]) -> bytes:
+    """One Arrow IPC stream: ``ts`` as a ``timestamp[ns]`` column plus the value columns."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("format=arrow requires the 'pyarrow' package") from e
+    table = pa.table({
+        ("timestamp" if name == "ts" else name): (
+            pa.array(values, type=pa.timestamp("ns")) if name == "ts" else pa.array(values)
+        )
+        for name, values in columns.items()
+    }).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def accepted_encodings(header: str) -> Set[str]:
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(name.strip().lower())
+    return encodings
+
+def compress(body: bytes, encoding: str, gzip_level: int = settings.RESPONSE_GZIP_LEVEL) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses of at least ``minimum_size`` bytes.
+
+    Brotli is used when the client accepts it and the ``brotli`` package is
+    installed, gzip otherwise. Streaming responses (SSE, NDJSON batches) and
+    bodies that already have a ``Content-Encoding`` pass through untouched, so
+    events are never held back in a compressor buffer. Server-sent event
+    headers are sent before the first event.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = settings.RESPONSE_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def _encoding(self, scope: Dict[str, Any]) -> Optional[str]:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        return "gzip" if "gzip" in accepted else None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        encoding = self._encoding(scope) if scope["type"] == "http" and self.minimum_size > 0 else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Dict[str, Any] = {}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                # Event streams start right away; everything else waits to see if the body is complete
+                if not headers.get("content-type", "").startswith("text/event-stream"):
+                    start["message"] = message
+                    return
+            if message["type"] == "http.response.body" and "message" in start:
+                start_message = start.pop("message")
+                headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+                body = message.get("body", b"")
+                if (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                ):
+                    if len(body) >= THREAD_COMPRESS_SIZE:
+                        body = await asyncio.to_thread(compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+                await send({**start_message, "headers": headers.raw})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
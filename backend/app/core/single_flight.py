@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight upstream call.
+
+    The first caller for a key starts the work as a task; callers arriving while it
+    is pending await the same task. Each awaiter is shielded, so cancelling one
+    caller never cancels the shared work or the other awaiters. The task copies the
+    first caller's context, so it also runs at that caller's upstream priority.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every awaiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
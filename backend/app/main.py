@@ -1,15 +1,86 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 from app.api.v1.endpoints import stocks
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import database
+from app.core.http_client import http_client
+from app.core.metrics import Counter, Gauge, MetricsMiddleware, event_loop_monitor, registry
+from app.core.profiling import ProfilingMiddleware, authorized, profile_store, render
+from app.core.responses import CompressionMiddleware, FastJSONResponse
+from app.core.rate_limiter import PRIORITY_NAMES
+from app.services.alpha_vantage_service import alpha_vantage_quota
+from app.services.persistence_service import persistence_service
+from app.services.training_pool import training_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared upstream HTTP session for the lifetime of the app
+    await http_client.start()
+    if settings.METRICS_ENABLED:
+        event_loop_monitor.start()
+    if settings.PERSISTENCE_ENABLED:
+        await database.connect()
+        persistence_service.start()
+    if settings.PREWARM_ENABLED:
+        stocks.prewarmer.start()
+    try:
+        yield
+    finally:
+        await event_loop_monitor.stop()
+        await stocks.prewarmer.stop()
+        await stocks.quote_stream.stop()
+        await persistence_service.stop()
+        await database.disconnect()
+        await http_client.close()
+        await response_cache.close()
+        await stocks.prediction_service.training_jobs.stop()
+        training_pool.shutdown()
 
 app = FastAPI(
     title="Stock Predictive Analytics API",
     description="A professional-grade stock market analysis and prediction platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Counters services already keep, read at scrape time
+Counter(
+    "cache_lookups_total", "Response cache lookups by tier and result", ("tier", "result"),
+    fn=lambda: {
+        ("local", "hit"): response_cache.local.hits,
+        ("local", "miss"): response_cache.local.misses,
+        ("shared", "hit"): response_cache.shared_hits,
+        ("shared", "miss"): response_cache.shared_misses
+    }
+)
+Gauge(
+    "cache_hit_ratio", "Share of cache lookups served from either tier",
+    fn=lambda: {(): response_cache.stats()["hit_ratio"]}
+)
+Gauge(
+    "upstream_quota_queue_depth", "Calls waiting for an Alpha Vantage quota token", ("priority",),
+    fn=lambda: {(name,): depth for name, depth in alpha_vantage_quota.stats()["queued"].items()}
+)
+Counter(
+    "upstream_quota_granted_total", "Alpha Vantage quota tokens granted", ("priority",),
+    fn=lambda: {(PRIORITY_NAMES[p],): count for p, count in alpha_vantage_quota.granted.items()}
+)
+Gauge(
+    "training_pool_jobs", "Training pool jobs by state", ("state",),
+    fn=lambda: {(state,): getattr(training_pool, state) for state in ("queued", "running")}
+)
+
+# Innermost, so request metrics and profiles include compression time
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +107,37 @@ async def health_check():
         }
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles")
+async def list_profiles(token: Optional[str] = Header(None, alias="X-Profile")):
+    """List captured request profiles, newest first."""
+    if not authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    return {"profiles": profile_store.list()}
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    token: Optional[str] = Header(None, alias="X-Profile")
+):
+    """Download a profile as speedscope JSON or collapsed stacks for flamegraph tools."""
+    if not authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    body, media_type = render(profile, format)
+    return Response(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.{"json" if format == "speedscope" else "txt"}"'}
+    )
+
 # Include routers
 app.include_router(stocks.router, prefix="/api/v1/stocks", tags=["stocks"])
 
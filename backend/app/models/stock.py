@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, Float, JSON, ForeignKey, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -38,8 +38,14 @@ class Stock(BaseModel):
     prediction_trend = Column(String)  # bullish, bearish, neutral
     prediction_last_updated = Column(String)
 
+    predictions = relationship("StockPrediction", back_populates="stock")
+
 class StockPrediction(BaseModel):
     __tablename__ = "stock_predictions"
+    # One row per stock, target date and type; newer forecasts overwrite older ones
+    __table_args__ = (
+        UniqueConstraint("stock_id", "prediction_date", "prediction_type", name="uq_stock_prediction_day"),
+    )
 
     stock_id = Column(Integer, ForeignKey("stocks.id"))
     prediction_date = Column(String)
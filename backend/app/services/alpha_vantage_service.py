@@ -1,80 +1,339 @@
 import os
-import requests
-from typing import Dict, Any, Optional
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Awaitable, Tuple
 from datetime import datetime, timedelta
+from app.core.cache import response_cache, make_cache_key
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.core.metrics import BULK_QUOTE_FALLBACKS, UPSTREAM_REQUESTS, UPSTREAM_SECONDS, timed
+from app.core.rate_limiter import PRIORITY_BULK, QuotaScheduler, request_priority, upstream_priority
+from app.core.single_flight import SingleFlight
+from app.services.ohlcv_store import ohlcv_store, to_utc_ns
+from app.services.time_series import bar_to_dict, parse_series
+
+# Cache lifetime in seconds per Alpha Vantage ``function``
+CACHE_TTLS = {
+    "GLOBAL_QUOTE": 15,
+    "TIME_SERIES_INTRADAY": 60,
+    "TIME_SERIES_DAILY": 24 * 60 * 60,
+    "OVERVIEW": 6 * 60 * 60,
+    "SYMBOL_SEARCH": 24 * 60 * 60,
+}
+# Technical indicators (SMA, EMA, RSI, ...) and anything else not listed above
+DEFAULT_CACHE_TTL = 60 * 60
+
+# Payload keys Alpha Vantage uses for errors and quota notices; never cached
+UNCACHEABLE_KEYS = ("Error Message", "Note", "Information")
+# Keys of the payloads Alpha Vantage returns instead of data when a caller is throttled
+THROTTLE_KEYS = ("Note", "Information")
+
+# REALTIME_BULK_QUOTES (premium) accepts at most this many comma-separated symbols
+BULK_QUOTE_MAX_SYMBOLS = 100
+
+# Raw (unadjusted) Alpha Vantage daily bars in the local OHLCV store
+STORE_SOURCE = "alphavantage"
+STORE_INTERVAL = "1d"
+DAILY_SERIES_KEY = "Time Series (Daily)"
+# A compact daily series covers the latest 100 trading days, roughly 140 calendar days
+COMPACT_SPAN_DAYS = 140
+
+def daily_payload_to_bars(data: Dict[str, Any]) -> np.ndarray:
+    """Convert a TIME_SERIES_DAILY payload to store records (ts = UTC midnight of the date)."""
+    return parse_series(data, DAILY_SERIES_KEY)
+
+def bars_to_daily_payload(meta: Dict[str, Any], bars: np.ndarray, output_size: str) -> Dict[str, Any]:
+    """Render store records in the TIME_SERIES_DAILY JSON shape, newest first."""
+    days = pd.to_datetime(bars['ts'], utc=True).strftime("%Y-%m-%d")
+    series = {}
+    for i in range(len(bars) - 1, -1, -1):
+        series[days[i]] = {
+            "1. open": f"{bars['open'][i]:.4f}",
+            "2. high": f"{bars['high'][i]:.4f}",
+            "3. low": f"{bars['low'][i]:.4f}",
+            "4. close": f"{bars['close'][i]:.4f}",
+            "5. volume": str(int(bars['volume'][i]))
+        }
+    meta = dict(meta)
+    if "4. Output Size" in meta:
+        meta["4. Output Size"] = output_size
+    return {"Meta Data": meta, DAILY_SERIES_KEY: series}
+
+def bulk_entry_to_quote(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Render one REALTIME_BULK_QUOTES ``data`` entry in the GLOBAL_QUOTE JSON shape."""
+    change_percent = str(entry.get("change_percent", ""))
+    return {
+        "Global Quote": {
+            "01. symbol": entry.get("symbol", ""),
+            "02. open": entry.get("open", ""),
+            "03. high": entry.get("high", ""),
+            "04. low": entry.get("low", ""),
+            "05. price": entry.get("close", ""),
+            "06. volume": entry.get("volume", ""),
+            "07. latest trading day": str(entry.get("timestamp", ""))[:10],
+            "08. previous close": entry.get("previous_close", ""),
+            "09. change": entry.get("change", ""),
+            "10. change percent": change_percent if change_percent.endswith("%") else f"{change_percent}%"
+        }
+    }
+
+# One budget for the whole process, shared by every AlphaVantageService instance
+alpha_vantage_quota = QuotaScheduler(
+    settings.ALPHA_VANTAGE_CALLS_PER_MINUTE,
+    settings.ALPHA_VANTAGE_CALLS_PER_DAY
+)
 
 class AlphaVantageService:
     def __init__(self):
         self.api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
         self.base_url = "https://www.alphavantage.co/query"
+        self._inflight = SingleFlight()
+        # Cleared when the key turns out not to have access to REALTIME_BULK_QUOTES
+        self._bulk_quotes_available = True
 
-    async def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
-        """Get real-time stock quote data."""
-        params = {
+    async def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a query to Alpha Vantage, serving repeated queries from the response cache.
+
+        Identical queries that miss the cache at the same time share one upstream call.
+        """
+        key = make_cache_key("alphavantage", params)
+        if settings.CACHE_ENABLED:
+            cached = await response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        return await self._inflight.do(key, lambda: self._fetch(key, params))
+
+    async def _fetch(self, key: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            await asyncio.wait_for(
+                alpha_vantage_quota.acquire(),
+                timeout=settings.ALPHA_VANTAGE_QUEUE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            UPSTREAM_REQUESTS.inc(service="alphavantage", endpoint=params.get("function"), outcome="quota_timeout")
+            return {"Error Message": "Alpha Vantage call budget exhausted, try again later"}
+
+        function = params.get("function")
+        try:
+            with timed(UPSTREAM_SECONDS, service="alphavantage", endpoint=function):
+                data = await http_client.get_json(self.base_url, params=params)
+        except Exception:
+            UPSTREAM_REQUESTS.inc(service="alphavantage", endpoint=function, outcome="exception")
+            raise
+
+        # Throttle notices come back as HTTP 200; back off and surface them as errors
+        throttle_key = next((k for k in THROTTLE_KEYS if k in data), None)
+        if throttle_key is not None and len(data) == 1:
+            # Premium-only functions answer free keys the same way, without any throttling
+            if "premium" not in str(data[throttle_key]).lower():
+                alpha_vantage_quota.backoff(settings.ALPHA_VANTAGE_THROTTLE_BACKOFF)
+            UPSTREAM_REQUESTS.inc(service="alphavantage", endpoint=function, outcome="throttled")
+            return {"Error Message": data[throttle_key]}
+        UPSTREAM_REQUESTS.inc(
+            service="alphavantage", endpoint=function, outcome="error" if "Error Message" in data else "ok"
+        )
+
+        # An unknown symbol gets an empty Global Quote; don't serve that as a quote later
+        empty_quote = function == "GLOBAL_QUOTE" and not data.get("Global Quote")
+        if settings.CACHE_ENABLED and data and not empty_quote and not any(k in data for k in UNCACHEABLE_KEYS):
+            ttl = CACHE_TTLS.get(params.get("function"), DEFAULT_CACHE_TTL)
+            await response_cache.set(key, data, ttl)
+        return data
+
+    def _quote_params(self, symbol: str) -> Dict[str, Any]:
+        return {
             "function": "GLOBAL_QUOTE",
             "symbol": symbol,
             "apikey": self.api_key
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json()
 
-    async def get_comprehensive_stock_data(self, symbol: str) -> Dict[str, Any]:
-        """Get comprehensive stock data including previous day OHLC and current day data."""
-        try:
-            # Get real-time quote
-            quote_data = await self.get_stock_quote(symbol)
-            
-            # Get daily time series for previous day data
-            daily_data = await self.get_historical_data(symbol, "daily", "compact")
-            
-            # Get intraday data for current day
-            intraday_data = await self.get_intraday_data(symbol)
-            
-            # Combine all data
-            comprehensive_data = {
-                "symbol": symbol,
-                "current_data": quote_data.get("Global Quote", {}),
-                "previous_day_data": {},
-                "current_day_data": {},
-                "timestamp": datetime.utcnow().isoformat()
+    async def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
+        """Get real-time stock quote data."""
+        return await self._request(self._quote_params(symbol))
+
+    async def get_stock_quotes(
+        self,
+        symbols: List[str],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get quotes for many symbols in one call.
+
+        Cached quotes are served first. The rest are fetched ``batch_size`` symbols
+        per REALTIME_BULK_QUOTES call when ``ALPHA_VANTAGE_BULK_QUOTES`` is on (a
+        chunk the bulk call cannot serve falls back to per-symbol quotes), or as
+        individual GLOBAL_QUOTE calls otherwise, with at most ``concurrency``
+        upstream calls in flight. Returns ``{"quotes": {...}, "errors": {...}}``
+        keyed by symbol; one failing symbol never fails the batch.
+        """
+        batch_size = max(1, min(batch_size or settings.QUOTE_BATCH_SIZE, BULK_QUOTE_MAX_SYMBOLS))
+        semaphore = asyncio.Semaphore(concurrency or settings.QUOTE_BATCH_CONCURRENCY)
+        quotes: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+
+        missing = []
+        for symbol in symbols:
+            cached = None
+            if settings.CACHE_ENABLED:
+                cached = await response_cache.get(make_cache_key("alphavantage", self._quote_params(symbol)))
+            # Only a non-empty quote counts as a hit; anything else goes through fetch_one
+            if cached is not None and cached.get("Global Quote"):
+                quotes[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        async def fetch_one(symbol: str) -> None:
+            async with semaphore:
+                try:
+                    data = await self.get_stock_quote(symbol)
+                except Exception as e:
+                    errors[symbol] = str(e)
+                    return
+            if "Error Message" in data:
+                errors[symbol] = data["Error Message"]
+            elif not data.get("Global Quote"):
+                errors[symbol] = f"No quote data for {symbol}"
+            else:
+                quotes[symbol] = data
+
+        async def fetch_chunk(chunk: List[str]) -> None:
+            async with semaphore:
+                try:
+                    data = await self._request({
+                        "function": "REALTIME_BULK_QUOTES",
+                        "symbol": ",".join(chunk),
+                        "apikey": self.api_key
+                    })
+                except Exception:
+                    data = {}
+            premium_only = "premium" in str(data.get("Error Message", "")).lower()
+            if premium_only:
+                # Not on this plan: later batches go straight to per-symbol quotes
+                self._bulk_quotes_available = False
+            entries = {
+                str(entry.get("symbol", "")).upper(): entry
+                for entry in data.get("data", []) if isinstance(entry, dict)
             }
-            
-            # Extract previous day data from daily time series
-            if "Time Series (Daily)" in daily_data:
-                daily_series = daily_data["Time Series (Daily)"]
-                dates = sorted(daily_series.keys(), reverse=True)
-                if len(dates) >= 2:  # We need at least 2 days of data
-                    previous_day = dates[1]  # Most recent is today, second is previous day
-                    previous_data = daily_series[previous_day]
-                    comprehensive_data["previous_day_data"] = {
-                        "date": previous_day,
-                        "open": float(previous_data.get("1. open", 0)),
-                        "high": float(previous_data.get("2. high", 0)),
-                        "low": float(previous_data.get("3. low", 0)),
-                        "close": float(previous_data.get("4. close", 0)),
-                        "volume": int(previous_data.get("5. volume", 0))
-                    }
-            
-            # Extract current day data from intraday
-            if "Time Series (1min)" in intraday_data:
-                intraday_series = intraday_data["Time Series (1min)"]
-                current_times = sorted(intraday_series.keys(), reverse=True)
-                if current_times:
-                    latest_time = current_times[0]
-                    current_data = intraday_series[latest_time]
-                    comprehensive_data["current_day_data"] = {
-                        "time": latest_time,
-                        "open": float(current_data.get("1. open", 0)),
-                        "high": float(current_data.get("2. high", 0)),
-                        "low": float(current_data.get("3. low", 0)),
-                        "close": float(current_data.get("4. close", 0)),
-                        "volume": int(current_data.get("5. volume", 0))
-                    }
-            
-            return comprehensive_data
-            
+            if not entries:
+                # Premium-only function or upstream error: quote this chunk one by one
+                BULK_QUOTE_FALLBACKS.inc(reason="premium" if premium_only else "error")
+                await asyncio.gather(*(fetch_one(symbol) for symbol in chunk))
+                return
+            for symbol in chunk:
+                if symbol.upper() not in entries:
+                    errors[symbol] = f"No quote data for {symbol}"
+                    continue
+                quotes[symbol] = bulk_entry_to_quote(entries[symbol.upper()])
+                # Seed the single-quote cache so /quote/{symbol} benefits too
+                if settings.CACHE_ENABLED:
+                    await response_cache.set(
+                        make_cache_key("alphavantage", self._quote_params(symbol)),
+                        quotes[symbol],
+                        CACHE_TTLS["GLOBAL_QUOTE"]
+                    )
+
+        if settings.ALPHA_VANTAGE_BULK_QUOTES and self._bulk_quotes_available:
+            chunks = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        else:
+            await asyncio.gather(*(fetch_one(symbol) for symbol in missing))
+
+        return {
+            "quotes": {symbol: quotes[symbol] for symbol in symbols if symbol in quotes},
+            "errors": {symbol: errors[symbol] for symbol in symbols if symbol in errors}
+        }
+
+    async def _timed_section(
+        self,
+        coro: Awaitable[Dict[str, Any]],
+        timeout: float
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Await one sub-fetch under a deadline, returning its data and a status record."""
+        start = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(coro, timeout=timeout)
+            if "Error Message" in data:
+                status = {"status": "error", "error": data["Error Message"]}
+                data = {}
+            else:
+                status = {"status": "ok"}
+        except asyncio.TimeoutError:
+            data = {}
+            status = {"status": "timeout", "error": f"No response within {timeout}s"}
         except Exception as e:
-            return {"error": str(e)}
+            data = {}
+            status = {"status": "error", "error": str(e)}
+        status["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return data, status
+
+    async def get_comprehensive_stock_data(
+        self,
+        symbol: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Get comprehensive stock data including previous day OHLC and current day data.
+
+        The quote, daily and intraday fetches run concurrently, each under its own
+        deadline. A failed or slow section is reported in ``sections`` and the rest
+        of the payload is still returned.
+        """
+        if timeout is None:
+            timeout = settings.COMPREHENSIVE_SUBCALL_TIMEOUT
+        start = time.perf_counter()
+
+        (quote_data, quote_status), (daily_data, daily_status), (intraday_data, intraday_status) = (
+            await asyncio.gather(
+                self._timed_section(self.get_stock_quote(symbol), timeout),
+                self._timed_section(self.get_historical_data(symbol, "daily", "compact"), timeout),
+                self._timed_section(self.get_intraday_data(symbol), timeout)
+            )
+        )
+
+        # Combine all data
+        comprehensive_data = {
+            "symbol": symbol,
+            "current_data": quote_data.get("Global Quote", {}),
+            "previous_day_data": {},
+            "current_day_data": {},
+            "sections": {
+                "quote": quote_status,
+                "previous_day": daily_status,
+                "current_day": intraday_status
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+        try:
+            # Extract previous day data from daily time series (bars are oldest first)
+            daily_bars = parse_series(daily_data, DAILY_SERIES_KEY, limit=2)
+            if len(daily_bars) >= 2:  # We need at least 2 days of data
+                # Most recent is today, second to last is previous day
+                comprehensive_data["previous_day_data"] = bar_to_dict(daily_bars, -2, "date")
+        except (TypeError, ValueError) as e:
+            daily_status.update({"status": "error", "error": f"Malformed daily series: {e}"})
+
+        try:
+            # Extract current day data from intraday
+            intraday_bars = parse_series(intraday_data, "Time Series (1min)", limit=1)
+            if len(intraday_bars):
+                comprehensive_data["current_day_data"] = bar_to_dict(intraday_bars, -1, "time")
+        except (TypeError, ValueError) as e:
+            intraday_status.update({"status": "error", "error": f"Malformed intraday series: {e}"})
+
+        comprehensive_data["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        # Only fail outright when there is nothing at all to show
+        sections = comprehensive_data["sections"].values()
+        if all(section["status"] != "ok" for section in sections):
+            comprehensive_data["error"] = "; ".join(
+                f"{name}: {section['error']}"
+                for name, section in comprehensive_data["sections"].items()
+            )
+
+        return comprehensive_data
 
     async def get_intraday_data(
         self, 
@@ -90,8 +349,7 @@ class AlphaVantageService:
             "outputsize": output_size,
             "apikey": self.api_key
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json()
+        return await self._request(params)
 
     async def get_company_overview(self, symbol: str) -> Dict[str, Any]:
         """Get company overview and fundamental data."""
@@ -100,26 +358,31 @@ class AlphaVantageService:
             "symbol": symbol,
             "apikey": self.api_key
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json()
+        return await self._request(params)
 
     async def get_technical_indicators(
         self, 
         symbol: str, 
         indicator: str = "SMA",
         interval: str = "daily",
-        time_period: int = 20
+        time_period: int = 20,
+        extra: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Get technical indicators for a stock."""
+        """Get technical indicators for a stock from Alpha Vantage.
+
+        ``extra`` adds function-specific parameters (``fastperiod``, ``nbdevup``, ...).
+        ``IndicatorEngine`` computes the common indicators locally and only calls
+        this for the rest.
+        """
         params = {
             "function": indicator,
             "symbol": symbol,
             "interval": interval,
             "time_period": time_period,
-            "apikey": self.api_key
+            "apikey": self.api_key,
+            **(extra or {})
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json()
+        return await self._request(params)
 
     async def get_historical_data(
         self, 
@@ -127,15 +390,59 @@ class AlphaVantageService:
         interval: str = "daily",
         output_size: str = "compact"
     ) -> Dict[str, Any]:
-        """Get historical price data."""
+        """Get historical price data.
+
+        Daily bars are kept in the local OHLCV store. Once a full history has been
+        stored, ``full`` requests only fetch the compact (latest 100 bars) series,
+        append the new bars and are answered from the store.
+        """
+        data, fetch_size = await self._sync_daily_bars(symbol, output_size)
+        if DAILY_SERIES_KEY not in data or fetch_size == output_size:
+            return data
+
+        stored = await asyncio.to_thread(ohlcv_store.read, STORE_SOURCE, STORE_INTERVAL, symbol)
+        return bars_to_daily_payload(data.get("Meta Data", {}), stored, output_size="Full size")
+
+    async def get_daily_bars(self, symbol: str) -> np.ndarray:
+        """The full daily history as store records, oldest first, refreshed like a ``full`` request.
+
+        Returns a copy, so a later in-place tail update does not change it. Empty when
+        nothing is stored and Alpha Vantage has no data for the symbol.
+        """
+        await self._sync_daily_bars(symbol, "full")
+        return await asyncio.to_thread(
+            lambda: np.array(ohlcv_store.read(STORE_SOURCE, STORE_INTERVAL, symbol))
+        )
+
+    async def _sync_daily_bars(self, symbol: str, output_size: str) -> Tuple[Dict[str, Any], str]:
+        """Fetch daily bars into the store; returns the upstream payload and the output size fetched."""
+        stored = await asyncio.to_thread(ohlcv_store.read, STORE_SOURCE, STORE_INTERVAL, symbol)
+        store_is_current = (
+            len(stored) > 0
+            and stored['ts'][-1] >= to_utc_ns(datetime.utcnow() - timedelta(days=COMPACT_SPAN_DAYS))
+        )
+        fetch_size = "compact" if output_size == "full" and store_is_current else output_size
+
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": symbol,
-            "outputsize": output_size,
+            "outputsize": fetch_size,
             "apikey": self.api_key
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json()
+        # A full history is a bulk backfill; don't let it hold up interactive calls
+        priority = PRIORITY_BULK if fetch_size == "full" else request_priority.get()
+        with upstream_priority(priority):
+            data = await self._request(params)
+        if DAILY_SERIES_KEY not in data:
+            return data, fetch_size
+
+        bars = daily_payload_to_bars(data)
+        if fetch_size == "full":
+            await asyncio.to_thread(ohlcv_store.replace, STORE_SOURCE, STORE_INTERVAL, symbol, bars)
+        elif len(stored):
+            # Only extend a history that a full fetch started; compact alone has gaps
+            await asyncio.to_thread(ohlcv_store.append, STORE_SOURCE, STORE_INTERVAL, symbol, bars)
+        return data, fetch_size
 
     async def search_stocks(self, keywords: str) -> Dict[str, Any]:
         """Search for stocks by keywords."""
@@ -144,5 +451,4 @@ class AlphaVantageService:
             "keywords": keywords,
             "apikey": self.api_key
         }
-        response = requests.get(self.base_url, params=params)
-        return response.json() 
\ No newline at end of file
+        return await self._request(params) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""Walk-forward backtests of the prediction models.
+
+Each symbol's feature history is cut into consecutive folds: a model is fitted
+on the bars before the fold and scored on forecasts made from every bar inside
+it, so no fold ever sees its own future. ``expanding`` windows train on all
+earlier bars, ``rolling`` windows on the last ``train_size`` only. Folds run in
+the training process pool, across symbols at once.
+
+CLI (from ``backend/``)::
+
+    PYTHONPATH=. python -m app.services.backtester AAPL MSFT --mode direct --horizon 10
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+from app.core.config import settings
+from app.services.feature_engine import compute_features
+from app.services.prediction_service import FEATURE_COLUMNS, FORECAST_MODES, MAX_HORIZON, PredictionService
+from app.services.training_pool import TrainingPool, backtest_fold
+
+WINDOWS = ("expanding", "rolling")
+
+@dataclass
+class BacktestConfig:
+    mode: str = "recursive"
+    window: str = "expanding"
+    horizon: int = 5
+    train_size: int = 250
+    test_size: int = 20
+    max_folds: Optional[int] = None
+    history_days: int = settings.BACKTEST_HISTORY_DAYS
+
+    def validate(self) -> Optional[str]:
+        if self.mode not in FORECAST_MODES:
+            return f"mode must be one of {', '.join(FORECAST_MODES)}"
+        if self.window not in WINDOWS:
+            return f"window must be one of {', '.join(WINDOWS)}"
+        if not 1 <= self.horizon <= MAX_HORIZON:
+            return f"horizon must be between 1 and {MAX_HORIZON}"
+        if self.train_size < 30 or self.test_size < 1:
+            return "train_size must be at least 30 and test_size at least 1"
+        return None
+
+def walk_forward_folds(n_rows: int, config: BacktestConfig) -> List[Tuple[int, int, int]]:
+    """``(train_start, train_end, test_end)`` row ranges, latest ``max_folds`` only.
+
+    Forecasts need ``horizon`` bars after the origin, so the last fold ends
+    ``horizon`` rows before the data does.
+    """
+    last = n_rows - config.horizon
+    folds = []
+    train_end = config.train_size
+    while train_end < last:
+        test_end = min(train_end + config.test_size, last)
+        train_start = train_end - config.train_size if config.window == "rolling" else 0
+        folds.append((train_start, train_end, test_end))
+        train_end = test_end
+    if config.max_folds:
+        folds = folds[-config.max_folds:]
+    return folds
+
+def summarize(folds: List[Dict[str, Any]], horizon: int) -> Dict[str, Any]:
+    """Pool fold error sums into per-horizon MAE, MAPE (%) and directional accuracy."""
+    count = sum(fold["count"] for fold in folds)
+    if count == 0:
+        return {"forecasts": 0, "horizons": []}
+    totals = {
+        key: np.sum([fold[key] for fold in folds], axis=0)
+        for key in ("abs_error", "pct_error", "direction_hits")
+    }
+    return {
+        "forecasts": count,
+        "horizons": [
+            {
+                "horizon": h + 1,
+                "mae": round(float(totals["abs_error"][h]) / count, 4),
+                "mape": round(float(totals["pct_error"][h]) / count, 4),
+                "directional_accuracy": round(float(totals["direction_hits"][h]) / count, 4)
+            }
+            for h in range(horizon)
+        ]
+    }
+
+class Backtester:
+    """Run walk-forward backtests for many symbols on a ``TrainingPool``.
+
+    ``load_history(symbol, days)`` returns daily OHLCV bars, e.g.
+    ``PredictionService.load_history`` (the local bar store, topped up from yfinance).
+    """
+
+    def __init__(self, pool: TrainingPool, load_history: Callable[[str, int], Awaitable[pd.DataFrame]]):
+        self.pool = pool
+        self.load_history = load_history
+        # Keep the pool fed without loading every symbol's history up front
+        self._symbols = asyncio.Semaphore(max(1, pool.max_workers * 2))
+
+    async def backtest_symbol(self, symbol: str, config: BacktestConfig) -> Dict[str, Any]:
+        async with self._symbols:
+            try:
+                history = await self.load_history(symbol, config.history_days)
+                if history.empty:
+                    return {"symbol": symbol, "error": "No data available for backtesting"}
+                df = (await asyncio.to_thread(compute_features, history)).dropna(subset=FEATURE_COLUMNS)
+
+                folds = walk_forward_folds(len(df), config)
+                if not folds:
+                    return {"symbol": symbol, "error": f"Insufficient data: {len(df)} feature rows"}
+
+                X = df[FEATURE_COLUMNS].to_numpy()
+                closes = df["Close"].to_numpy()
+                close_column = FEATURE_COLUMNS.index("Close")
+                # Ship only the rows each fold touches to the worker
+                results = await asyncio.gather(*[
+                    self.pool.run(
+                        backtest_fold,
+                        X[start:test_end + config.horizon],
+                        closes[start:test_end + config.horizon],
+                        0, train_end - start, test_end - start,
+                        config.horizon, config.mode, close_column, self.pool.n_jobs_per_fit
+                    )
+                    for start, train_end, test_end in folds
+                ])
+            except Exception as e:
+                return {"symbol": symbol, "error": f"Backtest failed: {str(e)}"}
+
+        return {
+            "symbol": symbol,
+            "folds": len(folds),
+            "first_test_bar": df.index[folds[0][1]].date().isoformat(),
+            "last_test_bar": df.index[folds[-1][2] - 1].date().isoformat(),
+            **summarize(results, config.horizon),
+            "_folds": results
+        }
+
+    async def run(self, symbols: List[str], config: BacktestConfig) -> Dict[str, Any]:
+        """Backtest ``symbols``; per-symbol failures are reported, not raised."""
+        error = config.validate()
+        if error:
+            return {"error": error}
+
+        results = await asyncio.gather(*[
+            self.backtest_symbol(symbol.upper(), config) for symbol in symbols
+        ])
+        folds = [fold for result in results for fold in result.pop("_folds", [])]
+        return {
+            "config": asdict(config),
+            "symbols": results,
+            "overall": summarize(folds, config.horizon)
+        }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the price models")
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--symbols-file", help="file with one symbol per line")
+    parser.add_argument("--mode", choices=FORECAST_MODES, default=settings.FORECAST_MODE)
+    parser.add_argument("--window", choices=WINDOWS, default="expanding")
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--train-size", type=int, default=250)
+    parser.add_argument("--test-size", type=int, default=20)
+    parser.add_argument("--max-folds", type=int)
+    parser.add_argument("--history-days", type=int, default=settings.BACKTEST_HISTORY_DAYS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="write the full JSON report here")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.strip() for line in f if line.strip()]
+    if not symbols:
+        parser.error("no symbols given")
+
+    config = BacktestConfig(
+        mode=args.mode,
+        window=args.window,
+        horizon=args.horizon,
+        train_size=args.train_size,
+        test_size=args.test_size,
+        max_folds=args.max_folds,
+        history_days=args.history_days
+    )
+    pool = TrainingPool(max_workers=args.workers)
+    try:
+        report = asyncio.run(Backtester(pool, PredictionService().load_history).run(symbols, config))
+    finally:
+        pool.shutdown()
+
+    if "error" in report:
+        sys.exit(report["error"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for result in report["symbols"]:
+        if "error" in result:
+            print(f"{result['symbol']:<8} {result['error']}")
+        else:
+            print(f"{result['symbol']:<8} {result['folds']} folds, {result['forecasts']} forecasts")
+    print("\nhorizon      MAE     MAPE  direction")
+    for row in report["overall"]["horizons"]:
+        print(f"  {row['horizon']:>4}d {row['mae']:8.3f} {row['mape']:7.2f}% {row['directional_accuracy']:9.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Vectorized technical-indicator features for many symbols at once.
+
+Each symbol's OHLCV history is right-aligned into one column of a wide frame
+(the last bar of every symbol sits on the last row; shorter histories are
+NaN-padded at the top). Every indicator is then a single pandas pass over all
+columns instead of one ``ta`` call per symbol. Right-alignment, rather than
+aligning on dates, means no symbol ever sees an interior gap, so the rolling and
+EWM kernels see exactly the same observations as the per-symbol ``ta`` path and
+the output is numerically identical to it.
+"""
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+INDICATOR_COLUMNS = [
+    'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
+    'MACD', 'MACD_signal', 'RSI',
+    'BB_upper', 'BB_lower', 'BB_middle',
+    'Volume_SMA', 'Price_Change', 'Price_Change_5',
+    'Price_Change_10', 'Volatility'
+]
+
+def sma(panel: pd.DataFrame, window: int) -> pd.DataFrame:
+    return panel.rolling(window=window, min_periods=window).mean()
+
+def ema(panel: pd.DataFrame, window: int) -> pd.DataFrame:
+    return panel.ewm(span=window, min_periods=window, adjust=False).mean()
+
+def rsi(close: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+    diff = close.diff(1)
+    # ta maps the first diff of a series (NaN) to 0.0; keep the padding above it NaN
+    up_direction = diff.where(diff > 0, 0.0).where(close.notna())
+    down_direction = -diff.where(diff < 0, 0.0).where(close.notna())
+    emaup = up_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    emadn = down_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    relative_strength = emaup / emadn
+    return pd.DataFrame(
+        np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength))),
+        index=close.index,
+        columns=close.columns
+    )
+
+def compute_indicator_panel(close: pd.DataFrame, volume: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Compute every indicator for a wide (bars x symbols) close/volume panel."""
+    ema_12 = ema(close, 12)
+    ema_26 = ema(close, 26)
+    macd_line = ema_12 - ema_26
+    macd_signal = ema(macd_line, 9)
+
+    bb_middle = sma(close, 20)
+    bb_std = close.rolling(20, min_periods=20).std(ddof=0)
+
+    price_change = close.pct_change(fill_method=None)
+
+    return {
+        'SMA_20': bb_middle,
+        'SMA_50': sma(close, 50),
+        'EMA_12': ema_12,
+        'EMA_26': ema_26,
+        'MACD': macd_line - macd_signal,
+        'MACD_signal': macd_signal,
+        'RSI': rsi(close, 14),
+        'BB_upper': bb_middle + 2 * bb_std,
+        'BB_lower': bb_middle - 2 * bb_std,
+        'BB_middle': bb_middle,
+        'Volume_SMA': sma(volume, 20),
+        'Price_Change': price_change,
+        'Price_Change_5': close.pct_change(periods=5, fill_method=None),
+        'Price_Change_10': close.pct_change(periods=10, fill_method=None),
+        'Volatility': price_change.rolling(window=20).std()
+    }
+
+def _right_align(frames: Dict[str, pd.DataFrame], column: str, length: int) -> pd.DataFrame:
+    values = np.full((length, len(frames)), np.nan)
+    for i, frame in enumerate(frames.values()):
+        if len(frame):
+            values[length - len(frame):, i] = frame[column].to_numpy(dtype=float)
+    return pd.DataFrame(values, columns=list(frames.keys()))
+
+def compute_features_panel(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Add indicator columns to many OHLCV histories in a few vectorized passes.
+
+    ``frames`` maps symbol to its history (as returned by ``yf.Ticker.history``).
+    Returns the same mapping with the indicator columns added and warm-up rows
+    dropped, matching ``PredictionService.prepare_features`` for each symbol.
+    """
+    frames = {symbol: frame for symbol, frame in frames.items() if not frame.empty}
+    if not frames:
+        return {}
+
+    length = max(len(frame) for frame in frames.values())
+    close = _right_align(frames, 'Close', length)
+    volume = _right_align(frames, 'Volume', length)
+    indicators = compute_indicator_panel(close, volume)
+
+    # Stack to (bars, symbols, indicators) once, then slice each symbol back out
+    stacked = np.stack([indicators[name].to_numpy() for name in INDICATOR_COLUMNS], axis=-1)
+
+    results = {}
+    for i, (symbol, frame) in enumerate(frames.items()):
+        features = stacked[length - len(frame):, i, :]
+        # Warm-up rows are NaN in some indicator; drop them before building the frame
+        keep = ~np.isnan(features).any(axis=1) & frame.notna().all(axis=1).to_numpy()
+        results[symbol] = pd.concat([
+            frame[keep],
+            pd.DataFrame(features[keep], index=frame.index[keep], columns=INDICATOR_COLUMNS)
+        ], axis=1)
+    return results
+
+def compute_features(frame: pd.DataFrame) -> pd.DataFrame:
+    """Single-symbol convenience wrapper around ``compute_features_panel``."""
+    if frame.empty:
+        return pd.DataFrame()
+    return compute_features_panel({"_": frame})["_"]
+
+def split_download(data: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a ``yf.download(..., group_by="ticker")`` frame into per-symbol histories."""
+    if not isinstance(data.columns, pd.MultiIndex):
+        # A single ticker comes back without the symbol level
+        return {symbols[0]: data.dropna(how="all")} if symbols else {}
+
+    available = set(data.columns.get_level_values(0))
+    return {
+        symbol: data[symbol].dropna(how="all")
+        for symbol in symbols
+        if symbol in available
+    }
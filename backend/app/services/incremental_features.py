@@ -0,0 +1,241 @@
+import copy
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+import pandas as pd
+from app.services.feature_engine import INDICATOR_COLUMNS, PRICE_COLUMNS
+
+class RollingStats:
+    """Mean and variance over the last ``window`` values, O(1) per update.
+
+    Uses a windowed Welford update (add the new value, drop the oldest) rather
+    than running sums of squares, which lose precision at price magnitudes.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        if len(self._values) < self.window:
+            self._values.append(value)
+            delta = value - self._mean
+            self._mean += delta / len(self._values)
+            self._m2 += delta * (value - self._mean)
+            return
+
+        oldest = self._values.popleft()
+        self._values.append(value)
+        old_mean = self._mean
+        self._mean += (value - oldest) / self.window
+        self._m2 += (value - oldest) * (value - self._mean + oldest - old_mean)
+        self._m2 = max(self._m2, 0.0)
+
+    @property
+    def ready(self) -> bool:
+        return len(self._values) == self.window
+
+    def mean(self) -> Optional[float]:
+        return self._mean if self.ready else None
+
+    def std(self, ddof: int = 1) -> Optional[float]:
+        return math.sqrt(self._m2 / (self.window - ddof)) if self.ready else None
+
+class EMAState:
+    """``Series.ewm(alpha=..., adjust=False, min_periods=...)`` as a recurrence."""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self._value: Optional[float] = None
+
+    @classmethod
+    def from_span(cls, span: int) -> "EMAState":
+        return cls(alpha=2 / (span + 1), min_periods=span)
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self._value is None:
+            self._value = value
+        else:
+            self._value = (1 - self.alpha) * self._value + self.alpha * value
+
+    def value(self) -> Optional[float]:
+        return self._value if self.count >= self.min_periods else None
+
+class WilderRSIState:
+    """RSI with Wilder smoothing, matching ``ta.momentum.rsi`` bar for bar."""
+
+    def __init__(self, window: int = 14):
+        self._up = EMAState(alpha=1 / window, min_periods=window)
+        self._down = EMAState(alpha=1 / window, min_periods=window)
+        self._last_close: Optional[float] = None
+
+    def update(self, close: float) -> None:
+        # ta treats the undefined first difference as 0.0 rather than skipping it
+        diff = 0.0 if self._last_close is None else close - self._last_close
+        self._up.update(diff if diff > 0 else 0.0)
+        self._down.update(-diff if diff < 0 else 0.0)
+        self._last_close = close
+
+    def value(self) -> Optional[float]:
+        up, down = self._up.value(), self._down.value()
+        if up is None or down is None:
+            return None
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + up / down)
+
+class IncrementalFeatureState:
+    """All ``prepare_features`` indicators for one symbol, updated one bar at a time.
+
+    Seed it with the full history the batch path would use, then ``update`` with
+    each new bar; the returned row equals the last row of ``prepare_features`` on
+    the extended history. Rows inside the indicator warm-up return None, just as
+    the batch path drops them.
+    """
+
+    def __init__(self):
+        self.sma_20 = RollingStats(20)  # also the Bollinger middle band
+        self.sma_50 = RollingStats(50)
+        self.ema_12 = EMAState.from_span(12)
+        self.ema_26 = EMAState.from_span(26)
+        self.macd_signal = EMAState.from_span(9)
+        self.rsi = WilderRSIState(14)
+        self.volume_sma = RollingStats(20)
+        self.volatility = RollingStats(20)
+        self._closes: deque = deque(maxlen=11)  # enough for the 10-bar change
+        self.last_timestamp: Any = None
+        self.last_row: Optional[Dict[str, float]] = None
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return self._closes[-1] if self._closes else None
+
+    def matches(self, history: pd.DataFrame) -> bool:
+        """Whether ``history`` still contains this state's last bar with the same close.
+
+        A changed close means the history was re-adjusted (split/dividend) and the
+        state has to be re-seeded.
+        """
+        if self.last_timestamp is None or self.last_timestamp not in history.index:
+            return False
+        return math.isclose(float(history.at[self.last_timestamp, 'Close']), self.last_close, rel_tol=1e-9)
+
+    def _pct_change(self, periods: int) -> Optional[float]:
+        if len(self._closes) <= periods:
+            return None
+        return self._closes[-1] / self._closes[-1 - periods] - 1
+
+    def update(self, bar: Dict[str, float], timestamp: Any = None) -> Optional[Dict[str, float]]:
+        """Apply one OHLCV bar and return the feature row, or None during warm-up."""
+        close = float(bar['Close'])
+        volume = float(bar['Volume'])
+
+        self._closes.append(close)
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        self.ema_12.update(close)
+        self.ema_26.update(close)
+        self.rsi.update(close)
+        self.volume_sma.update(volume)
+
+        ema_12, ema_26 = self.ema_12.value(), self.ema_26.value()
+        macd_line = None
+        if ema_12 is not None and ema_26 is not None:
+            macd_line = ema_12 - ema_26
+            self.macd_signal.update(macd_line)
+
+        price_change = self._pct_change(1)
+        if price_change is not None:
+            self.volatility.update(price_change)
+
+        self.last_timestamp = timestamp
+        signal = self.macd_signal.value()
+        bb_middle = self.sma_20.mean()
+        bb_std = self.sma_20.std(ddof=0)
+        indicators = {
+            'SMA_20': bb_middle,
+            'SMA_50': self.sma_50.mean(),
+            'EMA_12': ema_12,
+            'EMA_26': ema_26,
+            'MACD': macd_line - signal if macd_line is not None and signal is not None else None,
+            'MACD_signal': signal,
+            'RSI': self.rsi.value(),
+            'BB_upper': bb_middle + 2 * bb_std if bb_middle is not None else None,
+            'BB_lower': bb_middle - 2 * bb_std if bb_middle is not None else None,
+            'BB_middle': bb_middle,
+            'Volume_SMA': self.volume_sma.mean(),
+            'Price_Change': price_change,
+            'Price_Change_5': self._pct_change(5),
+            'Price_Change_10': self._pct_change(10),
+            'Volatility': self.volatility.std(ddof=1)
+        }
+        if any(indicators[name] is None for name in INDICATOR_COLUMNS):
+            self.last_row = None
+            return None
+
+        self.last_row = {**{name: float(bar[name]) for name in PRICE_COLUMNS}, **indicators}
+        return self.last_row
+
+    def seed(self, history: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Feed a raw OHLCV history oldest-first and return the latest feature row."""
+        for timestamp, bar in zip(history.index, history[PRICE_COLUMNS].to_dict("records")):
+            self.update(bar, timestamp)
+        return self.last_row
+
+    @classmethod
+    def from_history(cls, history: pd.DataFrame) -> "IncrementalFeatureState":
+        state = cls()
+        state.seed(history)
+        return state
+
+class FeatureStateStore:
+    """Per-symbol incremental feature states."""
+
+    def __init__(self):
+        self._states: Dict[str, IncrementalFeatureState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Optional[IncrementalFeatureState]:
+        return self._states.get(symbol.upper())
+
+    def seed(self, symbol: str, history: pd.DataFrame) -> IncrementalFeatureState:
+        state = IncrementalFeatureState.from_history(history)
+        with self._lock:
+            self._states[symbol.upper()] = state
+        return state
+
+    def append(self, symbol: str, bars: Iterable[Any]) -> Optional[Dict[str, float]]:
+        """Apply ``(timestamp, bar)`` pairs newer than the state's last bar."""
+        with self._lock:
+            return self._append(self._states[symbol.upper()], bars)
+
+    def _append(self, state: IncrementalFeatureState, bars: Iterable[Any]) -> Optional[Dict[str, float]]:
+        for timestamp, bar in bars:
+            if state.last_timestamp is not None and timestamp <= state.last_timestamp:
+                continue
+            state.update(bar, timestamp)
+        return state.last_row
+
+    def sync(self, symbol: str, history: pd.DataFrame) -> IncrementalFeatureState:
+        """Advance ``symbol``'s state to the end of ``history`` and return a private copy.
+
+        Only bars after the state's last one are applied; the state is re-seeded
+        when there is none yet or ``history`` no longer matches it.
+        """
+        with self._lock:
+            state = self._states.get(symbol.upper())
+            if state is None or not state.matches(history):
+                state = self._states[symbol.upper()] = IncrementalFeatureState.from_history(history)
+            else:
+                newer = history[history.index > state.last_timestamp]
+                self._append(state, zip(newer.index, newer[PRICE_COLUMNS].to_dict("records")))
+            return copy.deepcopy(state)
+
+    def __len__(self) -> int:
+        return len(self._states)
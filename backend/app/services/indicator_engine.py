@@ -0,0 +1,321 @@
+"""Technical indicators computed locally from stored daily bars.
+
+``/technical`` used to send every indicator and period to Alpha Vantage as its
+own ``function=`` call, one quota unit each. ``IndicatorEngine`` computes the
+indicators in ``INDICATORS`` from the daily bars the OHLCV store already keeps
+(weekly and monthly bars are resampled from them) and memoizes each result per
+symbol, interval, last bar, indicator and parameters. Other indicators and
+intraday intervals still go to Alpha Vantage.
+
+SMA, EMA and RSI use the ``feature_engine`` kernels behind the prediction
+features, so values follow the ``ta`` conventions: EMAs start from the first
+close rather than an SMA seed and differ slightly from Alpha Vantage's during
+the warm-up.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.feature_engine import ema, rsi, sma
+from app.services.time_series import parse_indicator
+
+# Intervals computed locally, with the pandas period daily bars are grouped by
+LOCAL_INTERVALS = {"daily": None, "weekly": "W-FRI", "monthly": "M"}
+# Memo keys include the last bar, so entries never go stale; the TTL only bounds memory
+MEMO_TTL = 24 * 60 * 60
+
+Columns = Dict[str, np.ndarray]
+
+def _frame(values: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({"value": values})
+
+def _values(frame: pd.DataFrame) -> np.ndarray:
+    return frame.to_numpy(dtype=float)[:, 0]
+
+def _sma(bars: np.ndarray, period: int) -> Columns:
+    return {"SMA": _values(sma(_frame(bars['close']), period))}
+
+def _ema(bars: np.ndarray, period: int) -> Columns:
+    return {"EMA": _values(ema(_frame(bars['close']), period))}
+
+def _wma(bars: np.ndarray, period: int) -> Columns:
+    weights = np.arange(period, 0, -1, dtype=float)
+    values = np.full(len(bars), np.nan)
+    if len(bars) >= period:
+        values[period - 1:] = np.convolve(bars['close'], weights, mode='valid') / weights.sum()
+    return {"WMA": values}
+
+def _rsi(bars: np.ndarray, period: int) -> Columns:
+    return {"RSI": _values(rsi(_frame(bars['close']), period))}
+
+def _macd(bars: np.ndarray, fast: int, slow: int, signal: int) -> Columns:
+    close = _frame(bars['close'])
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {
+        "MACD": _values(line),
+        "MACD_Signal": _values(signal_line),
+        "MACD_Hist": _values(line - signal_line)
+    }
+
+def _bbands(bars: np.ndarray, period: int, deviations: float) -> Columns:
+    close = _frame(bars['close'])
+    middle = sma(close, period)
+    std = close.rolling(period, min_periods=period).std(ddof=0)
+    return {
+        "Real Upper Band": _values(middle + deviations * std),
+        "Real Middle Band": _values(middle),
+        "Real Lower Band": _values(middle - deviations * std)
+    }
+
+def _atr(bars: np.ndarray, period: int) -> Columns:
+    """Wilder's ATR seeded with the mean of the first ``period`` true ranges, as TA-Lib does."""
+    high, low, close = bars['high'], bars['low'], bars['close']
+    true_range = np.full(len(bars), np.nan)
+    if len(bars) > 1:
+        previous = close[:-1]
+        true_range[1:] = np.maximum(high[1:], previous) - np.minimum(low[1:], previous)
+    if len(bars) > period:
+        true_range[period] = true_range[1:period + 1].mean()
+        true_range[:period] = np.nan
+    atr = pd.Series(true_range).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    atr[:period] = np.nan
+    return {"ATR": atr}
+
+def _roc(bars: np.ndarray, period: int) -> Columns:
+    close = pd.Series(bars['close'])
+    return {"ROC": ((close / close.shift(period) - 1) * 100).to_numpy()}
+
+def _mom(bars: np.ndarray, period: int) -> Columns:
+    close = pd.Series(bars['close'])
+    return {"MOM": (close - close.shift(period)).to_numpy()}
+
+def _obv(bars: np.ndarray) -> Columns:
+    steps = np.sign(np.diff(bars['close'], prepend=bars['close'][:1])) * bars['volume']
+    if len(steps):
+        steps[0] = bars['volume'][0]
+    return {"OBV": np.cumsum(steps)}
+
+# name -> (default parameters, function of bars and parameters)
+INDICATORS: Dict[str, Tuple[Tuple[float, ...], Callable[..., Columns]]] = {
+    "SMA": ((20,), _sma),
+    "EMA": ((20,), _ema),
+    "WMA": ((20,), _wma),
+    "RSI": ((14,), _rsi),
+    "MACD": ((12, 26, 9), _macd),
+    "BBANDS": ((20, 2), _bbands),
+    "ATR": ((14,), _atr),
+    "ROC": ((10,), _roc),
+    "MOM": ((10,), _mom),
+    "OBV": ((), _obv)
+}
+# Alpha Vantage parameter names where they are not just ``time_period``
+UPSTREAM_PARAMS = {
+    "MACD": ("fastperiod", "slowperiod", "signalperiod"),
+    "BBANDS": ("time_period", "nbdevup")
+}
+
+def _format_param(value: float) -> str:
+    return str(int(value)) if value == int(value) else str(value)
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One indicator and its parameters, e.g. ``MACD:12:26:9``."""
+
+    name: str
+    params: Tuple[float, ...] = ()
+
+    @property
+    def label(self) -> str:
+        return ":".join([self.name] + [_format_param(p) for p in self.params])
+
+    @property
+    def local(self) -> bool:
+        return self.name in INDICATORS
+
+    def upstream_params(self) -> Tuple[int, Dict[str, Any]]:
+        """``(time_period, extra query parameters)`` for the Alpha Vantage call."""
+        names = UPSTREAM_PARAMS.get(self.name, ("time_period",))
+        params = {name: _format_param(value) for name, value in zip(names, self.params)}
+        if self.name == "BBANDS" and "nbdevup" in params:
+            params["nbdevdn"] = params["nbdevup"]
+        time_period = int(params.pop("time_period", self.params[0] if self.params else 20))
+        return time_period, params
+
+def parse_specs(text: str, max_specs: int = settings.INDICATOR_MAX_PER_REQUEST) -> List[IndicatorSpec]:
+    """Parse ``"SMA:20,EMA:50,RSI:14,MACD"``; missing parameters take the indicator's defaults.
+
+    Raises ``ValueError`` for malformed parameters or too many indicators.
+    """
+    specs: List[IndicatorSpec] = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, *raw = [field.strip() for field in part.split(":")]
+        name = name.upper()
+        if not name.replace("_", "").isalnum():
+            raise ValueError(f"Invalid indicator '{part.strip()}'")
+        try:
+            params = tuple(float(value) for value in raw)
+        except ValueError:
+            raise ValueError(f"Invalid parameters in '{part.strip()}'")
+        if any(value <= 0 for value in params):
+            raise ValueError(f"Parameters must be positive in '{part.strip()}'")
+        if name in INDICATORS:
+            defaults = INDICATORS[name][0]
+            if len(params) > len(defaults):
+                raise ValueError(f"{name} takes at most {len(defaults)} parameters")
+            params = params + tuple(float(value) for value in defaults[len(params):])
+        # Everything but the band width is a period
+        periods = params[:1] if name == "BBANDS" else params
+        if any(value != int(value) for value in periods):
+            raise ValueError(f"Periods must be whole numbers in '{part.strip()}'")
+        specs.append(IndicatorSpec(name, params))
+    specs = list(dict.fromkeys(specs))
+    if not specs:
+        raise ValueError("At least one indicator is required")
+    if len(specs) > max_specs:
+        raise ValueError(f"Maximum {max_specs} indicators per request")
+    return specs
+
+def legacy_spec(indicator: str, time_period: int) -> IndicatorSpec:
+    """The spec behind ``?indicator=...&time_period=...``.
+
+    Like the Alpha Vantage call it replaces, ``time_period`` sets the first
+    parameter only where that is a ``time_period`` (not MACD's fast period).
+    """
+    name = indicator.upper()
+    defaults = tuple(float(value) for value in INDICATORS[name][0]) if name in INDICATORS else (20.0,)
+    if not defaults or UPSTREAM_PARAMS.get(name, ("time_period",))[0] != "time_period":
+        return IndicatorSpec(name, defaults)
+    return IndicatorSpec(name, (float(time_period),) + defaults[1:])
+
+def resample(bars: np.ndarray, interval: str) -> np.ndarray:
+    """Daily bars grouped into ``weekly``/``monthly`` bars stamped with their last trading day."""
+    rule = LOCAL_INTERVALS[interval]
+    if rule is None or len(bars) == 0:
+        return bars
+    periods = pd.DatetimeIndex(bars['ts']).to_period(rule)
+    frame = pd.DataFrame({name: bars[name] for name in bars.dtype.names}).groupby(periods, sort=True).agg({
+        'ts': 'last', 'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+    })
+    grouped = np.empty(len(frame), dtype=bars.dtype)
+    for name in bars.dtype.names:
+        grouped[name] = frame[name].to_numpy()
+    return grouped
+
+def merge_columns(parts: List[Columns]) -> Columns:
+    """Combine column sets, outer-joined on ``ts`` when their timestamps differ."""
+    first = parts[0]['ts']
+    if all(np.array_equal(part['ts'], first) for part in parts[1:]):
+        merged = {"ts": first}
+        for part in parts:
+            merged.update((name, values) for name, values in part.items() if name != 'ts')
+        return merged
+    frame = pd.concat(
+        [pd.DataFrame({k: v for k, v in part.items() if k != 'ts'}, index=part['ts']) for part in parts],
+        axis=1
+    ).sort_index()
+    return {"ts": frame.index.to_numpy(dtype=np.int64), **{name: frame[name].to_numpy() for name in frame}}
+
+class IndicatorEngine:
+    """Compute technical indicators locally, calling Alpha Vantage only for what it cannot.
+
+    ``load_bars(symbol)`` returns a symbol's daily ``BAR_DTYPE`` history and
+    ``fetch_upstream(symbol, function, interval, time_period, extra)`` is the
+    Alpha Vantage indicator call. Results are column arrays keyed by output
+    field; with ``suffix`` the field names carry the parameters
+    (``SMA_20``, ``MACD_Signal_12_26_9``) so several periods fit in one result.
+    """
+
+    def __init__(
+        self,
+        load_bars: Callable[[str], Awaitable[np.ndarray]],
+        fetch_upstream: Callable[..., Awaitable[Dict[str, Any]]],
+        cache_entries: int = settings.INDICATOR_CACHE_ENTRIES
+    ):
+        self.load_bars = load_bars
+        self.fetch_upstream = fetch_upstream
+        self._memo = LRUCache(cache_entries)
+        self.local = 0
+        self.upstream = 0
+
+    def _compute(self, symbol: str, interval: str, bars: np.ndarray, spec: IndicatorSpec) -> Columns:
+        last = bars[-1]
+        # The current session's bar is revised in place, so its values are part of the key
+        key = f"{symbol}|{interval}|{len(bars)}|{last['ts']}|{last['close']!r}|{last['volume']!r}|{spec.label}"
+        columns = self._memo.get(key)
+        if columns is None:
+            columns = INDICATORS[spec.name][1](bars, *(
+                int(p) if p == int(p) else p for p in spec.params
+            ))
+            self._memo.set(key, columns, MEMO_TTL)
+        self.local += 1
+        return {"ts": bars['ts'], **columns}
+
+    async def _fetch(self, symbol: str, spec: IndicatorSpec, interval: str) -> Columns:
+        time_period, extra = spec.upstream_params()
+        data = await self.fetch_upstream(symbol, spec.name, interval, time_period, extra)
+        if "Error Message" in data:
+            raise ValueError(f"{spec.label}: {data['Error Message']}")
+        self.upstream += 1
+        return parse_indicator(data)
+
+    async def compute(
+        self,
+        symbol: str,
+        specs: List[IndicatorSpec],
+        interval: str = "daily",
+        suffix: bool = True,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """``{"columns", "sources"}`` for ``specs``, oldest first, or ``{"error": ...}``.
+
+        Rows where every indicator is still warming up are dropped; ``limit``
+        keeps the latest rows.
+        """
+        symbol = symbol.upper()
+        bars = np.empty(0)
+        if interval in LOCAL_INTERVALS and any(spec.local for spec in specs):
+            bars = resample(await self.load_bars(symbol), interval)
+        local = len(bars) > 0
+
+        try:
+            remote = await asyncio.gather(*(
+                self._fetch(symbol, spec, interval) for spec in specs if not (local and spec.local)
+            ))
+        except Exception as e:
+            return {"error": str(e)}
+
+        parts: List[Columns] = []
+        sources: Dict[str, str] = {}
+        remote_iter = iter(remote)
+        for spec in specs:
+            if local and spec.local:
+                columns = self._compute(symbol, interval, bars, spec)
+                sources[spec.label] = "local"
+            else:
+                columns = next(remote_iter)
+                sources[spec.label] = "alphavantage"
+            if suffix:
+                tag = "_".join(_format_param(p) for p in spec.params)
+                columns = {
+                    (name if name == 'ts' or not tag else f"{name}_{tag}"): values
+                    for name, values in columns.items()
+                }
+            parts.append(columns)
+
+        columns = merge_columns(parts)
+        values = [values for name, values in columns.items() if name != 'ts']
+        if values:
+            keep = ~np.isnan(np.column_stack(values)).all(axis=1)
+            columns = {name: column[keep] for name, column in columns.items()}
+        if limit:
+            columns = {name: column[-limit:] for name, column in columns.items()}
+        return {"columns": columns, "sources": sources}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local": self.local, "upstream": self.upstream, "memo": self._memo.stats()}
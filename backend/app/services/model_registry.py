@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+import joblib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+@dataclass
+class ModelEntry:
+    """A fitted estimator and scaler for one symbol, plus what it was trained on."""
+    symbol: str
+    version: str
+    model: Any
+    scaler: Any
+    feature_columns: List[str]
+    last_bar: date
+    trained_at: datetime = field(default_factory=datetime.utcnow)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    size_bytes: int = 0
+
+    def is_stale(self, latest_bar: date) -> bool:
+        """A model is stale once a newer bar exists than the last one it was trained on."""
+        return latest_bar > self.last_bar
+
+class ModelRegistry:
+    """Per-symbol model store: an LRU in memory, bounded by bytes, backed by joblib files.
+
+    Entries are keyed by ``(symbol, version)``. Every ``put`` is persisted to
+    ``model_dir`` so a restarted process or another worker loads the fitted model
+    instead of retraining it. Methods do blocking file IO; call them off the loop.
+    """
+
+    def __init__(self, model_dir: str, memory_budget_bytes: int):
+        self.model_dir = model_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries: "OrderedDict[Tuple[str, str], ModelEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_loads = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, symbol: str, version: str) -> str:
+        safe_symbol = re.sub(r"[^A-Z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.model_dir, f"{safe_symbol}__{version}.joblib")
+
+    def _remember(self, entry: ModelEntry) -> None:
+        key = (entry.symbol.upper(), entry.version)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size_bytes
+        self._entries[key] = entry
+        self._memory_bytes += entry.size_bytes
+
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self._memory_bytes > self.memory_budget_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted.size_bytes
+            self.evictions += 1
+
+    def get(self, symbol: str, version: str) -> Optional[ModelEntry]:
+        """Return the entry for ``symbol``/``version`` from memory or disk, or None."""
+        key = (symbol.upper(), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        path = self._path(symbol, version)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            entry = ModelEntry(**joblib.load(path))
+        except Exception as e:
+            print(f"Error loading model {path}: {e}")
+            self.misses += 1
+            return None
+        entry.size_bytes = os.path.getsize(path)
+
+        with self._lock:
+            self.disk_loads += 1
+            self._remember(entry)
+        return entry
+
+    def put(self, entry: ModelEntry) -> None:
+        """Persist ``entry`` to disk and make it the in-memory model for its symbol."""
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = self._path(entry.symbol, entry.version)
+        tmp_path = f"{path}.tmp"
+        payload = {name: getattr(entry, name) for name in (
+            "symbol", "version", "model", "scaler", "feature_columns",
+            "last_bar", "trained_at", "metrics"
+        )}
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, path)  # readers never see a half-written file
+        entry.size_bytes = os.path.getsize(path)
+
+        with self._lock:
+            self._remember(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models_in_memory": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "hits": self.hits,
+                "disk_loads": self.disk_loads,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
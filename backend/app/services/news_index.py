@@ -0,0 +1,395 @@
+"""Local per-symbol index of NewsAPI articles, filled incrementally.
+
+On-disk layout::
+
+    {NEWS_INDEX_DIR}/
+        company_names.json        # symbol -> company name, kept for good
+        articles/
+            {SYMBOL}.jsonl        # one {"id", "ts", "article"} record per line, append-only
+
+Articles are deduplicated by a hash of their URL (source, title and publish
+time when there is none), so overlapping fetches never store an article twice.
+Each symbol's articles are kept sorted by publish time (``ts``, seconds since
+the epoch) and time windows are answered with a binary search. Articles older
+than ``NEWS_RETENTION_DAYS`` are dropped when a symbol is loaded.
+
+``NewsIngestor`` keeps the index current: it looks a symbol's company name up
+once, then only asks NewsAPI for articles newer than the newest one it has,
+plus any older window a query reaches that was never fetched.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+
+# Re-fetch this far behind the newest indexed article; NewsAPI indexes some articles late
+INGEST_OVERLAP = 60 * 60
+
+def article_id(article: Dict[str, Any]) -> str:
+    url = (article.get("url") or "").strip().lower().rstrip("/")
+    if not url:
+        source = (article.get("source") or {}).get("name") or ""
+        url = f"{source}|{article.get('title') or ''}|{article.get('publishedAt') or ''}"
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+def published_ts(article: Dict[str, Any]) -> Optional[float]:
+    """``publishedAt`` (``2024-01-05T14:30:00Z``) as seconds since the epoch."""
+    published = article.get("publishedAt") or ""
+    try:
+        parsed = datetime.fromisoformat(published.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def to_ts(moment: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken as UTC."""
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
+def from_ts(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+class CompanyNames:
+    """Symbol -> company name, looked up once and kept in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._names: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        if self._names is None:
+            try:
+                with open(self.path) as f:
+                    self._names = json.load(f)
+            except (OSError, ValueError):
+                self._names = {}
+        return self._names
+
+    def get(self, symbol: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(symbol.upper())
+
+    def set(self, symbol: str, name: str) -> None:
+        with self._lock:
+            names = self._load()
+            names[symbol.upper()] = name
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(names, f, indent=0, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+class SymbolArticles:
+    """One symbol's articles sorted by publish time, plus what has been fetched for it."""
+
+    def __init__(self):
+        self.ts: List[float] = []
+        self.records: List[Dict[str, Any]] = []
+        self.ids: set = set()
+        # Oldest ``from`` fetched and the last ingest's wall-clock time; coverage before a
+        # restart is assumed to reach back to the oldest stored article
+        self.covered_from: Optional[float] = None
+        self.ingested_at = 0.0
+
+    def newest(self) -> Optional[float]:
+        return self.ts[-1] if self.ts else None
+
+class NewsIndex:
+    """Deduplicated, time-sorted article store per symbol (see module docstring).
+
+    Methods do blocking file IO; call them off the event loop.
+    """
+
+    def __init__(self, root: str, retention_days: float = settings.NEWS_RETENTION_DAYS):
+        self.root = root
+        self.retention = retention_days * 86400
+        self._symbols: Dict[str, SymbolArticles] = {}
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str) -> str:
+        safe_symbol = re.sub(r"[^A-Z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.root, "articles", f"{safe_symbol}.jsonl")
+
+    def load(self, symbol: str) -> SymbolArticles:
+        """A symbol's articles, read from disk on first use."""
+        symbol = symbol.upper()
+        with self._lock:
+            entry = self._symbols.get(symbol)
+            if entry is None:
+                entry = self._symbols[symbol] = self._read(symbol)
+            return entry
+
+    def _read(self, symbol: str) -> SymbolArticles:
+        entry = SymbolArticles()
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return entry
+        cutoff = time.time() - self.retention
+        records, expired = {}, 0
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of an interrupted append
+                if record["ts"] < cutoff:
+                    expired += 1
+                else:
+                    records[record["id"]] = record
+        ordered = sorted(records.values(), key=lambda record: record["ts"])
+        entry.records = ordered
+        entry.ts = [record["ts"] for record in ordered]
+        entry.ids = set(records)
+        entry.covered_from = entry.ts[0] if entry.ts else None
+        if expired:
+            self._write(path, ordered)
+        return entry
+
+    def _write(self, path: str, records: Iterable[Dict[str, Any]]) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        os.replace(tmp_path, path)
+
+    def add(self, symbol: str, articles: Iterable[Dict[str, Any]]) -> int:
+        """Index new articles and append them to the symbol's file; returns how many were new."""
+        entry = self.load(symbol)
+        cutoff = time.time() - self.retention
+        fresh: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for article in articles:
+                ts = published_ts(article)
+                key = article_id(article)
+                if ts is None or ts < cutoff or key in entry.ids or key in fresh:
+                    continue
+                fresh[key] = {"id": key, "ts": ts, "article": article}
+            if not fresh:
+                return 0
+
+            records = sorted(fresh.values(), key=lambda record: record["ts"])
+            if entry.ts and records[0]["ts"] < entry.ts[-1]:
+                entry.records = sorted(entry.records + records, key=lambda record: record["ts"])
+            else:
+                entry.records.extend(records)
+            entry.ts = [record["ts"] for record in entry.records]
+            entry.ids.update(fresh)
+
+            path = self.path(symbol)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a") as f:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+        return len(records)
+
+    def query(
+        self,
+        symbol: str,
+        since: float,
+        until: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Articles published in ``[since, until]``, newest first."""
+        entry = self.load(symbol)
+        with self._lock:
+            start = bisect.bisect_left(entry.ts, since)
+            end = len(entry.ts) if until is None else bisect.bisect_right(entry.ts, until)
+            if limit:
+                start = max(start, end - limit)
+            return [record["article"] for record in reversed(entry.records[start:end])]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "symbols_loaded": len(self._symbols),
+                "articles": sum(len(entry.ts) for entry in self._symbols.values())
+            }
+
+class NewsIngestor:
+    """Keep ``NewsIndex`` current from NewsAPI with as few calls as possible.
+
+    A symbol is re-fetched at most every ``refresh_interval`` seconds, and then
+    only from just before its newest indexed article. A query reaching further
+    back than anything fetched so far backfills that window in the same pass.
+    Each window's result pages are fetched concurrently; concurrent ingests of
+    one symbol share a single pass.
+    """
+
+    def __init__(
+        self,
+        news_service: Any,
+        alpha_vantage_service: Any,
+        index: NewsIndex,
+        names: CompanyNames,
+        refresh_interval: float = settings.NEWS_REFRESH_INTERVAL,
+        max_pages: int = settings.NEWS_MAX_PAGES,
+        page_size: int = settings.NEWS_PAGE_SIZE
+    ):
+        self.news_service = news_service
+        self.alpha_vantage_service = alpha_vantage_service
+        self.index = index
+        self.names = names
+        self.refresh_interval = refresh_interval
+        self.max_pages = max_pages
+        self.page_size = page_size
+        self._inflight = SingleFlight()
+        self.ingests = 0
+        self.calls = 0
+        self.added = 0
+        self.name_lookups = 0
+
+    async def company_name(self, symbol: str) -> str:
+        """The company name NewsAPI is searched for; the symbol itself until one is known."""
+        name = await asyncio.to_thread(self.names.get, symbol)
+        if name:
+            return name
+        self.name_lookups += 1
+        overview = await self.alpha_vantage_service.get_company_overview(symbol)
+        name = overview.get("Name") if isinstance(overview, dict) else None
+        if not name:
+            return symbol.upper()
+        await asyncio.to_thread(self.names.set, symbol, name)
+        return name
+
+    def _windows(self, entry: SymbolArticles, since: float, now: float) -> List[Tuple[float, Optional[float]]]:
+        if entry.covered_from is None:
+            return [(since, None)]
+        windows: List[Tuple[float, Optional[float]]] = []
+        if now - entry.ingested_at >= self.refresh_interval:
+            newest = entry.newest()
+            windows.append((max(newest - INGEST_OVERLAP, since) if newest else since, None))
+        if since < entry.covered_from:
+            windows.append((since, entry.covered_from))
+        return windows
+
+    async def _fetch_window(
+        self,
+        query: str,
+        since: float,
+        until: Optional[float]
+    ) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Articles of one window (up to ``max_pages`` pages) and how far back they cover it.
+
+        NewsAPI returns the newest articles first. Results cut short by
+        ``max_pages``, or by a later page failing (e.g. ``maximumResultsReached``
+        on the developer plan), keep every page that arrived but only cover the
+        window back to the oldest article of the unbroken run from page 1; the
+        coverage is None when nothing was covered. Raises ``ValueError`` when the
+        first page fails.
+        """
+        async def page(number: int) -> Dict[str, Any]:
+            self.calls += 1
+            data = await self.news_service.get_articles(
+                query, from_ts(since), from_ts(until) if until else None, page=number, page_size=self.page_size
+            )
+            if data.get("status") == "error":
+                raise ValueError(data.get("message") or data.get("code") or "NewsAPI error")
+            return data
+
+        first = await page(1)
+        total_pages = math.ceil(first.get("totalResults", 0) / self.page_size)
+        rest = await asyncio.gather(
+            *(page(number) for number in range(2, min(self.max_pages, total_pages) + 1)),
+            return_exceptions=True
+        )
+        pages = [first, *rest]
+        unbroken = next((i for i, data in enumerate(pages) if isinstance(data, BaseException)), len(pages))
+        articles = [
+            article for data in pages if not isinstance(data, BaseException) for article in data.get("articles") or []
+        ]
+        if unbroken >= total_pages:
+            return articles, since
+
+        published = [published_ts(article) for data in pages[:unbroken] for article in data.get("articles") or []]
+        return articles, min((ts for ts in published if ts is not None), default=until)
+
+    async def ingest(self, symbol: str, since: float) -> Dict[str, Any]:
+        """Bring ``symbol`` up to date back to ``since``; ``{"fetched", "added"}`` or ``{"error": ...}``."""
+        symbol = symbol.upper()
+        # Requests reaching back to the same hour share one pass
+        return await self._inflight.do((symbol, int(since // 3600)), lambda: self._ingest(symbol, since))
+
+    async def _ingest(self, symbol: str, since: float) -> Dict[str, Any]:
+        entry = await asyncio.to_thread(self.index.load, symbol)
+        now = time.time()
+        windows = self._windows(entry, since, now)
+        if not windows:
+            return {"fetched": 0, "added": 0}
+
+        query = await self.company_name(symbol)
+        try:
+            results = await asyncio.gather(*(self._fetch_window(query, start, end) for start, end in windows))
+        except Exception as e:
+            return {"error": str(e)}
+
+        articles = [article for window_articles, _ in results for article in window_articles]
+        added = await asyncio.to_thread(self.index.add, symbol, articles)
+        entry.covered_from = self._covered_from(entry.covered_from, windows, [start for _, start in results])
+        entry.ingested_at = now
+        self.ingests += 1
+        self.added += added
+        return {"fetched": len(articles), "added": added}
+
+    def _covered_from(
+        self,
+        covered_from: Optional[float],
+        windows: List[Tuple[float, Optional[float]]],
+        fetched_from: List[Optional[float]]
+    ) -> Optional[float]:
+        """Oldest time covered without gaps up to now after fetching ``windows``.
+
+        Windows start at or after ``since``; a truncated one only covers what it
+        returned. A refresh (open-ended window) cut short leaves the articles
+        between its oldest one and the previous newest unfetched, so coverage
+        restarts from what it returned and later passes backfill the rest.
+        """
+        for (start, until), window_from in zip(windows, fetched_from):
+            if until is None and window_from != start:
+                return window_from
+        covered = [start for start in fetched_from if start is not None]
+        if covered_from is not None:
+            covered.append(covered_from)
+        return min(covered) if covered else None
+
+    async def ingest_many(
+        self,
+        symbols: List[str],
+        days: float,
+        concurrency: int = settings.NEWS_INGEST_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """Ingest several symbols, at most ``concurrency`` at a time."""
+        semaphore = asyncio.Semaphore(concurrency)
+        since = time.time() - days * 86400
+
+        async def one(symbol: str) -> Tuple[str, Dict[str, Any]]:
+            async with semaphore:
+                return symbol.upper(), await self.ingest(symbol, since)
+
+        return dict(await asyncio.gather(*(one(symbol) for symbol in symbols)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.index.stats(),
+            "company_names": len(self.names),
+            "ingests": self.ingests,
+            "newsapi_calls": self.calls,
+            "articles_added": self.added,
+            "name_lookups": self.name_lookups,
+            "single_flight": self._inflight.stats()
+        }
+
+news_index = NewsIndex(settings.NEWS_INDEX_DIR)
+company_names = CompanyNames(os.path.join(settings.NEWS_INDEX_DIR, "company_names.json"))
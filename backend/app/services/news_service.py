@@ -1,12 +1,42 @@
+import asyncio
 import os
-import requests
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+from app.core.cache import make_cache_key
+from app.core.http_client import http_client
+from app.core.metrics import UPSTREAM_REQUESTS, UPSTREAM_SECONDS, timed
+from app.core.single_flight import SingleFlight
+from app.services.sentiment_engine import sentiment_engine
+
+# Batches at least this large are scored in a worker thread instead of on the event loop
+SENTIMENT_THREAD_BATCH = 1000
 
 class NewsService:
     def __init__(self):
         self.api_key = os.getenv("NEWS_API_KEY")
         self.base_url = "https://newsapi.org/v2"
+        self._inflight = SingleFlight()
+
+    async def _request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to a NewsAPI endpoint, sharing identical in-flight requests."""
+        data = await self._inflight.do(
+            make_cache_key(f"newsapi:{endpoint}", params),
+            lambda: self._fetch(endpoint, params)
+        )
+        # Callers annotate the payload (e.g. sentiment), so hand each one its own dict
+        return dict(data)
+
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            with timed(UPSTREAM_SECONDS, service="newsapi", endpoint=endpoint):
+                data = await http_client.get_json(f"{self.base_url}/{endpoint}", params=params)
+        except Exception:
+            UPSTREAM_REQUESTS.inc(service="newsapi", endpoint=endpoint, outcome="exception")
+            raise
+        UPSTREAM_REQUESTS.inc(
+            service="newsapi", endpoint=endpoint, outcome="error" if data.get("status") == "error" else "ok"
+        )
+        return data
 
     async def get_market_news(
         self,
@@ -31,8 +61,7 @@ class NewsService:
             "apiKey": self.api_key
         }
         
-        response = requests.get(f"{self.base_url}/everything", params=params)
-        return response.json()
+        return await self._request("everything", params)
 
     async def get_company_news(
         self,
@@ -52,8 +81,28 @@ class NewsService:
             "apiKey": self.api_key
         }
         
-        response = requests.get(f"{self.base_url}/everything", params=params)
-        return response.json()
+        return await self._request("everything", params)
+
+    async def get_articles(
+        self,
+        query: str,
+        since: datetime,
+        until: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 100
+    ) -> Dict[str, Any]:
+        """One page of articles matching ``query`` published between ``since`` and ``until`` (UTC)."""
+        params = {
+            "q": query,
+            "from": since.strftime("%Y-%m-%dT%H:%M:%S"),
+            "to": until.strftime("%Y-%m-%dT%H:%M:%S") if until else None,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "pageSize": page_size,
+            "page": page,
+            "apiKey": self.api_key
+        }
+        return await self._request("everything", params)
 
     async def get_top_business_news(self) -> Dict[str, Any]:
         """Get top business news headlines."""
@@ -63,52 +112,10 @@ class NewsService:
             "apiKey": self.api_key
         }
         
-        response = requests.get(f"{self.base_url}/top-headlines", params=params)
-        return response.json()
+        return await self._request("top-headlines", params)
 
     async def analyze_sentiment(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        Basic sentiment analysis of news articles.
-        This is a simple implementation that could be enhanced with more sophisticated NLP.
-        """
-        positive_words = {"up", "rise", "gain", "positive", "growth", "profit", "bullish"}
-        negative_words = {"down", "fall", "loss", "negative", "decline", "bearish"}
-        
-        sentiment_scores = []
-        
-        for article in articles:
-            title = article.get("title", "").lower()
-            description = article.get("description", "").lower()
-            content = f"{title} {description}"
-            
-            positive_count = sum(1 for word in positive_words if word in content)
-            negative_count = sum(1 for word in negative_words if word in content)
-            
-            if positive_count > negative_count:
-                sentiment = "positive"
-            elif negative_count > positive_count:
-                sentiment = "negative"
-            else:
-                sentiment = "neutral"
-                
-            sentiment_scores.append({
-                "title": article.get("title"),
-                "sentiment": sentiment,
-                "score": positive_count - negative_count
-            })
-            
-        return {
-            "articles": sentiment_scores,
-            "overall_sentiment": self._calculate_overall_sentiment(sentiment_scores)
-        }
-    
-    def _calculate_overall_sentiment(self, sentiment_scores: List[Dict[str, Any]]) -> str:
-        """Calculate overall sentiment from individual article sentiments."""
-        positive_count = sum(1 for score in sentiment_scores if score["sentiment"] == "positive")
-        negative_count = sum(1 for score in sentiment_scores if score["sentiment"] == "negative")
-        
-        if positive_count > negative_count:
-            return "positive"
-        elif negative_count > positive_count:
-            return "negative"
-        return "neutral" 
\ No newline at end of file
+        """Lexicon sentiment of each article's title and description (see ``sentiment_engine``)."""
+        if len(articles) >= SENTIMENT_THREAD_BATCH:
+            return await asyncio.to_thread(sentiment_engine.analyze, articles)
+        return sentiment_engine.analyze(articles)
@@ -0,0 +1,211 @@
+"""Local on-disk OHLCV store, one memory-mapped NumPy file per symbol and interval.
+
+On-disk layout::
+
+    {OHLCV_STORE_DIR}/
+        {source}/                 # e.g. "yfinance" (adjusted) or "alphavantage" (raw)
+            {interval}/           # e.g. "1d"
+                {SYMBOL}.bars     # fixed-width little-endian records, oldest first
+
+Each record is ``BAR_DTYPE``: ``ts`` (int64 nanoseconds since the epoch, UTC)
+followed by open, high, low, close and volume as float64, 48 bytes per bar.
+Files have no header, so appending is a plain write at the end and readers map
+the file with ``np.memmap`` and slice it without copying. Sources are kept
+apart because adjusted and unadjusted prices must never be mixed in one file.
+
+Appends only ever add bars newer than the last stored one; a bar with the same
+timestamp as the last record replaces it in place (the current session's bar is
+revised until the close). ``compact`` rewrites a file sorted and de-duplicated
+and drops a torn trailing record left by an interrupted write.
+"""
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+
+BAR_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+FRAME_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+EMPTY_BARS = np.empty(0, dtype=BAR_DTYPE)
+
+def to_utc_ns(timestamp: Any) -> int:
+    """Nanoseconds since the epoch for a naive (assumed UTC) or tz-aware timestamp."""
+    timestamp = pd.Timestamp(timestamp)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tz is None else timestamp.tz_convert("UTC")
+    return timestamp.value
+
+def frame_to_bars(frame: pd.DataFrame) -> np.ndarray:
+    """Convert an OHLCV frame (yfinance column names, datetime index) to records."""
+    if frame.empty:
+        return EMPTY_BARS
+    index = pd.DatetimeIndex(frame.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars['ts'] = index.asi8
+    for field, column in FRAME_COLUMNS.items():
+        bars[field] = frame[column].to_numpy(dtype=float)
+    return bars
+
+def bars_to_frame(bars: np.ndarray) -> pd.DataFrame:
+    """Convert records to an OHLCV frame with a UTC ``DatetimeIndex``."""
+    index = pd.DatetimeIndex(pd.to_datetime(bars['ts'], utc=True))
+    return pd.DataFrame(
+        {column: bars[field] for field, column in FRAME_COLUMNS.items()},
+        index=index
+    )
+
+class OHLCVStore:
+    """Append-only per-symbol bar files with zero-copy reads (see module docstring)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, source: str, interval: str, symbol: str) -> str:
+        safe_symbol = re.sub(r"[^A-Z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.root, source, interval, f"{safe_symbol}.bars")
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def read(
+        self,
+        source: str,
+        interval: str,
+        symbol: str,
+        start: Optional[pd.Timestamp] = None
+    ) -> np.ndarray:
+        """Return stored bars (from ``start`` on) as a read-only memory-mapped view."""
+        path = self.path(source, interval, symbol)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        count = size // BAR_DTYPE.itemsize
+        if count == 0:
+            return EMPTY_BARS
+
+        bars = np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+        if start is not None:
+            bars = bars[np.searchsorted(bars['ts'], to_utc_ns(start)):]
+        return bars
+
+    def read_frame(
+        self,
+        source: str,
+        interval: str,
+        symbol: str,
+        start: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        return bars_to_frame(self.read(source, interval, symbol, start))
+
+    def last_timestamp(self, source: str, interval: str, symbol: str) -> Optional[pd.Timestamp]:
+        bars = self.read(source, interval, symbol)
+        if len(bars) == 0:
+            return None
+        return pd.Timestamp(int(bars['ts'][-1]), tz="UTC")
+
+    def append(self, source: str, interval: str, symbol: str, bars: np.ndarray) -> int:
+        """Append bars newer than the stored tail; returns how many records were written.
+
+        A bar with the tail's timestamp overwrites the tail. Older bars are ignored.
+        """
+        if len(bars) == 0:
+            return 0
+        bars = np.sort(bars, order='ts', kind='stable')
+        path = self.path(source, interval, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._lock(path):
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            count = size // BAR_DTYPE.itemsize
+            with open(path, 'r+b' if size else 'wb') as f:
+                last_ts = None
+                if count:
+                    f.seek((count - 1) * BAR_DTYPE.itemsize)
+                    last_ts = int(np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)['ts'][0])
+
+                written = 0
+                if last_ts is not None:
+                    same = bars[bars['ts'] == last_ts]
+                    if len(same):
+                        f.seek((count - 1) * BAR_DTYPE.itemsize)
+                        f.write(same[-1:].tobytes())
+                        written += 1
+                    bars = bars[bars['ts'] > last_ts]
+
+                # Keep the last of any duplicate timestamps within the batch
+                if len(bars):
+                    keep = np.append(bars['ts'][1:] != bars['ts'][:-1], True)
+                    bars = bars[keep]
+                    f.seek(count * BAR_DTYPE.itemsize)  # also overwrites a torn tail
+                    f.write(bars.tobytes())
+                    f.truncate()
+                    written += len(bars)
+            return written
+
+    def replace(self, source: str, interval: str, symbol: str, bars: np.ndarray) -> None:
+        """Atomically replace a symbol's file (e.g. after a split re-adjusts history)."""
+        path = self.path(source, interval, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        bars = np.sort(bars, order='ts', kind='stable')
+        if len(bars):
+            keep = np.append(bars['ts'][1:] != bars['ts'][:-1], True)
+            bars = bars[keep]
+        with self._lock(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(bars.tobytes())
+            os.replace(tmp_path, path)
+
+    def compact(self, source: Optional[str] = None) -> Dict[str, Any]:
+        """Rewrite every file sorted and de-duplicated, dropping torn trailing bytes."""
+        compacted: List[str] = []
+        reclaimed = 0
+        for dirpath, _, filenames in os.walk(self.root if source is None else os.path.join(self.root, source)):
+            for filename in filenames:
+                if not filename.endswith(".bars"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                with self._lock(path):
+                    raw = np.fromfile(path, dtype=np.uint8)
+                    usable = len(raw) - len(raw) % BAR_DTYPE.itemsize
+                    bars = np.sort(raw[:usable].view(BAR_DTYPE), order='ts', kind='stable')
+                    if len(bars):
+                        # Stable sort keeps file order, so the last write of a timestamp wins
+                        keep = np.append(bars['ts'][1:] != bars['ts'][:-1], True)
+                        bars = bars[keep]
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.write(bars.tobytes())
+                    os.replace(tmp_path, path)
+                reclaimed += len(raw) - bars.nbytes
+                compacted.append(os.path.relpath(path, self.root))
+        return {"files": len(compacted), "bytes_reclaimed": int(reclaimed)}
+
+    def stats(self) -> Dict[str, Any]:
+        files = 0
+        total_bytes = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".bars"):
+                    files += 1
+                    total_bytes += os.path.getsize(os.path.join(dirpath, filename))
+        return {
+            "root": self.root,
+            "files": files,
+            "bars": total_bytes // BAR_DTYPE.itemsize,
+            "bytes": total_bytes
+        }
+
+ohlcv_store = OHLCVStore(settings.OHLCV_STORE_DIR)
@@ -0,0 +1,338 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import database
+from app.models.stock import Stock, StockPrediction
+
+# prediction_type of the per-day vectors written by /predictions
+DAILY_PREDICTION_TYPE = "daily"
+
+# Alpha Vantage "Global Quote" field -> stocks column
+QUOTE_COLUMNS = {
+    "02. open": "current_open",
+    "03. high": "current_high",
+    "04. low": "current_low",
+    "05. price": "current_price",
+    "08. previous close": "previous_close",
+}
+
+def quote_to_row(symbol: str, quote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map a GLOBAL_QUOTE payload to a ``stocks`` row, or None if it has no usable price."""
+    fields = quote.get("Global Quote") or {}
+    try:
+        row = {column: float(fields[key]) for key, column in QUOTE_COLUMNS.items() if key in fields}
+        if "06. volume" in fields:
+            row["current_volume"] = int(float(fields["06. volume"]))
+    except (TypeError, ValueError):
+        return None
+    if "current_price" not in row:
+        return None
+    row["symbol"] = symbol.upper()
+    row["last_updated"] = fields.get("07. latest trading day")
+    return row
+
+def _price_field(value: Optional[float]) -> Optional[str]:
+    # A missing price stays missing rather than reading as a real 0.0000
+    return f"{value:.4f}" if value is not None else None
+
+def row_to_quote(stock: Stock) -> Dict[str, Any]:
+    """Render a ``stocks`` row in the GLOBAL_QUOTE JSON shape; fields never stored are None."""
+    price = stock.current_price
+    previous_close = stock.previous_close
+    quote = {
+        "01. symbol": stock.symbol,
+        "02. open": _price_field(stock.current_open),
+        "03. high": _price_field(stock.current_high),
+        "04. low": _price_field(stock.current_low),
+        "05. price": _price_field(price),
+        "06. volume": str(stock.current_volume) if stock.current_volume is not None else None,
+        "07. latest trading day": stock.last_updated,
+        "08. previous close": _price_field(previous_close),
+    }
+    if previous_close:
+        quote["09. change"] = f"{price - previous_close:.4f}"
+        quote["10. change percent"] = f"{(price - previous_close) / previous_close * 100:.4f}%"
+    return {"Global Quote": quote}
+
+def _insert(session: AsyncSession, table):
+    # ON CONFLICT upserts exist in both dialects we run on, with the same API
+    return (postgresql if session.bind.dialect.name == "postgresql" else sqlite).insert(table)
+
+class PersistenceService:
+    """Write-behind persistence of quotes and prediction vectors, plus fresh-enough reads.
+
+    Endpoints hand results to ``record_*`` without waiting on the database; a
+    background task flushes the buffers every ``flush_interval`` seconds (or as
+    soon as ``batch_size`` entries are pending) as a few multi-row upserts.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._predictions: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return database.enabled
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _pending(self) -> int:
+        return len(self._quotes) + len(self._predictions)
+
+    def record_quote(self, symbol: str, quote: Dict[str, Any]) -> None:
+        """Buffer a refreshed quote; only the latest one per symbol is written."""
+        if not self.enabled:
+            return
+        row = quote_to_row(symbol, quote)
+        if row is not None:
+            self._quotes[row["symbol"]] = row
+            if self._pending() >= self.batch_size:
+                self._wakeup.set()
+
+    def record_predictions(self, symbol: str, result: Dict[str, Any], model_used: str) -> None:
+        """Buffer a ``predict_future_prices`` result for the ``stock_predictions`` table."""
+        if not self.enabled or not result.get("predictions"):
+            return
+        self._predictions[symbol.upper()] = {**result, "model_used": model_used}
+        if self._pending() >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Upsert everything buffered; returns the number of rows written."""
+        if not self.enabled:
+            return 0
+        async with self._flush_lock:
+            quotes, self._quotes = self._quotes, {}
+            predictions, self._predictions = self._predictions, {}
+            if not quotes and not predictions:
+                return 0
+
+            try:
+                async with database.sessionmaker() as session:
+                    written = await self.upsert_quotes(session, list(quotes.values()))
+                    written += await self.upsert_predictions(session, predictions)
+                    await session.commit()
+            except Exception as e:
+                # Keep the newest data for the next attempt unless a fresher entry arrived meanwhile
+                self.failed_flushes += 1
+                self._quotes = {**quotes, **self._quotes}
+                self._predictions = {**predictions, **self._predictions}
+                print(f"Error persisting quotes/predictions: {e}")
+                return 0
+
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    async def upsert_quotes(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """Insert or update ``stocks`` rows keyed by symbol, ``batch_size`` rows per statement."""
+        now = datetime.utcnow()
+        columns = ["current_price", "current_open", "current_high", "current_low",
+                   "current_volume", "previous_close", "last_updated"]
+        rows = [{column: row.get(column) for column in ["symbol"] + columns} for row in rows]
+        for start in range(0, len(rows), self.batch_size):
+            chunk = [{**row, "created_at": now, "updated_at": now}
+                     for row in rows[start:start + self.batch_size]]
+            stmt = _insert(session, Stock.__table__).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["symbol"],
+                set_={column: stmt.excluded[column] for column in columns + ["updated_at"]}
+            )
+            await session.execute(stmt)
+        return len(rows)
+
+    async def upsert_predictions(self, session: AsyncSession, results: Dict[str, Dict[str, Any]]) -> int:
+        """Upsert per-day prediction rows and the summary columns on ``stocks``."""
+        if not results:
+            return 0
+        now = datetime.utcnow()
+        table = Stock.__table__
+
+        summaries = []
+        for symbol, result in results.items():
+            prices = [p["predicted_price"] for p in result["predictions"]]
+            current_price = float(result["current_price"])
+            summaries.append({
+                "symbol": symbol,
+                "predicted_price_7d": prices[6] if len(prices) >= 7 else None,
+                "predicted_price_30d": prices[29] if len(prices) >= 30 else None,
+                "prediction_confidence": float(np.mean([p["confidence"] for p in result["predictions"]])),
+                "prediction_trend": "bullish" if np.mean(prices) > current_price else "bearish",
+                "prediction_last_updated": now.isoformat(),
+                "created_at": now,
+                "updated_at": now
+            })
+        stmt = _insert(session, table).values(summaries)
+        # A 7-day request must not blank out the 30-day figure (and vice versa)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol"],
+            set_={
+                "predicted_price_7d": func.coalesce(stmt.excluded.predicted_price_7d, table.c.predicted_price_7d),
+                "predicted_price_30d": func.coalesce(stmt.excluded.predicted_price_30d, table.c.predicted_price_30d),
+                "prediction_confidence": stmt.excluded.prediction_confidence,
+                "prediction_trend": stmt.excluded.prediction_trend,
+                "prediction_last_updated": stmt.excluded.prediction_last_updated
+            }
+        )
+        await session.execute(stmt)
+
+        ids = dict((await session.execute(
+            select(table.c.symbol, table.c.id).where(table.c.symbol.in_(list(results)))
+        )).all())
+
+        rows = []
+        for symbol, result in results.items():
+            metadata = {
+                "current_price": float(result["current_price"]),
+                "forecast_mode": result.get("forecast_mode"),
+                "model_last_bar": result.get("model_last_bar"),
+                "model_stale": result.get("model_stale", False),
+                "model_accuracy": result.get("model_accuracy")
+            }
+            for horizon, prediction in enumerate(result["predictions"], start=1):
+                rows.append({
+                    "stock_id": ids[symbol],
+                    "prediction_date": prediction["date"],
+                    "predicted_price": float(prediction["predicted_price"]),
+                    "confidence_score": float(prediction["confidence"]),
+                    "prediction_type": DAILY_PREDICTION_TYPE,
+                    "model_used": result["model_used"],
+                    "prediction_metadata": {**metadata, "horizon": horizon},
+                    "created_at": now,
+                    "updated_at": now
+                })
+
+        update_columns = ["predicted_price", "confidence_score", "model_used", "prediction_metadata", "updated_at"]
+        for start in range(0, len(rows), self.batch_size):
+            stmt = _insert(session, StockPrediction.__table__).values(rows[start:start + self.batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["stock_id", "prediction_date", "prediction_type"],
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+            await session.execute(stmt)
+        return len(summaries) + len(rows)
+
+    async def get_fresh_quotes(
+        self,
+        session: AsyncSession,
+        symbols: List[str],
+        max_age: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Stored quotes refreshed within ``max_age`` seconds, keyed by the requested symbol."""
+        max_age = settings.QUOTE_DB_MAX_AGE if max_age is None else max_age
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        requested = {symbol.upper(): symbol for symbol in symbols}
+        stocks = (await session.execute(
+            select(Stock).where(
+                Stock.symbol.in_(list(requested)),
+                Stock.current_price.is_not(None),
+                Stock.updated_at >= cutoff
+            )
+        )).scalars().all()
+        return {requested[stock.symbol]: row_to_quote(stock) for stock in stocks}
+
+    async def get_fresh_quote(
+        self,
+        session: AsyncSession,
+        symbol: str,
+        max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The stored quote for ``symbol`` if it was refreshed within ``max_age`` seconds."""
+        return (await self.get_fresh_quotes(session, [symbol], max_age)).get(symbol)
+
+    async def get_fresh_predictions(
+        self,
+        session: AsyncSession,
+        symbol: str,
+        days: int,
+        model_used: str,
+        max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Stored predictions for the next ``days`` days if all were written within ``max_age``."""
+        max_age = settings.PREDICTION_DB_MAX_AGE if max_age is None else max_age
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        # Forecasts are dated from tomorrow on, in the same local calendar as predict_future_prices
+        first_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        rows = (await session.execute(
+            select(StockPrediction)
+            .join(Stock, StockPrediction.stock_id == Stock.id)
+            .where(
+                Stock.symbol == symbol.upper(),
+                StockPrediction.prediction_type == DAILY_PREDICTION_TYPE,
+                StockPrediction.prediction_date >= first_date
+            )
+            .order_by(StockPrediction.prediction_date)
+            .limit(days)
+        )).scalars().all()
+
+        if len(rows) < days or rows[0].prediction_date != first_date:
+            return None
+        if any(row.updated_at < cutoff or row.model_used != model_used for row in rows):
+            return None
+
+        metadata = rows[0].prediction_metadata or {}
+        return {
+            "symbol": symbol,
+            "current_price": metadata.get("current_price"),
+            "predictions": [
+                {
+                    "date": row.prediction_date,
+                    "predicted_price": row.predicted_price,
+                    "confidence": row.confidence_score
+                }
+                for row in rows
+            ],
+            "forecast_mode": metadata.get("forecast_mode"),
+            "model_version": rows[0].model_used,
+            "model_last_bar": metadata.get("model_last_bar"),
+            "model_stale": metadata.get("model_stale", False),
+            "model_accuracy": metadata.get("model_accuracy"),
+            "source": "database"
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending_quotes": len(self._quotes),
+            "pending_predictions": len(self._predictions),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rows_written": self.rows_written
+        }
+
+persistence_service = PersistenceService(settings.PERSIST_FLUSH_INTERVAL, settings.PERSIST_BATCH_SIZE)
@@ -1,71 +1,219 @@
 import os
+import asyncio
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import ta
 import yfinance as yf
+from app.core.config import settings
+from app.core.metrics import FEATURE_BUILD_SECONDS, MODEL_INFERENCE_SECONDS, MODEL_TRAIN_SECONDS, instrument, timed
+from app.core.single_flight import SingleFlight
+from app.services.feature_engine import (
+    INDICATOR_COLUMNS, PRICE_COLUMNS, compute_features, split_download
+)
+from app.services.incremental_features import FeatureStateStore
+from app.services.model_registry import ModelEntry, ModelRegistry
+from app.services.ohlcv_store import frame_to_bars, ohlcv_store, to_utc_ns
+from app.services.training_jobs import TrainingJobQueue
+from app.services.training_pool import forecast_recursive, training_pool
+
+# Bump whenever the feature set or estimator changes so old persisted models are ignored
+MODEL_VERSION = "rf-v1"
+DIRECT_MODEL_VERSION = "rf-direct-v1"
+
+# recursive: one next-day model rolled forward day by day
+# direct: one multi-output model predicting every horizon from the latest row at once
+FORECAST_MODES = ("recursive", "direct")
+MODEL_VERSIONS = {"recursive": MODEL_VERSION, "direct": DIRECT_MODEL_VERSION}
+# Longest forecast served (and the number of outputs of a direct model)
+MAX_HORIZON = 30
+
+FEATURE_COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS
+
+# yfinance daily bars (split/dividend adjusted) in the local OHLCV store
+STORE_SOURCE = "yfinance"
+STORE_INTERVAL = "1d"
+MARKET_TZ = "America/New_York"
+
+def market_date(ts: int):
+    """Exchange-local session date of a stored bar timestamp."""
+    return pd.Timestamp(ts, tz="UTC").tz_convert(MARKET_TZ).date()
 
 class PredictionService:
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.is_trained = False
+        self.registry = ModelRegistry(settings.MODEL_DIR, settings.MODEL_CACHE_BYTES)
+        self._inflight = SingleFlight()
+        self.feature_states = FeatureStateStore()
+        self.training_jobs = TrainingJobQueue(self.train_model)
 
     async def prepare_features(self, symbol: str, days: int = 60) -> pd.DataFrame:
-        """Prepare features for prediction model."""
-        try:
+        """Prepare features for prediction model.
+
+        The download and indicator build run on a worker thread; concurrent calls
+        for the same symbol and window share one build.
+        """
+        df = await self._inflight.do(
+            (symbol, days),
+            lambda: asyncio.to_thread(self._build_features, symbol, days)
+        )
+        # Callers add columns (e.g. the training target), so never share the frame
+        return df.copy()
+
+    def _top_up_plan(self, symbol: str, days: int) -> Optional[Tuple[int, float]]:
+        """Timestamp and close of the stored bar a top-up re-fetches from, or None for a full download.
+
+        The re-fetch starts at the second-to-last bar: the last one may still be
+        revised, and a changed earlier close means yfinance re-adjusted history
+        (split/dividend).
+        """
+        start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+        stored = ohlcv_store.read(STORE_SOURCE, STORE_INTERVAL, symbol)
+        # A full download when the store is empty or does not reach back far enough
+        if len(stored) < 2 or stored['ts'][0] > to_utc_ns(start + pd.Timedelta(days=7)):
+            return None
+        return int(stored['ts'][-2]), float(stored['close'][-2])
+
+    def _replace_history(self, symbol: str, days: int) -> None:
+        history = yf.Ticker(symbol).history(period=f"{max(days, settings.MODEL_HISTORY_DAYS)}d")
+        ohlcv_store.replace(STORE_SOURCE, STORE_INTERVAL, symbol, frame_to_bars(history))
+
+    def _apply_top_up(self, symbol: str, days: int, plan: Tuple[int, float], fresh: pd.DataFrame) -> None:
+        """Append freshly fetched bars, or re-download everything if the check bar's close changed."""
+        check_ts, check_close = plan
+        bars = frame_to_bars(fresh)
+        previous = bars[bars['ts'] == check_ts]
+        if len(previous) and not np.isclose(previous['close'][0], check_close, rtol=1e-6):
+            self._replace_history(symbol, days)
+        else:
+            ohlcv_store.append(STORE_SOURCE, STORE_INTERVAL, symbol, bars)
+
+    def _download_history(self, symbol: str, days: int) -> pd.DataFrame:
+        """Get the last ``days`` of daily bars, downloading only what the local store lacks."""
+        plan = self._top_up_plan(symbol, days)
+        if plan is None:
+            self._replace_history(symbol, days)
+        else:
             # Get historical data using yfinance for more reliable data
-            ticker = yf.Ticker(symbol)
-            hist_data = ticker.history(period=f"{days}d")
+            fresh = yf.Ticker(symbol).history(start=market_date(plan[0]).isoformat())
+            self._apply_top_up(symbol, days, plan, fresh)
+        return self._read_history(symbol, days)
+
+    def _read_history(self, symbol: str, days: int) -> pd.DataFrame:
+        start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+        df = ohlcv_store.read_frame(STORE_SOURCE, STORE_INTERVAL, symbol, start)
+        df.index = df.index.tz_convert(MARKET_TZ)
+        return df
+
+    def _download_many(self, symbols: List[str], **window) -> Dict[str, pd.DataFrame]:
+        """One ``yf.download`` for ``symbols``, split per symbol with market-time indexes."""
+        data = yf.download(
+            symbols,
+            group_by="ticker",
+            auto_adjust=True,  # match Ticker.history
+            threads=True,
+            progress=False,
+            **window
+        )
+        # yf.download returns naive session dates, Ticker.history localizes them to the
+        # exchange; both must map to the same stored timestamp
+        return {
+            symbol: history.tz_localize(MARKET_TZ) if history.index.tz is None else history.tz_convert(MARKET_TZ)
+            for symbol, history in split_download(data, symbols).items()
+        }
+
+    def _download_histories(self, symbols: List[str], days: int) -> Dict[str, pd.DataFrame]:
+        """``_download_history`` for many symbols with at most two batched downloads."""
+        plans = {symbol: self._top_up_plan(symbol, days) for symbol in symbols}
+        full = [symbol for symbol, plan in plans.items() if plan is None]
+        top_up = {symbol: plan for symbol, plan in plans.items() if plan is not None}
+
+        if full:
+            period = f"{max(days, settings.MODEL_HISTORY_DAYS)}d"
+            for symbol, history in self._download_many(full, period=period).items():
+                if not history.empty:
+                    ohlcv_store.replace(STORE_SOURCE, STORE_INTERVAL, symbol, frame_to_bars(history))
+        if top_up:
+            # From the oldest check bar; append ignores what a symbol already has
+            since = min(market_date(check_ts) for check_ts, _ in top_up.values())
+            fresh = self._download_many(list(top_up), start=since.isoformat())
+            for symbol, plan in top_up.items():
+                if symbol in fresh:
+                    self._apply_top_up(symbol, days, plan, fresh[symbol])
+
+        histories = {symbol: self._read_history(symbol, days) for symbol in symbols}
+        return {symbol: history for symbol, history in histories.items() if not history.empty}
+
+    @instrument(FEATURE_BUILD_SECONDS, kind="symbol")
+    def _build_features(self, symbol: str, days: int) -> pd.DataFrame:
+        try:
+            hist_data = self._download_history(symbol, days)
             
             if hist_data.empty:
                 return pd.DataFrame()
             
-            # Calculate technical indicators
-            df = hist_data.copy()
-            
-            # Moving averages
-            df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-            df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-            df['EMA_12'] = ta.trend.ema_indicator(df['Close'], window=12)
-            df['EMA_26'] = ta.trend.ema_indicator(df['Close'], window=26)
-            
-            # MACD
-            df['MACD'] = ta.trend.macd_diff(df['Close'])
-            df['MACD_signal'] = ta.trend.macd_signal(df['Close'])
-            
-            # RSI
-            df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
-            
-            # Bollinger Bands
-            df['BB_upper'] = ta.volatility.bollinger_hband(df['Close'])
-            df['BB_lower'] = ta.volatility.bollinger_lband(df['Close'])
-            df['BB_middle'] = ta.volatility.bollinger_mavg(df['Close'])
-            
-            # Volume indicators
-            df['Volume_SMA'] = ta.volume.volume_sma(df['Close'], df['Volume'])
-            
-            # Price changes
-            df['Price_Change'] = df['Close'].pct_change()
-            df['Price_Change_5'] = df['Close'].pct_change(periods=5)
-            df['Price_Change_10'] = df['Close'].pct_change(periods=10)
-            
-            # Volatility
-            df['Volatility'] = df['Price_Change'].rolling(window=20).std()
-            
-            # Remove NaN values
-            df = df.dropna()
-            
-            return df
+            # Calculate technical indicators (same values as the per-indicator ta calls)
+            return compute_features(hist_data)
             
         except Exception as e:
             print(f"Error preparing features: {e}")
             return pd.DataFrame()
 
+    async def load_history(self, symbol: str, days: int) -> pd.DataFrame:
+        """Get the last ``days`` of daily bars, topping up the local store first."""
+        return await asyncio.to_thread(self._download_history, symbol, days)
+
+    async def latest_features(self, symbol: str) -> pd.DataFrame:
+        """Feature row of ``symbol``'s latest bar as a one-row frame (empty without data).
+
+        Equals the last row of ``prepare_features``, but the indicators are
+        advanced from the previous call's state instead of recomputed over the
+        whole history. Concurrent calls for the same symbol share one update.
+        """
+        df = await self._inflight.do(
+            ("latest", symbol.upper()),
+            lambda: asyncio.to_thread(self._build_latest_features, symbol)
+        )
+        return df.copy()
+
+    @instrument(FEATURE_BUILD_SECONDS, kind="latest")
+    def _build_latest_features(self, symbol: str) -> pd.DataFrame:
+        try:
+            return self._latest_row(symbol, self._download_history(symbol, settings.MODEL_HISTORY_DAYS))
+        except Exception as e:
+            print(f"Error preparing features: {e}")
+            return pd.DataFrame()
+
+    async def latest_features_many(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """``latest_features`` for many symbols with batched store top-ups.
+
+        Symbols without data are left out of the result.
+        """
+        return await asyncio.to_thread(self._build_latest_features_many, symbols)
+
+    @instrument(FEATURE_BUILD_SECONDS, kind="panel")
+    def _build_latest_features_many(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        try:
+            histories = self._download_histories(symbols, settings.MODEL_HISTORY_DAYS)
+            rows = {symbol: self._latest_row(symbol, history) for symbol, history in histories.items()}
+            return {symbol: row for symbol, row in rows.items() if not row.empty}
+        except Exception as e:
+            print(f"Error preparing feature panel: {e}")
+            return {}
+
+    def _latest_row(self, symbol: str, history: pd.DataFrame) -> pd.DataFrame:
+        """Apply ``history``'s new bars to the symbol's incremental state and return the last row.
+
+        The kept state stops one bar short: yfinance may still revise the latest
+        bar, so it is only applied to a throwaway copy.
+        """
+        if len(history) < 2:
+            return pd.DataFrame()
+        state = self.feature_states.sync(symbol, history.iloc[:-1])
+        row = state.update(history[PRICE_COLUMNS].iloc[-1].to_dict(), history.index[-1])
+        if row is None:
+            return pd.DataFrame()
+        return pd.DataFrame([row], index=history.index[-1:], columns=FEATURE_COLUMNS)
+
     async def get_demo_predictions(self, symbol: str, days: int = 7) -> Dict[str, Any]:
         """Get demo predictions for testing without API keys."""
         current_price = 150.0  # Demo current price
@@ -132,144 +280,243 @@ class PredictionService:
             "demo_mode": True
         }
 
-    async def train_model(self, symbol: str) -> Dict[str, Any]:
-        """Train the prediction model for a specific stock."""
+    async def train_model(self, symbol: str, mode: str = "recursive") -> Dict[str, Any]:
+        """Train the prediction model for a specific stock and store it in the registry.
+
+        ``mode="direct"`` fits one multi-output model with a target per horizon
+        (the close 1..MAX_HORIZON days ahead) instead of the next-day model.
+        """
         try:
             # Check if we have API keys for real data
             if not os.getenv("ALPHA_VANTAGE_API_KEY") or os.getenv("ALPHA_VANTAGE_API_KEY") == "demo_key":
                 return {"error": "API key required for real predictions. Using demo mode."}
             
             # Prepare features
-            df = await self.prepare_features(symbol)
+            df = await self.prepare_features(symbol, settings.MODEL_HISTORY_DAYS)
             
             if df.empty:
                 return {"error": "No data available for training"}
             
-            # Define features (excluding target variable)
-            feature_columns = [
-                'Open', 'High', 'Low', 'Close', 'Volume',
-                'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
-                'MACD', 'MACD_signal', 'RSI',
-                'BB_upper', 'BB_lower', 'BB_middle',
-                'Volume_SMA', 'Price_Change', 'Price_Change_5',
-                'Price_Change_10', 'Volatility'
-            ]
+            last_bar = df.index[-1].date()
             
-            # Create target variable (next day's close price)
-            df['Target'] = df['Close'].shift(-1)
+            # Create target variables (close price 1 day, or 1..MAX_HORIZON days, ahead)
+            horizons = range(1, MAX_HORIZON + 1) if mode == "direct" else [1]
+            target_columns = [f'Target_{h}' for h in horizons] if mode == "direct" else ['Target']
+            for column, horizon in zip(target_columns, horizons):
+                df[column] = df['Close'].shift(-horizon)
             
-            # Remove last row (no target) and first few rows (NaN from indicators)
+            # Remove last rows (no target) and first few rows (NaN from indicators)
             df = df.dropna()
             
             if len(df) < 30:  # Need sufficient data
                 return {"error": "Insufficient data for training"}
             
-            # Prepare X and y
-            X = df[feature_columns].values
-            y = df['Target'].values
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+            # Prepare X and y (one column per horizon in direct mode)
+            X = df[FEATURE_COLUMNS].values
+            y = df[target_columns].values if mode == "direct" else df['Target'].values
+            
+            # Split, scale and fit in the process pool so the event loop stays free
+            with timed(MODEL_TRAIN_SECONDS, mode=mode):
+                model, scaler, metrics = await training_pool.fit(X, y, FEATURE_COLUMNS.index('Close'))
+            entry = ModelEntry(
+                symbol=symbol.upper(),
+                version=MODEL_VERSIONS[mode],
+                model=model,
+                scaler=scaler,
+                feature_columns=list(FEATURE_COLUMNS),
+                last_bar=last_bar,
+                metrics=metrics
             )
-            
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            # Train model
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.model.fit(X_train_scaled, y_train)
-            
-            # Evaluate model
-            train_score = self.model.score(X_train_scaled, y_train)
-            test_score = self.model.score(X_test_scaled, y_test)
-            
-            self.is_trained = True
+            await asyncio.to_thread(self.registry.put, entry)
             
             return {
                 "success": True,
-                "train_score": train_score,
-                "test_score": test_score,
-                "model_info": f"RandomForest with {len(feature_columns)} features"
+                **metrics,
+                "last_bar": last_bar.isoformat(),
+                "model_version": MODEL_VERSIONS[mode],
+                "model_info": f"RandomForest with {len(FEATURE_COLUMNS)} features, "
+                              f"{len(target_columns)} horizon(s)"
             }
             
         except Exception as e:
             return {"error": f"Training failed: {str(e)}"}
 
-    async def predict_future_prices(self, symbol: str, days_ahead: int = 7) -> Dict[str, Any]:
-        """Predict future stock prices."""
+    async def get_model(self, symbol: str, mode: str = "recursive") -> Optional[ModelEntry]:
+        """Get the registered model for ``symbol`` (possibly stale), or None."""
+        return await asyncio.to_thread(self.registry.get, symbol, MODEL_VERSIONS[mode])
+
+    def enqueue_training(self, symbols: List[str], mode: str = "recursive") -> List[Dict[str, Any]]:
+        """Queue background training for ``symbols``; one active job per symbol and mode."""
+        return [self.training_jobs.enqueue(symbol, mode).to_dict() for symbol in symbols]
+
+    async def get_training_metrics(self, symbol: str, mode: str = "recursive") -> Dict[str, Any]:
+        """Get the train/test scores of the current model for ``symbol``."""
+        entry = await self.get_model(symbol, mode)
+        active = self.training_jobs.active_job(symbol, mode)
+        if entry is None:
+            if active is not None:
+                return {"symbol": symbol.upper(), "status": "training", "job": active.to_dict()}
+            return {"error": f"No trained model for {symbol}"}
+        return {
+            "symbol": entry.symbol,
+            "model_version": entry.version,
+            "last_bar": entry.last_bar.isoformat(),
+            "trained_at": entry.trained_at.isoformat(),
+            "metrics": entry.metrics,
+            "training_job": active.to_dict() if active is not None else None
+        }
+
+    async def predict_future_prices(
+        self,
+        symbol: str,
+        days_ahead: int = 7,
+        mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Predict future stock prices.
+
+        Never trains inside the request: without a model for ``symbol`` training is
+        queued and a ``"status": "training"`` payload is returned. A model that is
+        behind the latest bar keeps serving while a retrain runs in the background.
+        ``mode`` picks the recursive or direct forecast (default ``FORECAST_MODE``).
+        """
+        mode = mode or settings.FORECAST_MODE
         try:
             # Check if we have API keys for real data
             if not os.getenv("ALPHA_VANTAGE_API_KEY") or os.getenv("ALPHA_VANTAGE_API_KEY") == "demo_key":
                 return await self.get_demo_predictions(symbol, days_ahead)
             
-            if not self.is_trained:
-                # Train model first
-                train_result = await self.train_model(symbol)
-                if "error" in train_result:
-                    return train_result
+            entry = await self.get_model(symbol, mode)
+            if entry is None:
+                job = self.training_jobs.enqueue(symbol, mode)
+                return {"symbol": symbol, "status": "training", "job": job.to_dict()}
             
             # Get latest data for prediction
-            df = await self.prepare_features(symbol)
-            
-            if df.empty:
-                return {"error": "No data available for prediction"}
-            
-            # Get the most recent data point
-            latest_data = df.iloc[-1]
-            
-            # Prepare features for prediction
-            feature_columns = [
-                'Open', 'High', 'Low', 'Close', 'Volume',
-                'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
-                'MACD', 'MACD_signal', 'RSI',
-                'BB_upper', 'BB_lower', 'BB_middle',
-                'Volume_SMA', 'Price_Change', 'Price_Change_5',
-                'Price_Change_10', 'Volatility'
-            ]
-            
-            predictions = []
-            current_data = latest_data[feature_columns].values.reshape(1, -1)
-            
-            for day in range(1, days_ahead + 1):
-                # Scale the current data
-                current_scaled = self.scaler.transform(current_data)
-                
-                # Make prediction
-                predicted_price = self.model.predict(current_scaled)[0]
-                
-                # Add prediction to list
-                prediction_date = datetime.now() + timedelta(days=day)
-                predictions.append({
-                    "date": prediction_date.strftime("%Y-%m-%d"),
-                    "predicted_price": round(predicted_price, 2),
-                    "confidence": self._calculate_confidence(predicted_price, latest_data['Close'])
-                })
-                
-                # Update current data for next prediction (simplified approach)
-                # In a more sophisticated model, you'd update all features
-                current_data[0][3] = predicted_price  # Update Close price
-            
-            return {
-                "symbol": symbol,
-                "current_price": latest_data['Close'],
-                "predictions": predictions,
-                "model_accuracy": self.model.score(
-                    self.scaler.transform(df[feature_columns].values),
-                    df['Close'].values
-                ) if 'Target' in df.columns else None
-            }
+            df = await self.latest_features(symbol)
+            return await self._predict_with_model(symbol, entry, df, days_ahead, mode)
             
         except Exception as e:
             return {"error": f"Prediction failed: {str(e)}"}
 
+    async def _predict_with_model(
+        self,
+        symbol: str,
+        entry: ModelEntry,
+        df: pd.DataFrame,
+        days_ahead: int,
+        mode: str = "recursive"
+    ) -> Dict[str, Any]:
+        """Forecast ``days_ahead`` days from the last row of a prepared feature frame."""
+        if df.empty:
+            return {"error": "No data available for prediction"}
+        
+        # Serve the last good model and refresh it once a newer bar has arrived
+        model_stale = entry.is_stale(df.index[-1].date())
+        if model_stale:
+            self.training_jobs.enqueue(symbol, mode)
+        
+        # Get the most recent data point
+        latest_data = df.iloc[-1]
+        
+        # The forecast is CPU work, keep it off the event loop
+        predicted_prices = await asyncio.to_thread(
+            self._forecast_direct if mode == "direct" else self._forecast_recursive,
+            entry,
+            latest_data[entry.feature_columns].values.reshape(1, -1),
+            days_ahead
+        )
+        
+        predictions = []
+        for day, predicted_price in enumerate(predicted_prices, start=1):
+            prediction_date = datetime.now() + timedelta(days=day)
+            predictions.append({
+                "date": prediction_date.strftime("%Y-%m-%d"),
+                "predicted_price": round(predicted_price, 2),
+                "confidence": self._calculate_confidence(predicted_price, latest_data['Close'])
+            })
+        
+        return {
+            "symbol": symbol,
+            "current_price": latest_data['Close'],
+            "predictions": predictions,
+            "forecast_mode": mode,
+            "model_version": entry.version,
+            "model_last_bar": entry.last_bar.isoformat(),
+            "model_stale": model_stale,
+            # Directional accuracy on the chronological holdout at training time
+            "model_accuracy": entry.metrics.get("directional_accuracy")
+        }
+
+    async def predict_batch(
+        self,
+        symbols: List[str],
+        days_ahead: int = 7,
+        mode: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Predict many symbols, yielding each result as soon as it is ready.
+
+        Models are loaded concurrently and the store is topped up for every symbol
+        with a model in one batched download (see ``latest_features_many``).
+        Symbols without a model yield a ``"status": "training"`` payload first.
+        """
+        mode = mode or settings.FORECAST_MODE
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        
+        if not os.getenv("ALPHA_VANTAGE_API_KEY") or os.getenv("ALPHA_VANTAGE_API_KEY") == "demo_key":
+            for symbol in symbols:
+                yield await self.get_demo_predictions(symbol, days_ahead)
+            return
+        
+        entries = await asyncio.gather(*(self.get_model(symbol, mode) for symbol in symbols))
+        models = {}
+        for symbol, entry in zip(symbols, entries):
+            if entry is None:
+                job = self.training_jobs.enqueue(symbol, mode)
+                yield {"symbol": symbol, "status": "training", "job": job.to_dict()}
+            else:
+                models[symbol] = entry
+        if not models:
+            return
+        
+        features = await self.latest_features_many(list(models))
+        
+        async def predict_one(symbol: str) -> Dict[str, Any]:
+            try:
+                result = await self._predict_with_model(
+                    symbol, models[symbol], features.get(symbol, pd.DataFrame()), days_ahead, mode
+                )
+            except Exception as e:
+                result = {"error": f"Prediction failed: {str(e)}"}
+            return {"symbol": symbol, **result}
+        
+        for result in asyncio.as_completed([predict_one(symbol) for symbol in models]):
+            yield await result
+
+    @instrument(MODEL_INFERENCE_SECONDS, mode="recursive")
+    def _forecast_recursive(self, entry: ModelEntry, current_data: np.ndarray, days_ahead: int) -> List[float]:
+        """Roll the one-day model forward ``days_ahead`` times from the latest feature row.
+
+        Each predicted price becomes the next row's Close (simplified approach; a more
+        sophisticated model would update all features). All steps come from one
+        batched ``predict`` call, see ``training_pool.forecast_recursive``.
+        """
+        return forecast_recursive(
+            entry.model,
+            entry.scaler,
+            current_data,
+            entry.feature_columns.index('Close'),
+            days_ahead
+        )
+
+    @instrument(MODEL_INFERENCE_SECONDS, mode="direct")
+    def _forecast_direct(self, entry: ModelEntry, current_data: np.ndarray, days_ahead: int) -> List[float]:
+        """Predict every horizon up to ``days_ahead`` from the latest row in one model pass."""
+        if days_ahead < 1:
+            raise ValueError("days_ahead must be at least 1")
+        predicted = entry.model.predict(entry.scaler.transform(current_data.astype(float)))[0]
+        if days_ahead > len(predicted):
+            raise ValueError(f"Direct model covers at most {len(predicted)} days")
+        return [float(price) for price in predicted[:days_ahead]]
+
     def _calculate_confidence(self, predicted_price: float, current_price: float) -> float:
         """Calculate confidence score based on prediction stability."""
         price_change_pct = abs(predicted_price - current_price) / current_price
@@ -293,7 +540,7 @@ class PredictionService:
             
             prediction_result = await self.predict_future_prices(symbol, 7)
             
-            if "error" in prediction_result:
+            if "error" in prediction_result or prediction_result.get("status") == "training":
                 return prediction_result
             
             predictions = prediction_result["predictions"]
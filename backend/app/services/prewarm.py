@@ -0,0 +1,226 @@
+import asyncio
+import hmac
+import time
+from collections import Counter
+from datetime import datetime, time as dt_time
+from typing import Dict, Any, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.core.config import settings
+from app.core.rate_limiter import PRIORITY_BULK, QuotaScheduler, upstream_priority
+from app.services.persistence_service import persistence_service
+
+MARKET_TZ = ZoneInfo("America/New_York")
+# Alpha Vantage calls one symbol costs when nothing is cached: quote, daily bars, overview
+CALLS_PER_SYMBOL = 3
+
+def parse_window(window: str) -> Tuple[dt_time, dt_time]:
+    """``"08:00-16:30"`` -> (08:00, 16:30) market-local times."""
+    start, end = window.split("-")
+    return dt_time.fromisoformat(start.strip()), dt_time.fromisoformat(end.strip())
+
+def authorized(token: Optional[str]) -> bool:
+    """True if ``token`` matches ``PREWARM_ADMIN_TOKEN``; never true while no token is configured."""
+    expected = settings.PREWARM_ADMIN_TOKEN
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+class SymbolPopularity:
+    """Request counts per symbol, halved on every pre-warm run so recent demand wins.
+
+    Counts are recorded whether or not pre-warming runs, so at most
+    ``max_symbols`` are kept: once exceeded, only the most requested half survive.
+    """
+
+    def __init__(self, max_symbols: int = settings.PREWARM_MAX_TRACKED):
+        self.max_symbols = max_symbols
+        self._counts: Counter = Counter()
+        self.evicted = 0
+
+    def record(self, symbol: str, weight: float = 1.0) -> None:
+        self._counts[symbol.upper()] += weight
+        if len(self._counts) > self.max_symbols:
+            keep = self._counts.most_common(max(1, self.max_symbols // 2))
+            self.evicted += len(self._counts) - len(keep)
+            self._counts = Counter(dict(keep))
+
+    def top(self, n: int) -> List[str]:
+        return [symbol for symbol, _ in self._counts.most_common(n)]
+
+    def decay(self, factor: float = 0.5) -> None:
+        self._counts = Counter({
+            symbol: count * factor for symbol, count in self._counts.items() if count * factor >= 0.1
+        })
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+symbol_popularity = SymbolPopularity()
+
+class Prewarmer:
+    """Refresh the hottest symbols ahead of users, inside a share of the call budget.
+
+    Every ``interval`` seconds within the market-local ``window`` on weekdays, the
+    pinned ``PREWARM_SYMBOLS`` and the ``top_n`` most requested symbols get their
+    quote, daily bars and overview re-fetched and a prediction computed (which
+    queues training when the model is missing or stale). Calls run at bulk
+    priority and a run stops once it has used its slice of ``quota_share`` of
+    the per-minute and per-day budget.
+    """
+
+    def __init__(
+        self,
+        alpha_vantage_service: Any,
+        prediction_service: Any,
+        quota: QuotaScheduler,
+        popularity: SymbolPopularity = symbol_popularity,
+        pinned: Optional[List[str]] = None,
+        top_n: int = settings.PREWARM_TOP_N,
+        interval: float = settings.PREWARM_INTERVAL,
+        window: str = settings.PREWARM_WINDOW,
+        quota_share: float = settings.PREWARM_QUOTA_SHARE
+    ):
+        self.alpha_vantage_service = alpha_vantage_service
+        self.prediction_service = prediction_service
+        self.quota = quota
+        self.popularity = popularity
+        self.pinned = [s.strip().upper() for s in (
+            pinned if pinned is not None else settings.PREWARM_SYMBOLS.split(",")
+        ) if s.strip()]
+        self.top_n = top_n
+        self.interval = interval
+        self.window = parse_window(window)
+        self.quota_share = quota_share
+        self._task: Optional[asyncio.Task] = None
+        # Scheduled and manual runs never overlap
+        self._run_lock = asyncio.Lock()
+        self._day: Optional[str] = None
+        self._day_calls = 0
+
+        self.runs = 0
+        self.warmed = 0
+        self.skipped = 0
+        self.errors = 0
+        self.calls = 0
+        self.last_run: Dict[str, Any] = {}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def busy(self) -> bool:
+        return self._run_lock.locked()
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(MARKET_TZ)
+        start, end = self.window
+        return now.weekday() < 5 and start <= now.time() <= end
+
+    def symbols(self) -> List[str]:
+        """Pinned symbols first, then the most requested ones."""
+        return list(dict.fromkeys(self.pinned + self.popularity.top(self.top_n)))
+
+    def run_budget(self) -> int:
+        """Upstream calls one run may spend: its share of a minute-budget interval, capped by the day's share."""
+        today = datetime.now(MARKET_TZ).date().isoformat()
+        if today != self._day:
+            self._day, self._day_calls = today, 0
+        per_run = self.quota.per_minute * self.quota_share * self.interval / 60.0
+        per_day_left = self.quota.per_day * self.quota_share - self._day_calls
+        return int(max(0, min(per_run, per_day_left)))
+
+    async def _run(self) -> None:
+        while True:
+            if self.in_window():
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    print(f"Pre-warm run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, Any]:
+        async with self._run_lock:
+            return await self._run_pass()
+
+    async def _run_pass(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        budget = self.run_budget()
+        spent = 0
+        warmed: List[str] = []
+        skipped: List[str] = []
+
+        for symbol in self.symbols():
+            if spent + CALLS_PER_SYMBOL > budget:
+                skipped.append(symbol)
+                continue
+            # Prewarm is the only bulk-priority caller, so granted tokens are exactly its upstream calls
+            granted = self.quota.granted.get(PRIORITY_BULK, 0)
+            with upstream_priority(PRIORITY_BULK):
+                ok = await self.warm_symbol(symbol)
+            spent += self.quota.granted.get(PRIORITY_BULK, 0) - granted
+            if ok:
+                warmed.append(symbol)
+            else:
+                self.errors += 1
+
+        self.popularity.decay()
+        self._day_calls += spent
+        self.runs += 1
+        self.calls += spent
+        self.warmed += len(warmed)
+        self.skipped += len(skipped)
+        self.last_run = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "duration": round(time.monotonic() - started, 3),
+            "budget": budget,
+            "calls": spent,
+            "warmed": warmed,
+            "skipped": skipped
+        }
+        return self.last_run
+
+    async def warm_symbol(self, symbol: str) -> bool:
+        """Refresh one symbol's upstream data and prediction; False if any part failed."""
+        results = await asyncio.gather(
+            self.alpha_vantage_service.get_stock_quote(symbol),
+            self.alpha_vantage_service.get_historical_data(symbol),
+            self.alpha_vantage_service.get_company_overview(symbol),
+            self.prediction_service.predict_future_prices(symbol),
+            return_exceptions=True
+        )
+        quote, _, _, prediction = results
+        if isinstance(quote, dict) and "Error Message" not in quote:
+            persistence_service.record_quote(symbol, quote)
+        if isinstance(prediction, dict) and "predictions" in prediction and not prediction.get("demo_mode"):
+            persistence_service.record_predictions(symbol, prediction, prediction["model_version"])
+        return not any(
+            isinstance(result, Exception) or "error" in result or "Error Message" in result
+            for result in results
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "busy": self.busy,
+            "in_window": self.in_window(),
+            "pinned": self.pinned,
+            "tracked_symbols": len(self.popularity),
+            "evicted_symbols": self.popularity.evicted,
+            "next_symbols": self.symbols(),
+            "interval": self.interval,
+            "next_run_budget": self.run_budget(),
+            "runs": self.runs,
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "calls": self.calls,
+            "last_run": self.last_run
+        }
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set
+from app.core.config import settings
+from app.core.rate_limiter import PRIORITY_BACKGROUND, QuotaScheduler, upstream_priority
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+class QuoteSubscription:
+    """One client's view of the stream: the latest undelivered event per symbol.
+
+    A slow consumer never queues more than one event per symbol; a newer quote
+    replaces the pending one (counted in ``conflated``), so memory stays bounded
+    and the client always catches up to the current price.
+    """
+
+    def __init__(self, symbols: List[str]):
+        self.symbols = symbols
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._waiter: Optional[asyncio.Future] = None
+        self.delivered = 0
+        self.conflated = 0
+
+    def push(self, symbol: str, event: Dict[str, Any]) -> None:
+        if symbol in self._pending:
+            self.conflated += 1
+        self._pending[symbol] = event
+        if self._waiter is not None:
+            _wake(self._waiter)
+
+    async def get(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for pending events and take them all; ``[]`` after ``timeout`` seconds."""
+        if not self._pending:
+            # A bare future and timer: wait_for's extra task per read adds up over thousands of clients
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            timer = loop.call_later(timeout, _wake, self._waiter) if timeout is not None else None
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if timer is not None:
+                    timer.cancel()
+        events = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(events)
+        return events
+
+class QuoteStreamHub:
+    """Fan out live quotes: one background poller per subscribed symbol.
+
+    Pollers start with the first subscriber of a symbol and stop with the last.
+    Each poll runs at background priority, so interactive requests are served
+    first, and the cadence stretches as symbols are added so that streaming uses
+    at most ``quota_share`` of the per-minute and per-day call budget. Only
+    changed quotes are pushed; a new subscriber gets the last known quote at once.
+    """
+
+    def __init__(
+        self,
+        fetch_quote: Callable[[str], Awaitable[Dict[str, Any]]],
+        quota: QuotaScheduler,
+        min_interval: float = settings.QUOTE_STREAM_MIN_INTERVAL,
+        quota_share: float = settings.QUOTE_STREAM_QUOTA_SHARE
+    ):
+        self.fetch_quote = fetch_quote
+        self.quota = quota
+        self.min_interval = min_interval
+        self.quota_share = quota_share
+        self._subscribers: Dict[str, Set[QuoteSubscription]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self.polls = 0
+        self.events = 0
+
+    def subscribe(self, symbols: List[str]) -> QuoteSubscription:
+        subscription = QuoteSubscription(list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip())))
+        for symbol in subscription.symbols:
+            self._subscribers.setdefault(symbol, set()).add(subscription)
+            if symbol in self._latest:
+                subscription.push(symbol, self._latest[symbol])
+            if symbol not in self._pollers:
+                self._pollers[symbol] = asyncio.ensure_future(self._poll(symbol))
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription) -> None:
+        for symbol in subscription.symbols:
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._latest.pop(symbol, None)
+                poller = self._pollers.pop(symbol, None)
+                if poller is not None:
+                    poller.cancel()
+
+    def poll_interval(self) -> float:
+        """Seconds between polls of one symbol for the current number of symbols."""
+        symbols = max(1, len(self._pollers))
+        per_minute = self.quota.per_minute * self.quota_share
+        per_day = self.quota.per_day * self.quota_share
+        return max(self.min_interval, symbols * 60.0 / per_minute, symbols * 86400.0 / per_day)
+
+    async def _poll(self, symbol: str) -> None:
+        while True:
+            try:
+                with upstream_priority(PRIORITY_BACKGROUND):
+                    data = await self.fetch_quote(symbol)
+                self.polls += 1
+                if "Error Message" in data:
+                    event = {"symbol": symbol, "error": data["Error Message"]}
+                else:
+                    event = {"symbol": symbol, "quote": data}
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                event = {"symbol": symbol, "error": str(e)}
+
+            previous = self._latest.get(symbol)
+            if previous is None or {**previous, "time": None} != {**event, "time": None}:
+                event["time"] = time.time()
+                self._publish(symbol, event)
+            await asyncio.sleep(self.poll_interval())
+
+    def _publish(self, symbol: str, event: Dict[str, Any]) -> None:
+        self._latest[symbol] = event
+        for subscription in self._subscribers.get(symbol, ()):
+            subscription.push(symbol, event)
+        self.events += 1
+
+    async def stop(self) -> None:
+        pollers = list(self._pollers.values())
+        self._pollers.clear()
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions = {s for subscribers in self._subscribers.values() for s in subscribers}
+        return {
+            "symbols": len(self._pollers),
+            "subscriptions": len(subscriptions),
+            "poll_interval": round(self.poll_interval(), 2),
+            "polls": self.polls,
+            "events": self.events,
+            "conflated": sum(s.conflated for s in subscriptions)
+        }
@@ -0,0 +1,215 @@
+"""Lexicon-based news sentiment, scored a batch of articles at a time.
+
+``LEXICON`` maps whole words and phrases to weights. ``SentimentEngine``
+compiles it once into a vocabulary (each lexicon word gets an integer id) and
+one sorted key table per phrase length. A batch is scored in one pass:
+
+1. all texts are joined, lower-cased, stripped of punctuation and split into
+   tokens; a separator token between texts marks where each one starts
+2. each token becomes its vocabulary id (0 for words outside the lexicon)
+3. for each phrase length, longest first, the id n-grams of the whole batch
+   are looked up in that length's table with ``numpy.searchsorted``, skipping
+   tokens a longer phrase already matched ("cuts guidance" wins over "cuts")
+4. a term directly preceded by a negator ("not", "no", "fails to", ...)
+   counts against its own direction at reduced weight
+5. ``numpy.bincount`` sums the weights per text
+
+Terms only match whole words, so "up" never matches "update" or "supply".
+Per-article scores are memoized by a hash of the article's title and
+description.
+"""
+import hashlib
+import string
+import threading
+from typing import Dict, Any, Iterable, List, Tuple
+import numpy as np
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+def _terms(weight: float, terms: str) -> Dict[str, float]:
+    return {term.strip(): weight for term in terms.split(",")}
+
+# Financial news lexicon; inflections are listed explicitly since matching is by whole word
+LEXICON: Dict[str, float] = {
+    **_terms(3.0, """record profit, record revenue, record high, all-time high, beats expectations,
+        beat expectations, beats estimates, beat estimates, tops estimates, topped estimates,
+        raises guidance, raised guidance, raises outlook, raised outlook, soar, soars, soared, soaring,
+        surge, surges, surged, surging, skyrocket, skyrockets, skyrocketed"""),
+    **_terms(2.0, """upgrade, upgrades, upgraded, outperform, outperforms, outperformed, bullish,
+        rally, rallies, rallied, rallying, jump, jumps, jumped, profit, profits, profitable,
+        growth, strong demand, buyback, share buyback, raises dividend, dividend increase,
+        breakthrough, approval, approved, exceeds, exceeded, price target raised, raises price target"""),
+    **_terms(1.0, """rise, rises, rising, rose, risen, gain, gains, gained, up, higher, climb, climbs,
+        climbed, positive, optimistic, optimism, expand, expands, expanded, expansion, boost, boosts,
+        boosted, recover, recovers, recovered, recovery, rebound, rebounds, rebounded, strong, stronger,
+        upbeat, improve, improves, improved, improvement, partnership, win, wins, won"""),
+    **_terms(-3.0, """bankruptcy, bankrupt, fraud, plunge, plunges, plunged, plunging, crash, crashes,
+        crashed, misses expectations, missed expectations, misses estimates, missed estimates,
+        cuts guidance, cut guidance, lowers guidance, lowered guidance, cuts outlook, cut outlook,
+        collapse, collapses, collapsed, defaulted, defaults on, default on"""),
+    **_terms(-2.0, """downgrade, downgrades, downgraded, bearish, underperform, underperforms,
+        underperformed, loss, losses, lawsuit, sues, sued, investigation, probe, layoffs, layoff,
+        job cuts, slump, slumps, slumped, tumble, tumbles, tumbled, sink, sinks, sank, profit warning,
+        warns, warned, selloff, sell-off, recall, recalls, recalled, price target cut, cuts price target"""),
+    **_terms(-1.0, """down, fall, falls, fell, fallen, falling, decline, declines, declined, declining,
+        drop, drops, dropped, lower, weak, weaker, weakness, weakens, weakened, negative, concern, concerns, risk, risks,
+        slowdown, slows, slowed, volatile, volatility, pressure, uncertainty, delay, delays, delayed,
+        cut, cuts, miss, misses, missed"""),
+}
+NEGATORS = ("not", "no", "never", "without", "fails to", "failed to", "didn't", "doesn't", "won't", "isn't")
+# A negated term counts against its own direction, at reduced weight
+NEGATION_FACTOR = -0.75
+# Token placed between a batch's texts; vocabulary id 1
+SEPARATOR = "\x00"
+# Punctuation becomes whitespace, except hyphens and apostrophes inside words ("sell-off", "didn't")
+PUNCTUATION = str.maketrans({
+    **{char: " " for char in string.punctuation + "\u201c\u201d\u2014\u2013\u2026" if char not in "-'"},
+    "\u2019": "'"
+})
+# Scores depend only on the text, so entries never go stale; the TTL only bounds memory
+MEMO_TTL = 7 * 24 * 60 * 60
+
+LABELS = {1: "positive", -1: "negative", 0: "neutral"}
+
+def label(score: float) -> str:
+    return LABELS[(score > 0) - (score < 0)]
+
+def article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+class SentimentEngine:
+    """Score news articles against a weighted lexicon, a whole batch per pass (see module docstring)."""
+
+    def __init__(
+        self,
+        lexicon: Dict[str, float] = LEXICON,
+        negators: Iterable[str] = NEGATORS,
+        cache_entries: int = settings.SENTIMENT_CACHE_ENTRIES
+    ):
+        self.lexicon = {" ".join(term.lower().split()): weight for term, weight in lexicon.items()}
+        negators = [negator.lower().split() for negator in negators]
+        words = sorted({word for term in self.lexicon for word in term.split()} | {w for n in negators for w in n})
+        self.vocab = {SEPARATOR: 1, **{word: i for i, word in enumerate(words, start=2)}}
+        self._base = len(self.vocab) + 1
+
+        by_length: Dict[int, Dict[int, float]] = {}
+        for term, weight in self.lexicon.items():
+            ids = [self.vocab[word] for word in term.split()]
+            by_length.setdefault(len(ids), {})[self._key(ids)] = weight
+        # Longest phrases first, each as sorted keys and matching weights
+        self._tables: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        for length in sorted(by_length, reverse=True):
+            keys = sorted(by_length[length])
+            table_weights = np.array([by_length[length][key] for key in keys])
+            self._tables.append((length, np.array(keys, dtype=np.int64), table_weights))
+        self._negators = {
+            length: np.array(sorted(self._key([self.vocab[w] for w in n]) for n in negators if len(n) == length))
+            for length in {len(n) for n in negators}
+        }
+
+        self._memo = LRUCache(cache_entries)
+        self._lock = threading.Lock()
+        self.scored = 0
+
+    def _key(self, ids: List[int]) -> int:
+        key = 0
+        for token_id in ids:
+            key = key * self._base + token_id
+        return key
+
+    def _ngrams(self, ids: np.ndarray, length: int) -> np.ndarray:
+        """Key of the ``length`` tokens starting at each position that has that many left."""
+        count = len(ids) - length + 1
+        keys = ids[:count].copy()
+        for offset in range(1, length):
+            keys = keys * self._base + ids[offset:offset + count]
+        return keys
+
+    def _negated(self, ids: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        negated = np.zeros(len(starts), dtype=bool)
+        for length, keys in self._negators.items():
+            before = starts - length
+            valid = before >= 0
+            key = np.zeros(int(valid.sum()), dtype=np.int64)
+            for offset in range(length):
+                key = key * self._base + ids[before[valid] + offset]
+            negated[valid] |= np.isin(key, keys)
+        return negated
+
+    def score_texts(self, texts: List[str]) -> np.ndarray:
+        """``(len(texts), 2)`` array of summed positive and negative (absolute) weights per text."""
+        self.scored += len(texts)
+        batch = f" {SEPARATOR} ".join(text.replace(SEPARATOR, " ") for text in texts)
+        tokens = batch.lower().translate(PUNCTUATION).split()
+        ids = np.fromiter(map(self.vocab.get, tokens, [0] * len(tokens)), dtype=np.int64, count=len(tokens))
+        text_index = np.cumsum(ids == 1)
+
+        weights = np.zeros(len(ids))
+        covered = np.zeros(len(ids), dtype=bool)
+        for length, keys, table_weights in self._tables:
+            if len(ids) < length:
+                continue
+            ngrams = self._ngrams(ids, length)
+            positions = np.searchsorted(keys, ngrams).clip(0, len(keys) - 1)
+            hit = keys[positions] == ngrams
+            for offset in range(length):
+                hit &= ~covered[offset:offset + len(hit)]
+            starts = np.flatnonzero(hit)
+            weights[starts] = table_weights[positions[starts]]
+            for offset in range(length):
+                covered[starts + offset] = True
+
+        starts = np.flatnonzero(weights)
+        term_weights = np.where(self._negated(ids, starts), NEGATION_FACTOR, 1.0) * weights[starts]
+        index = text_index[starts]
+        return np.stack([
+            np.bincount(index, weights=np.clip(term_weights, 0, None), minlength=len(texts)),
+            np.bincount(index, weights=np.clip(-term_weights, 0, None), minlength=len(texts))
+        ], axis=1)
+
+    def score(self, articles: List[Dict[str, Any]]) -> np.ndarray:
+        """``(len(articles), 2)`` positive and negative weights; only articles not seen before are scored."""
+        texts = [article_text(article) for article in articles]
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest() for text in texts]
+        with self._lock:
+            scores = [self._memo.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = self.score_texts([texts[i] for i in missing]).round(4).tolist()
+            with self._lock:
+                for i, (positive, negative) in zip(missing, computed):
+                    scores[i] = (positive, negative)
+                    self._memo.set(keys[i], scores[i], MEMO_TTL)
+        return np.array(scores, dtype=float).reshape(len(articles), 2)
+
+    def analyze(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-article sentiment plus the overall (majority) sentiment and average score."""
+        weights = self.score(articles)
+        scores = (weights[:, 0] - weights[:, 1]).round(4)
+        signs = np.sign(scores).astype(int)
+        sentiments = [LABELS[sign] for sign in signs.tolist()]
+        results = [
+            {
+                "title": article.get("title"),
+                "sentiment": sentiment,
+                "score": score,
+                "positive": positive,
+                "negative": negative
+            }
+            for article, sentiment, score, (positive, negative) in zip(
+                articles, sentiments, scores.tolist(), weights.tolist()
+            )
+        ]
+        counts = {name: int(np.count_nonzero(signs == sign)) for sign, name in LABELS.items()}
+        return {
+            "articles": results,
+            "overall_sentiment": label(counts["positive"] - counts["negative"]),
+            "average_score": round(float(scores.mean()), 4) if len(scores) else 0.0,
+            "counts": counts
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"lexicon_terms": len(self.lexicon), "texts_scored": self.scored, "memo": self._memo.stats()}
+
+sentiment_engine = SentimentEngine()
@@ -0,0 +1,134 @@
+"""Columnar parsing of Alpha Vantage ``TIME_SERIES_*`` payloads.
+
+A payload maps timestamp strings to dicts of string fields (``"1. open"``,
+...), newest first. ``parse_series`` turns it into one ``BAR_DTYPE`` record
+array (the local OHLCV store's record type), sorted oldest first, so the
+latest N bars are the slice ``bars[-n:]`` with no sorting or per-bar dicts.
+``ts`` is the payload's wall-clock time as nanoseconds since the epoch; a date
+becomes midnight, matching the daily bars in the store.
+"""
+from itertools import islice
+from typing import Dict, Any, Optional
+import numpy as np
+from app.services.ohlcv_store import BAR_DTYPE, EMPTY_BARS
+
+OHLCV_FIELDS = ("1. open", "2. high", "3. low", "4. close", "5. volume")
+DAY_NS = 86400 * 10 ** 9
+
+def series_key(payload: Dict[str, Any]) -> Optional[str]:
+    """The ``"Time Series (...)"`` key of a payload, e.g. ``"Time Series (Daily)"``."""
+    return next((key for key in payload if key.startswith("Time Series")), None)
+
+def parse_series(payload: Dict[str, Any], key: Optional[str] = None, limit: Optional[int] = None) -> np.ndarray:
+    """Parse a time series payload into ``BAR_DTYPE`` records, oldest first.
+
+    With ``limit`` only the latest ``limit`` bars are returned; for a newest-first
+    payload only those entries are read. Raises ``ValueError`` on malformed
+    timestamps or numbers.
+    """
+    series = payload.get(key or series_key(payload) or "", {})
+    if not series:
+        return EMPTY_BARS
+    if limit and len(series) > limit and next(iter(series)) >= next(reversed(series)):
+        stamps = list(islice(series, limit))
+    else:
+        stamps = list(series)
+    bars = np.empty(len(stamps), dtype=BAR_DTYPE)
+    bars['ts'] = np.array(stamps, dtype='datetime64[ns]').view(np.int64)
+    values = np.fromiter(
+        (float(series[stamp].get(field, 0)) for stamp in stamps for field in OHLCV_FIELDS),
+        dtype=np.float64,
+        count=len(stamps) * len(OHLCV_FIELDS)
+    ).reshape(len(stamps), len(OHLCV_FIELDS))
+    for i, name in enumerate(('open', 'high', 'low', 'close', 'volume')):
+        bars[name] = values[:, i]
+
+    ts = bars['ts']
+    if len(bars) > 1 and not (ts[1:] > ts[:-1]).all():
+        # Alpha Vantage sends newest first; anything else gets a full sort
+        bars = bars[::-1].copy() if (ts[1:] < ts[:-1]).all() else np.sort(bars, order='ts', kind='stable')
+    return bars[-limit:] if limit else bars
+
+def format_timestamps(ts: np.ndarray) -> np.ndarray:
+    """Payload-style strings: ``YYYY-MM-DD`` for dates, ``YYYY-MM-DD HH:MM:SS`` otherwise."""
+    intraday = bool((ts % DAY_NS != 0).any())
+    strings = np.datetime_as_string(ts.view('datetime64[ns]'), unit='s' if intraday else 'D')
+    return np.char.replace(strings, 'T', ' ') if intraday else strings
+
+def bar_to_dict(bars: np.ndarray, index: int, time_field: str = "date") -> Dict[str, Any]:
+    """One bar as ``{time_field, open, high, low, close, volume}``."""
+    bar = bars[index]
+    return {
+        time_field: str(format_timestamps(np.array([bar['ts']]))[0]),
+        "open": float(bar['open']),
+        "high": float(bar['high']),
+        "low": float(bar['low']),
+        "close": float(bar['close']),
+        "volume": int(bar['volume'])
+    }
+
+def bar_columns(bars: np.ndarray, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """The latest ``limit`` bars (all by default) as ``{"ts", "open", ..., "volume"}`` arrays."""
+    if limit:
+        bars = bars[-limit:]
+    columns = {name: bars[name] for name in BAR_DTYPE.names}
+    columns['volume'] = columns['volume'].astype(np.int64)
+    return columns
+
+def parse_indicator(payload: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """A ``"Technical Analysis: ..."`` payload as ``{"ts", <field>...}`` arrays, oldest first.
+
+    Fields are the indicator's outputs (``SMA``; ``MACD``, ``MACD_Signal``, ...);
+    a missing value is NaN.
+    """
+    key = next((key for key in payload if key.startswith("Technical Analysis")), None)
+    series = payload.get(key, {}) if key else {}
+    stamps = list(series)
+    if not stamps:
+        return {"ts": np.empty(0, dtype=np.int64)}
+    fields = list(series[stamps[0]])
+    ts = np.array(stamps, dtype='datetime64[ns]').view(np.int64)
+    values = np.fromiter(
+        (float(series[stamp].get(field, "nan")) for stamp in stamps for field in fields),
+        dtype=np.float64,
+        count=len(stamps) * len(fields)
+    ).reshape(len(stamps), len(fields))
+    order = np.argsort(ts, kind='stable')
+    if limit:
+        order = order[-limit:]
+    columns = {"ts": ts[order]}
+    for i, field in enumerate(fields):
+        columns[field] = values[order, i]
+    return columns
+
+def indicator_payload(columns: Dict[str, np.ndarray], meta: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Indicator columns in Alpha Vantage's ``"Technical Analysis: <name>"`` shape, newest first."""
+    stamps = format_timestamps(columns['ts']).tolist()
+    fields = {
+        field: np.char.mod('%.4f', values).tolist()
+        for field, values in columns.items() if field != 'ts'
+    }
+    missing = {field: np.isnan(columns[field]) for field in fields}
+    series = {}
+    for i in range(len(stamps) - 1, -1, -1):
+        series[stamps[i]] = {field: values[i] for field, values in fields.items() if not missing[field][i]}
+    return {"Meta Data": meta, f"Technical Analysis: {name}": series}
+
+def columns_to_json(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Column arrays as JSON-ready parallel lists with payload-style timestamps; NaN becomes null."""
+    result: Dict[str, Any] = {
+        "count": len(columns['ts']),
+        "timestamps": format_timestamps(columns['ts']).tolist()
+    }
+    for name, values in columns.items():
+        if name == 'ts':
+            continue
+        values_list = values.tolist()
+        if values.dtype.kind == 'f' and np.isnan(values).any():
+            values_list = [None if value != value else value for value in values_list]
+        result[name] = values_list
+    return result
+
+def bars_to_columns(bars: np.ndarray, limit: Optional[int] = None) -> Dict[str, Any]:
+    """The latest ``limit`` bars (all by default) as parallel lists, oldest first."""
+    return columns_to_json(bar_columns(bars, limit))
@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+from app.core.config import settings
+
+@dataclass
+class TrainingJob:
+    id: str
+    symbol: str
+    mode: str = "recursive"  # forecast mode the model is trained for
+    status: str = "queued"  # queued, running, succeeded, failed
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "symbol": self.symbol,
+            "mode": self.mode,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+class TrainingJobQueue:
+    """Background training queue with one active job per symbol and forecast mode.
+
+    ``enqueue`` returns immediately; a small set of worker tasks drains the queue
+    and calls ``train_fn(symbol, mode)``, which is expected to return the
+    ``train_model`` result dict. Workers start on first use. Finished jobs are
+    kept for status polling up to ``history_size`` entries.
+    """
+
+    def __init__(
+        self,
+        train_fn: Callable[[str, str], Awaitable[Dict[str, Any]]],
+        workers: int = settings.TRAINING_QUEUE_WORKERS,
+        history_size: int = 1000
+    ):
+        self.train_fn = train_fn
+        self.workers = workers
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._active_by_symbol: Dict[Tuple[str, str], TrainingJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._worker_tasks:
+            self._worker_tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    def enqueue(self, symbol: str, mode: str = "recursive") -> TrainingJob:
+        """Queue training for ``symbol``, or return the job already queued/running for it."""
+        symbol = symbol.upper()
+        existing = self._active_by_symbol.get((symbol, mode))
+        if existing is not None:
+            return existing
+
+        self._ensure_started()
+        job = TrainingJob(id=uuid.uuid4().hex, symbol=symbol, mode=mode)
+        self._jobs[job.id] = job
+        self._active_by_symbol[(symbol, mode)] = job
+        self._queue.put_nowait(job)
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def active_job(self, symbol: str, mode: str = "recursive") -> Optional[TrainingJob]:
+        return self._active_by_symbol.get((symbol.upper(), mode))
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self.history_size:
+            oldest_id = next(iter(self._jobs))
+            if self._jobs[oldest_id].active:
+                break
+            del self._jobs[oldest_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            try:
+                result = await self.train_fn(job.symbol, job.mode)
+                if "error" in result:
+                    job.status = "failed"
+                    job.error = result["error"]
+                else:
+                    job.status = "succeeded"
+                    job.result = result
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                if job.status == "running":  # worker cancelled mid-job
+                    job.status = "failed"
+                    job.error = "Training cancelled"
+                job.finished_at = datetime.utcnow()
+                self._active_by_symbol.pop((job.symbol, job.mode), None)
+                self._queue.task_done()
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": counts
+        }
@@ -0,0 +1,260 @@
+import os
+import asyncio
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+from app.core.config import settings
+
+def _limit_worker_threads() -> None:
+    """Pool initializer: keep BLAS/OpenMP in each worker single-threaded.
+
+    Parallelism comes from the pool itself and the per-fit ``n_jobs`` budget, so
+    native thread pools inside every worker would only oversubscribe the cores.
+    """
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+
+def _fit_forest(X: np.ndarray, y: np.ndarray, n_jobs: int) -> Tuple[RandomForestRegressor, StandardScaler]:
+    scaler = StandardScaler()
+    model = RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        n_jobs=n_jobs
+    )
+    model.fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+def forecast_errors(predicted: np.ndarray, actual: np.ndarray, current: np.ndarray) -> Dict[str, float]:
+    """MAE, MAPE (%) and directional accuracy of price forecasts made at ``current`` closes."""
+    errors = np.abs(predicted - actual)
+    return {
+        "mae": float(errors.mean()),
+        "mape": float((errors / actual).mean() * 100),
+        "directional_accuracy": float((np.sign(predicted - current) == np.sign(actual - current)).mean())
+    }
+
+def fit_random_forest(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_jobs: int = 1,
+    close_column: Optional[int] = None
+) -> Tuple[RandomForestRegressor, StandardScaler, Dict[str, float]]:
+    """Score the price model on a holdout, then fit it on every row. Runs inside a pool worker.
+
+    ``y`` may be 2-D (one column per forecast horizon); the forest fits all
+    outputs jointly and the scores are averaged over them. Rows are time
+    ordered: the metrics come from a model fitted without the latest 20%, and
+    training rows whose targets fall inside that period are dropped so no
+    future bar leaks into it. With ``close_column`` the metrics include the
+    holdout's forecast errors. The returned model is refitted on all rows, so
+    it has seen the most recent bars.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, shuffle=False
+    )
+    horizon = y.shape[1] if y.ndim == 2 else 1
+    X_train, y_train = X_train[:len(X_train) - horizon], y_train[:len(y_train) - horizon]
+
+    model, scaler = _fit_forest(X_train, y_train, n_jobs)
+    X_train_scaled = scaler.transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    metrics = {
+        "train_score": model.score(X_train_scaled, y_train),
+        "test_score": model.score(X_test_scaled, y_test)
+    }
+    if close_column is not None:
+        metrics.update(forecast_errors(
+            model.predict(X_test_scaled).reshape(len(X_test), -1),
+            y_test.reshape(len(X_test), -1),
+            X_test[:, [close_column]]
+        ))
+
+    model, scaler = _fit_forest(X, y, n_jobs)
+    # Inference is mostly small batches; spinning up joblib threads costs more than it saves
+    model.set_params(n_jobs=1)
+    return model, scaler, metrics
+
+def _split_thresholds(model: Any, column: int) -> Optional[np.ndarray]:
+    """Sorted unique split thresholds on ``column`` across a tree ensemble, None otherwise."""
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None or not all(hasattr(tree, "tree_") for tree in estimators):
+        return None
+    return np.unique(np.concatenate([
+        tree.tree_.threshold[tree.tree_.feature == column] for tree in estimators
+    ]))
+
+def forecast_recursive(
+    model: Any,
+    scaler: StandardScaler,
+    row: np.ndarray,
+    column: int,
+    steps: int
+) -> List[float]:
+    """Roll a one-step model forward ``steps`` times, feeding each prediction back into ``column``.
+
+    With only ``column`` changing, a tree ensemble is constant between consecutive
+    split thresholds on it, so a single ``predict`` over one row per interval
+    yields every value the recursion can reach and each step becomes a lookup.
+    Trees compare float32 inputs against float64 thresholds; each interval is
+    represented by its largest float32, so the output equals the step-by-step
+    loop exactly. Other estimators fall back to that loop.
+    """
+    current = row.astype(float)
+    thresholds = _split_thresholds(model, column)
+    if thresholds is None:
+        predictions = []
+        for _ in range(steps):
+            prediction = float(model.predict(scaler.transform(current))[0])
+            predictions.append(prediction)
+            current[0, column] = prediction
+        return predictions
+
+    representatives = thresholds.astype(np.float32)
+    representatives = np.where(
+        representatives.astype(float) > thresholds,
+        np.nextafter(representatives, np.float32(-np.inf)),
+        representatives
+    )
+    # One more interval above the highest threshold
+    top = np.float32(thresholds[-1] if len(thresholds) else 0.0)
+    while len(thresholds) and float(top) <= thresholds[-1]:
+        top = np.nextafter(top, np.float32(np.inf))
+    representatives = np.append(representatives, top)
+
+    candidates = np.repeat(scaler.transform(current), len(representatives), axis=0)
+    candidates[:, column] = representatives
+    table = model.predict(candidates)
+
+    predictions = []
+    for _ in range(steps):
+        value = np.float32(scaler.transform(current)[0, column])
+        prediction = float(table[np.searchsorted(thresholds, value, side="left")])
+        predictions.append(prediction)
+        current[0, column] = prediction
+    return predictions
+
+def backtest_fold(
+    X: np.ndarray,
+    closes: np.ndarray,
+    train_start: int,
+    train_end: int,
+    test_end: int,
+    horizon: int,
+    mode: str,
+    close_column: int,
+    n_jobs: int = 1
+) -> Dict[str, Any]:
+    """Fit on rows ``[train_start, train_end)`` and forecast 1..``horizon`` days ahead
+    from every origin in ``[train_end, test_end)``. Runs inside a pool worker.
+
+    Only training rows whose targets are known by ``train_end`` are used. Returns
+    per-horizon error sums so folds and symbols can be pooled exactly.
+    """
+    steps = horizon if mode == "direct" else 1
+    rows = np.arange(train_start, train_end - steps)
+    targets = np.stack([closes[rows + h] for h in range(1, steps + 1)], axis=1)
+    model, scaler = _fit_forest(X[rows], targets if mode == "direct" else targets[:, 0], n_jobs)
+    model.set_params(n_jobs=1)
+
+    origins = np.arange(train_end, test_end)
+    if mode == "direct":
+        predicted = model.predict(scaler.transform(X[origins])).reshape(len(origins), -1)[:, :horizon]
+    else:
+        predicted = np.array([
+            forecast_recursive(model, scaler, X[origin:origin + 1], close_column, horizon)
+            for origin in origins
+        ])
+    actual = np.stack([closes[origins + h] for h in range(1, horizon + 1)], axis=1)
+    current = closes[origins][:, None]
+    errors = np.abs(predicted - actual)
+    return {
+        "count": len(origins),
+        "abs_error": errors.sum(axis=0),
+        "pct_error": (errors / actual).sum(axis=0) * 100,
+        "direction_hits": (np.sign(predicted - current) == np.sign(actual - current)).sum(axis=0)
+    }
+
+class TrainingPool:
+    """Bounded process pool for CPU-heavy model work.
+
+    At most ``max_workers`` jobs run at once; further submissions wait in an
+    asyncio queue without blocking the event loop. Each fit gets an ``n_jobs``
+    share of the cores so workers and sklearn never oversubscribe the machine.
+    """
+
+    def __init__(self, max_workers: int = settings.TRAINING_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.n_jobs_per_fit = max(1, (os.cpu_count() or 1) // max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_started(self) -> None:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and HTTP sessions is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker_threads
+            )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in a worker process and await its result."""
+        self._ensure_started()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        # The slot is held until the worker finishes, even if the awaiting caller goes away
+        future.add_done_callback(self._job_done)
+        return await asyncio.shield(future)
+
+    def _job_done(self, future: "asyncio.Future[Any]") -> None:
+        self.running -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Task[Any]":
+        """Schedule ``fn(*args)`` and return a task handle the caller can await later."""
+        return asyncio.ensure_future(self.run(fn, *args))
+
+    async def fit(self, X: np.ndarray, y: np.ndarray, close_column: Optional[int] = None):
+        """Fit the price model in a worker with this pool's per-fit ``n_jobs``."""
+        return await self.run(fit_random_forest, X, y, self.n_jobs_per_fit, close_column)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "n_jobs_per_fit": self.n_jobs_per_fit,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+training_pool = TrainingPool()
@@ -0,0 +1,107 @@
+"""Watchlist latency: one ``/quote/{symbol}`` per ticker vs the ``/quotes`` batch endpoint.
+
+Starts a local Alpha Vantage stub that answers every query after a fixed delay
+(GLOBAL_QUOTE and REALTIME_BULK_QUOTES), lifts the call quota and disables the
+response cache, then quotes N symbols three ways:
+
+* ``per-symbol``: the dashboard pattern, N sequential ``/quote/{symbol}`` calls
+* ``batch``:      one ``/quotes`` call, concurrent GLOBAL_QUOTE fetches
+* ``bulk``:       one ``/quotes`` call, ``REALTIME_BULK_QUOTES`` chunks
+
+The endpoint coroutines are called in-process, so the per-symbol figure leaves
+out the N client round trips a browser would also pay.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_batch_quotes.py --symbols 100 --delay 0.05
+"""
+import argparse
+import asyncio
+import threading
+import time
+from aiohttp import web
+from app.api.v1.endpoints import stocks
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.services.alpha_vantage_service import alpha_vantage_quota
+
+def start_stub_server(delay: float, port: int) -> None:
+    """Serve the stub on its own thread, as in bench_http_client."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def quote(symbol: str) -> dict:
+        return {
+            "symbol": symbol, "timestamp": "2024-12-31 16:00:00", "open": "149.0000",
+            "high": "151.0000", "low": "148.5000", "close": "150.0000", "volume": "1000000",
+            "previous_close": "149.5000", "change": "0.5000", "change_percent": "0.3344"
+        }
+
+    async def query(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        symbol = request.query.get("symbol", "")
+        if request.query.get("function") == "REALTIME_BULK_QUOTES":
+            return web.json_response({"data": [quote(s) for s in symbol.split(",")]})
+        return web.json_response({
+            "Global Quote": {"01. symbol": symbol, "05. price": "150.0000", "08. previous close": "149.5000"}
+        })
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/query", query)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+
+    def target() -> None:
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+
+async def run(label: str, make_call, total: int) -> None:
+    start = time.perf_counter()
+    failed = await make_call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<11} {total:>5} symbols  {elapsed * 1000:9.1f} ms  errors={failed}")
+
+async def main(total: int, delay: float, concurrency: int, port: int) -> None:
+    start_stub_server(delay, port)
+    stocks.alpha_vantage_service.base_url = f"http://127.0.0.1:{port}/query"
+    alpha_vantage_quota.per_minute = alpha_vantage_quota.per_day = 10 ** 9
+    settings.CACHE_ENABLED = False
+    settings.QUOTE_BATCH_CONCURRENCY = concurrency
+    symbols = [f"SYM{i}" for i in range(total)]
+
+    async def per_symbol() -> int:
+        for symbol in symbols:
+            await stocks.get_stock_quote(symbol, session=None)
+        return 0
+
+    async def batch() -> int:
+        return len((await stocks.get_stock_quotes(",".join(symbols), session=None))["errors"])
+
+    async def bulk() -> int:
+        settings.ALPHA_VANTAGE_BULK_QUOTES = True
+        try:
+            return await batch()
+        finally:
+            settings.ALPHA_VANTAGE_BULK_QUOTES = False
+
+    try:
+        await run("per-symbol", per_symbol, total)
+        await run("batch", batch, total)
+        await run("bulk", bulk, total)
+    finally:
+        await http_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.05, help="stub response delay in seconds")
+    parser.add_argument("--concurrency", type=int, default=10, help="QUOTE_BATCH_CONCURRENCY")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    asyncio.run(main(args.symbols, args.delay, args.concurrency, args.port))
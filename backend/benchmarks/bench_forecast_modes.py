@@ -0,0 +1,120 @@
+"""Forecast latency and accuracy: recursive next-day model vs direct multi-horizon model.
+
+Generates synthetic daily OHLCV histories, builds the prediction features,
+trains both models on the first part of each history and forecasts 1..H days
+from every origin in the held-out tail. Prints the mean latency of one
+H-day forecast for
+
+* ``loop``:      the previous per-day loop (one ``predict`` per day)
+* ``recursive``: the recursive model served by ``forecast_recursive``
+* ``direct``:    the multi-output model, one ``predict`` for all horizons
+
+and the out-of-sample MAE and MAPE of both models at selected horizons.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_forecast_modes.py --symbols 3 --horizon 30
+"""
+import argparse
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from app.services.feature_engine import compute_features
+from app.services.prediction_service import FEATURE_COLUMNS
+from app.services.training_pool import fit_random_forest, forecast_recursive
+
+def synthetic_history(bars: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2024-12-31", periods=bars)
+    # Slowly changing drift so there is some structure to learn
+    drift = np.repeat(rng.normal(0, 0.002, bars // 50 + 1), 50)[:bars]
+    close = 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, bars)))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, bars)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, bars).astype(float)
+    }, index=index)
+
+def per_day_loop(model, scaler, row: np.ndarray, column: int, steps: int) -> List[float]:
+    """The loop predict_future_prices used before the batched recursive forecast."""
+    current = row.astype(float)
+    predictions = []
+    for _ in range(steps):
+        prediction = float(model.predict(scaler.transform(current))[0])
+        predictions.append(prediction)
+        current[0, column] = prediction
+    return predictions
+
+def timed(fn, *args) -> tuple:
+    start = time.perf_counter()
+    result = fn(*args)
+    return np.asarray(result, dtype=float), time.perf_counter() - start
+
+def run_symbol(seed: int, bars: int, horizon: int, train_fraction: float) -> Dict[str, np.ndarray]:
+    df = compute_features(synthetic_history(bars, seed))
+    closes = df["Close"].to_numpy()
+    X = df[FEATURE_COLUMNS].to_numpy()
+    close_column = FEATURE_COLUMNS.index("Close")
+
+    cutoff = int(len(df) * train_fraction)
+    # Training rows need every target inside the training period
+    train_rows = np.arange(cutoff - horizon)
+    Y = np.stack([closes[train_rows + h] for h in range(1, horizon + 1)], axis=1)
+    recursive_model, recursive_scaler, _ = fit_random_forest(X[train_rows], Y[:, 0], n_jobs=-1)
+    direct_model, direct_scaler, _ = fit_random_forest(X[train_rows], Y, n_jobs=-1)
+
+    origins = np.arange(cutoff, len(df) - horizon)
+    actual = np.stack([closes[origins + h] for h in range(1, horizon + 1)], axis=1)
+    results = {name: [] for name in ("loop", "recursive", "direct")}
+    latency = {name: 0.0 for name in results}
+    for origin in origins:
+        row = X[origin:origin + 1]
+        for name, (fn, model, scaler) in {
+            "loop": (per_day_loop, recursive_model, recursive_scaler),
+            "recursive": (forecast_recursive, recursive_model, recursive_scaler),
+        }.items():
+            forecast, elapsed = timed(fn, model, scaler, row, close_column, horizon)
+            results[name].append(forecast)
+            latency[name] += elapsed
+        forecast, elapsed = timed(lambda r: direct_model.predict(direct_scaler.transform(r))[0], row)
+        results["direct"].append(forecast)
+        latency["direct"] += elapsed
+
+    assert np.array_equal(np.array(results["loop"]), np.array(results["recursive"]))
+    return {
+        "actual": actual,
+        "recursive": np.array(results["recursive"]),
+        "direct": np.array(results["direct"]),
+        "latency": {name: total / len(origins) for name, total in latency.items()}
+    }
+
+def main(symbols: int, bars: int, horizon: int, train_fraction: float) -> None:
+    runs = [run_symbol(seed, bars, horizon, train_fraction) for seed in range(symbols)]
+    print(f"{symbols} symbols, {bars} bars, {horizon}-day forecasts, "
+          f"{sum(len(run['actual']) for run in runs)} out-of-sample origins\n")
+
+    print("latency per forecast")
+    for name in ("loop", "recursive", "direct"):
+        mean = np.mean([run["latency"][name] for run in runs]) * 1000
+        print(f"  {name:<10} {mean:8.2f} ms")
+
+    actual = np.concatenate([run["actual"] for run in runs])
+    print("\nhorizon   recursive MAE / MAPE     direct MAE / MAPE")
+    for h in sorted({1, 5, 10, horizon // 2, horizon}):
+        row = []
+        for name in ("recursive", "direct"):
+            errors = np.abs(np.concatenate([run[name] for run in runs])[:, h - 1] - actual[:, h - 1])
+            row.append(f"{errors.mean():8.3f} / {100 * (errors / actual[:, h - 1]).mean():5.2f}%")
+        print(f"  {h:>4}d   {row[0]}      {row[1]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--bars", type=int, default=1000)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--train-fraction", type=float, default=0.8)
+    args = parser.parse_args()
+    main(args.symbols, args.bars, args.horizon, args.train_fraction)
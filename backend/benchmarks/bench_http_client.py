@@ -0,0 +1,84 @@
+"""Concurrent upstream throughput: blocking ``requests`` vs the shared aiohttp client.
+
+Starts a local Alpha Vantage stub that answers every query after a fixed delay,
+then fires N concurrent quote requests through:
+
+* ``before``: the old pattern, ``requests.get`` called inside ``async def``
+* ``after``:  ``AlphaVantageService`` using the pooled ``http_client``
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_http_client.py --requests 200 --delay 0.05
+"""
+import argparse
+import asyncio
+import threading
+import time
+import requests
+from aiohttp import web
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.services.alpha_vantage_service import AlphaVantageService, alpha_vantage_quota
+
+def start_stub_server(delay: float, port: int) -> None:
+    """Serve the stub on its own thread so a blocked client loop cannot stall it."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def query(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        return web.json_response({
+            "Global Quote": {
+                "01. symbol": request.query.get("symbol", ""),
+                "05. price": "150.00"
+            }
+        })
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/query", query)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+
+    def target() -> None:
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+
+async def blocking_quote(base_url: str, symbol: str):
+    # Mirrors the previous service implementation
+    response = requests.get(base_url, params={"function": "GLOBAL_QUOTE", "symbol": symbol})
+    return response.json()
+
+async def run(label: str, make_call, total: int) -> None:
+    start = time.perf_counter()
+    await asyncio.gather(*(make_call(f"SYM{i}") for i in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<8} {total:>5} requests  {elapsed:8.3f}s  {total / elapsed:10.1f} req/s")
+
+async def main(total: int, delay: float, port: int) -> None:
+    start_stub_server(delay, port)
+    # Measure the HTTP client, not the call quota or the response cache
+    alpha_vantage_quota.per_minute = alpha_vantage_quota.per_day = 10 ** 9
+    settings.CACHE_ENABLED = False
+    base_url = f"http://127.0.0.1:{port}/query"
+    service = AlphaVantageService()
+    service.base_url = base_url
+
+    try:
+        await run("before", lambda symbol: blocking_quote(base_url, symbol), total)
+        await run("after", service.get_stock_quote, total)
+    finally:
+        await http_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05, help="stub response delay in seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.delay, args.port))
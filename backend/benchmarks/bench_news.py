@@ -0,0 +1,160 @@
+"""NewsAPI calls and latency of ``/news/{symbol}``: serial lookups vs the article index.
+
+Starts a local NewsAPI stand-in (plus an Alpha Vantage ``OVERVIEW`` stub) that
+answers after a fixed delay, and lifts the Alpha Vantage call quota.
+``/v2/everything`` serves a synthetic feed per company, filtered by
+``from``/``to`` and paged like NewsAPI. Then it repeats news requests for N
+symbols through:
+
+* ``before``:    the previous handler, company overview then a full 7-day
+                 ``get_company_news`` fetch on every request
+* ``after``:     ``NewsIngestor`` + ``NewsIndex`` in a temporary directory with
+                 the default ``NEWS_REFRESH_INTERVAL``
+* ``after/0s``:  the same with a refresh interval of 0, so every request asks
+                 NewsAPI for articles newer than the newest indexed one
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_news.py --symbols 20 --rounds 5 --delay 0.05
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from aiohttp import web
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.services.alpha_vantage_service import AlphaVantageService, alpha_vantage_quota
+from app.services.news_index import CompanyNames, NewsIndex, NewsIngestor, to_ts
+from app.services.news_service import NewsService
+
+ARTICLES_PER_DAY = 40
+
+def feed(company: str, now: datetime) -> list:
+    """Seven days of articles about ``company``, newest first."""
+    articles = []
+    for i in range(7 * ARTICLES_PER_DAY):
+        published = now - timedelta(seconds=i * 86400 / ARTICLES_PER_DAY)
+        articles.append({
+            "source": {"id": None, "name": "Stub Wire"},
+            "title": f"{company} shares move on story {i}",
+            "description": f"Analysts see growth at {company}",
+            "url": f"https://news.example/{company.replace(' ', '-')}/{i}",
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ")
+        })
+    return articles
+
+def start_stub_server(delay: float, port: int) -> dict:
+    """Serve the stubs on their own thread; returns per-endpoint call counts."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    calls = {"everything": 0, "overview": 0}
+    now = datetime.now(timezone.utc)
+    feeds = {}
+
+    def parse(value: str) -> float:
+        return to_ts(datetime.fromisoformat(value)) if "T" in value else to_ts(datetime.strptime(value, "%Y-%m-%d"))
+
+    async def everything(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        calls["everything"] += 1
+        query = request.query
+        if query["q"] not in feeds:
+            articles = feed(query["q"], now)
+            feeds[query["q"]] = [(to_ts(now) - i * 86400 / ARTICLES_PER_DAY, article) for i, article in enumerate(articles)]
+        since = parse(query["from"]) if "from" in query else 0
+        until = parse(query["to"]) if "to" in query else float("inf")
+        if "T" not in query.get("to", "T"):
+            until += 86400  # a bare date covers the whole day
+        matching = [article for ts, article in feeds[query["q"]] if since <= ts <= until]
+        page_size = int(query.get("pageSize", 100))
+        page = int(query.get("page", 1))
+        return web.json_response({
+            "status": "ok",
+            "totalResults": len(matching),
+            "articles": matching[(page - 1) * page_size:page * page_size]
+        })
+
+    async def overview(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        calls["overview"] += 1
+        symbol = request.query.get("symbol", "")
+        return web.json_response({"Symbol": symbol, "Name": f"{symbol} Corp"})
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/v2/everything", everything)
+        app.router.add_get("/query", overview)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+
+    def target() -> None:
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+    return calls
+
+async def before(symbol: str, alpha_vantage: AlphaVantageService, news: NewsService) -> int:
+    # Mirrors the previous /news/{symbol} handler
+    overview = await alpha_vantage.get_company_overview(symbol)
+    data = await news.get_company_news(overview.get("Name", symbol), 7)
+    await news.analyze_sentiment(data["articles"])
+    return len(data["articles"])
+
+async def after(symbol: str, ingestor: NewsIngestor, news: NewsService) -> int:
+    since = time.time() - 7 * 86400
+    await ingestor.ingest(symbol, since)
+    articles = await asyncio.to_thread(ingestor.index.query, symbol, since)
+    await news.analyze_sentiment(articles)
+    return len(articles)
+
+async def run(label: str, handler, symbols: list, rounds: int, calls: dict) -> None:
+    start_calls = dict(calls)
+    latencies = []
+    articles = 0
+    for _ in range(rounds):
+        round_start = time.perf_counter()
+        results = await asyncio.gather(*(handler(symbol) for symbol in symbols))
+        latencies.append((time.perf_counter() - round_start) * 1000)
+        articles = sum(results)
+    upstream = {name: calls[name] - start_calls[name] for name in calls}
+    print(
+        f"{label:<9} first {latencies[0]:8.1f}ms  later {min(latencies[1:] or latencies):8.1f}ms  "
+        f"newsapi calls {upstream['everything']:>5}  overview calls {upstream['overview']:>4}  "
+        f"articles/round {articles}"
+    )
+
+async def main(symbols: int, rounds: int, delay: float, port: int) -> None:
+    calls = start_stub_server(delay, port)
+    alpha_vantage_quota.per_minute = alpha_vantage_quota.per_day = 10 ** 9
+    news = NewsService()
+    news.base_url = f"http://127.0.0.1:{port}/v2"
+    alpha_vantage = AlphaVantageService()
+    alpha_vantage.base_url = f"http://127.0.0.1:{port}/query"
+    names = [f"SYM{i}" for i in range(symbols)]
+
+    print(f"{symbols} symbols x {rounds} rounds, {delay * 1000:.0f}ms upstream delay, {7 * ARTICLES_PER_DAY} articles/symbol")
+    await run("before", lambda symbol: before(symbol, alpha_vantage, news), names, rounds, calls)
+    for label, refresh in (("after", settings.NEWS_REFRESH_INTERVAL), ("after/0s", 0.0)):
+        with tempfile.TemporaryDirectory() as root:
+            ingestor = NewsIngestor(
+                news, alpha_vantage, NewsIndex(root), CompanyNames(f"{root}/company_names.json"),
+                refresh_interval=refresh
+            )
+            await run(label, lambda symbol: after(symbol, ingestor, news), names, rounds, calls)
+    await http_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    asyncio.run(main(args.symbols, args.rounds, args.delay, args.port))
@@ -0,0 +1,116 @@
+"""Live quote fan-out: thousands of stream subscribers on a handful of pollers.
+
+Starts a local Alpha Vantage stub whose GLOBAL_QUOTE price moves on every call,
+lifts the call quota, disables the response cache and subscribes N simulated
+clients to the ``/stream/quotes`` hub, spread over S symbols. A fraction of the
+clients are slow (they sleep between reads). Prints the upstream calls made
+(one poller per symbol, whatever N is), the delivery latency of fast clients
+and how many stale quotes were conflated away for slow ones.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_quote_stream.py --subscribers 5000 --symbols 20
+"""
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+import numpy as np
+from aiohttp import web
+from app.api.v1.endpoints import stocks
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.services.alpha_vantage_service import alpha_vantage_quota
+from app.services.quote_stream import QuoteStreamHub
+
+def start_stub_server(delay: float, port: int) -> dict:
+    """Serve the stub on its own thread, as in bench_http_client; returns call counters."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    counter = itertools.count()
+    calls = {"total": 0}
+
+    async def query(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        calls["total"] += 1
+        price = 150 + next(counter) * 0.01
+        return web.json_response({
+            "Global Quote": {"01. symbol": request.query.get("symbol", ""), "05. price": f"{price:.4f}"}
+        })
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/query", query)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+
+    def target() -> None:
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+    return calls
+
+async def client(hub: QuoteStreamHub, symbols, duration: float, read_delay: float, stats: dict) -> None:
+    subscription = hub.subscribe(symbols)
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            events = await subscription.get(timeout=deadline - time.monotonic())
+            now = time.time()
+            stats["latency"].extend(now - event["time"] for event in events)
+            stats["events"] += len(events)
+            if read_delay:
+                await asyncio.sleep(read_delay)
+    finally:
+        stats["conflated"] += subscription.conflated
+        hub.unsubscribe(subscription)
+
+async def main(subscribers: int, symbols: int, slow: float, duration: float, interval: float, port: int) -> None:
+    calls = start_stub_server(0.01, port)
+    stocks.alpha_vantage_service.base_url = f"http://127.0.0.1:{port}/query"
+    alpha_vantage_quota.per_minute = alpha_vantage_quota.per_day = 10 ** 9
+    settings.CACHE_ENABLED = False
+    hub = QuoteStreamHub(stocks.alpha_vantage_service.get_stock_quote, alpha_vantage_quota, min_interval=interval)
+
+    names = [f"SYM{i}" for i in range(symbols)]
+    rng = np.random.default_rng(0)
+    fast = {"latency": [], "events": 0, "conflated": 0}
+    lagging = {"latency": [], "events": 0, "conflated": 0}
+    tasks = []
+    for i in range(subscribers):
+        picked = list(rng.choice(names, size=min(5, symbols), replace=False))
+        is_slow = i < subscribers * slow
+        # Slow clients read at a fifth of the poll rate
+        tasks.append(client(hub, picked, duration, interval * 5 if is_slow else 0, lagging if is_slow else fast))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await hub.stop()
+        await http_client.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{subscribers} subscribers on {symbols} symbols for {elapsed:.1f}s, poll interval {interval}s")
+    print(f"  upstream calls   {calls['total']:>8}   ({calls['total'] / elapsed:.1f}/s)")
+    print(f"  events published {hub.events:>8}")
+    latency = np.array(fast["latency"]) * 1000
+    print(f"  fast clients     {fast['events']:>8} delivered, latency p50 {np.percentile(latency, 50):.1f} ms "
+          f"p99 {np.percentile(latency, 99):.1f} ms")
+    print(f"  slow clients     {lagging['events']:>8} delivered, {lagging['conflated']} stale quotes conflated")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--slow", type=float, default=0.1, help="fraction of slow clients")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.2, help="poll interval in seconds")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.symbols, args.slow, args.duration, args.interval, args.port))
@@ -0,0 +1,68 @@
+"""Serialization time and payload size of the historical endpoint's response formats.
+
+For a full daily history (5000 bars by default) times
+
+* ``fastapi json``:  the previous path, ``jsonable_encoder`` then the stdlib
+                     ``JSONResponse`` render of the raw payload
+* ``json``:          the raw payload rendered by ``FastJSONResponse``
+* ``columnar``:      ``parse_series`` + column-oriented JSON
+* ``msgpack``:       the columnar layout as MessagePack
+* ``arrow``:         ``BAR_DTYPE`` columns as one Arrow IPC stream
+
+and reports each body's size raw, gzipped (the middleware's level) and with
+brotli. Formats and encodings whose optional package is not installed are
+reported as skipped.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_responses.py --bars 5000
+"""
+import argparse
+import time
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core import responses
+from app.core.responses import FastJSONResponse, compress, encode_arrow, encode_msgpack
+from app.services.time_series import bar_columns, columns_to_json, parse_series
+from bench_time_series import payload
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def columnar(data: dict) -> bytes:
+    return FastJSONResponse({"symbol": "SYM", **columns_to_json(bar_columns(parse_series(data)))}).body
+
+def main(bars: int, repeat: int) -> None:
+    data = payload(pd.bdate_range(end="2024-12-31", periods=bars), "Time Series (Daily)", "%Y-%m-%d")
+    encoders = {
+        "fastapi json": lambda: JSONResponse(jsonable_encoder(data)).body,
+        "json": lambda: FastJSONResponse(data).body,
+        "columnar": lambda: columnar(data),
+        "msgpack": lambda: encode_msgpack({"symbol": "SYM", **columns_to_json(bar_columns(parse_series(data)))}),
+        "arrow": lambda: encode_arrow(bar_columns(parse_series(data)), {"symbol": "SYM"})
+    }
+    print(f"{bars} daily bars, JSON encoder: {'orjson' if responses.orjson else 'stdlib'}")
+    print(f"{'format':<14}{'encode ms':>10}{'bytes':>10}{'gzip':>10}{'brotli':>10}")
+    for name, encode in encoders.items():
+        try:
+            body = encode()
+        except RuntimeError as e:
+            print(f"{name:<14}  skipped ({e})")
+            continue
+        elapsed = best_of(encode, repeat)
+        gzipped = len(compress(body, "gzip"))
+        brotli_size = len(compress(body, "br")) if responses.brotli else "-"
+        print(f"{name:<14}{elapsed:>10.2f}{len(body):>10}{gzipped:>10}{brotli_size:>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.bars, args.repeat)
@@ -0,0 +1,127 @@
+"""News sentiment scoring: per-article substring loop vs the batch lexicon engine.
+
+Generates N synthetic headlines (10k by default): positive, negative and
+neutral ones, where the neutral ones contain words such as "update" and
+"supply" that hide lexicon words. It then times
+
+* ``before``:      the previous ``analyze_sentiment``, one ``in`` test per
+                   lexicon word per article (its 13 words)
+* ``before/lex``:  the same loop over ``LEXICON``, as it would scale
+* ``batch``:       ``SentimentEngine.analyze`` on all headlines in one pass
+* ``requests``:    the same headlines as /news-sized batches (``--batch``)
+* ``memo``:        the batches again, answered from the per-article memo
+
+and reports how often each labels a headline differently from the
+sentiment it was generated with.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_sentiment.py --headlines 10000 --batch 100
+"""
+import argparse
+import random
+import time
+from app.services.sentiment_engine import SentimentEngine
+
+COMPANIES = ["Apple", "Microsoft", "Nvidia", "Tesla", "Amazon", "Intel", "Boeing", "Pfizer", "Netflix", "Oracle"]
+TEMPLATES = {
+    "positive": [
+        "{c} beats estimates as cloud revenue soars",
+        "{c} shares rally after analyst upgrade",
+        "{c} raises guidance on strong demand",
+        "{c} stock climbs to record high",
+        "{c} announces share buyback, profit jumps",
+    ],
+    "negative": [
+        "{c} misses estimates, shares plunge",
+        "{c} cuts guidance amid weak demand",
+        "{c} faces lawsuit over product recall",
+        "{c} stock falls after downgrade",
+        "{c} announces layoffs as losses widen",
+    ],
+    "neutral": [
+        "{c} issues software update for supply chain tools",
+        "{c} CEO to speak at conference on Thursday",
+        "{c} schedules earnings call, sets date for annual meeting",
+        "{c} files routine paperwork with regulators",
+        "{c} opens new office downtown",
+    ],
+}
+
+def headlines(total: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    articles = []
+    for i in range(total):
+        sentiment = rng.choice(list(TEMPLATES))
+        title = rng.choice(TEMPLATES[sentiment]).format(c=rng.choice(COMPANIES))
+        articles.append({"title": f"{title} ({i})", "description": "", "expected": sentiment})
+    return articles
+
+PREVIOUS_POSITIVE = {"up", "rise", "gain", "positive", "growth", "profit", "bullish"}
+PREVIOUS_NEGATIVE = {"down", "fall", "loss", "negative", "decline", "bearish"}
+
+def before(articles: list, positive_words: set, negative_words: set) -> list:
+    # Mirrors the previous NewsService.analyze_sentiment
+    labels = []
+    for article in articles:
+        content = f"{article.get('title', '').lower()} {article.get('description', '').lower()}"
+        positive_count = sum(1 for word in positive_words if word in content)
+        negative_count = sum(1 for word in negative_words if word in content)
+        if positive_count > negative_count:
+            labels.append("positive")
+        elif negative_count > positive_count:
+            labels.append("negative")
+        else:
+            labels.append("neutral")
+    return labels
+
+def timed(fn, repeat: int) -> tuple:
+    """Best time of ``repeat`` runs in ms, and the labels of the last one."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        labels = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, labels
+
+def in_batches(engine: SentimentEngine, articles: list, size: int) -> list:
+    labels = []
+    for i in range(0, len(articles), size):
+        labels.extend(result["sentiment"] for result in engine.analyze(articles[i:i + size])["articles"])
+    return labels
+
+def main(total: int, batch: int, repeat: int) -> None:
+    articles = headlines(total)
+    expected = [article["expected"] for article in articles]
+    engines = [SentimentEngine()]
+    lexicon = engines[0].lexicon
+    positive_words = {term for term, weight in lexicon.items() if weight > 0}
+    negative_words = {term for term, weight in lexicon.items() if weight < 0}
+
+    def fresh() -> SentimentEngine:
+        engines.append(SentimentEngine())
+        return engines[-1]
+
+    runs = {
+        "before": lambda: before(articles, PREVIOUS_POSITIVE, PREVIOUS_NEGATIVE),
+        "before/lex": lambda: before(articles, positive_words, negative_words),
+        "batch": lambda: [result["sentiment"] for result in fresh().analyze(articles)["articles"]],
+        "requests": lambda: in_batches(fresh(), articles, batch),
+        # Reuses the engine the last ``requests`` run filled
+        "memo": lambda: in_batches(engines[-1], articles, batch),
+    }
+    print(f"{total} headlines, {len(lexicon)} lexicon terms, request batches of {batch}")
+    print(f"{'path':<12}{'ms':>10}{'us/article':>12}{'mislabelled':>13}")
+    for name, run in runs.items():
+        elapsed, labels = timed(run, repeat)
+        wrong = sum(1 for label, want in zip(labels, expected) if label != want)
+        print(f"{name:<12}{elapsed:>10.1f}{elapsed * 1000 / total:>12.2f}{wrong / total:>13.1%}")
+    print(f"memo: {engines[-1].stats()['memo']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--headlines", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.headlines, args.batch, args.repeat)
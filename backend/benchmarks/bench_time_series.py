@@ -0,0 +1,110 @@
+"""Alpha Vantage time series: per-key dict handling vs columnar ``parse_series``.
+
+Builds synthetic TIME_SERIES_DAILY payloads in the ``compact`` (100 bars) and
+``full`` (20+ years) sizes, plus a 1min intraday payload, and times
+
+* ``dict latest``:   the previous ``/comprehensive`` path, ``sorted(keys)`` then
+                     ``float()`` per field of the bar it picks
+* ``dict to bars``:  the previous store conversion, one record per loop step
+* ``parse``:         ``parse_series`` into a ``BAR_DTYPE`` array
+* ``parse latest``:  ``parse_series(..., limit=2)``, what ``/comprehensive`` uses now
+* ``latest-N``:      ``bars[-n:]`` plus ``bar_to_dict`` once parsed
+
+and compares the raw JSON response size with ``format=columnar``. Results are
+checked to match the previous code.
+
+Usage (from ``backend/``)::
+
+    PYTHONPATH=. python benchmarks/bench_time_series.py --full-bars 5000
+"""
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+from app.services.ohlcv_store import BAR_DTYPE, to_utc_ns
+from app.services.time_series import bar_to_dict, bars_to_columns, parse_series
+
+def payload(index: pd.DatetimeIndex, key: str, fmt: str) -> dict:
+    """Newest-first payload with Alpha Vantage's string fields."""
+    rng = np.random.default_rng(len(index))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    series = {}
+    for i in range(len(index) - 1, -1, -1):
+        series[index[i].strftime(fmt)] = {
+            "1. open": f"{close[i] * 0.999:.4f}",
+            "2. high": f"{close[i] * 1.01:.4f}",
+            "3. low": f"{close[i] * 0.99:.4f}",
+            "4. close": f"{close[i]:.4f}",
+            "5. volume": str(int(rng.integers(1_000_000, 5_000_000)))
+        }
+    return {"Meta Data": {"2. Symbol": "SYM"}, key: series}
+
+def dict_latest(data: dict, key: str, position: int) -> dict:
+    series = data[key]
+    stamp = sorted(series.keys(), reverse=True)[position]
+    values = series[stamp]
+    return {
+        "stamp": stamp,
+        "open": float(values.get("1. open", 0)),
+        "high": float(values.get("2. high", 0)),
+        "low": float(values.get("3. low", 0)),
+        "close": float(values.get("4. close", 0)),
+        "volume": int(values.get("5. volume", 0))
+    }
+
+def dict_to_bars(data: dict, key: str) -> np.ndarray:
+    series = data.get(key, {})
+    bars = np.empty(len(series), dtype=BAR_DTYPE)
+    for i, (day, values) in enumerate(series.items()):
+        bars[i] = (
+            to_utc_ns(day),
+            float(values.get("1. open", 0)),
+            float(values.get("2. high", 0)),
+            float(values.get("3. low", 0)),
+            float(values.get("4. close", 0)),
+            float(values.get("5. volume", 0))
+        )
+    return bars
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def run(label: str, data: dict, key: str, repeat: int) -> None:
+    bars = parse_series(data, key)
+    # Same bar and same records as the dict-based code
+    old = dict_latest(data, key, 1)
+    new = bar_to_dict(bars, -2, "stamp")
+    assert old == new == bar_to_dict(parse_series(data, key, limit=2), -2, "stamp"), (old, new)
+    assert np.array_equal(np.sort(dict_to_bars(data, key), order="ts"), bars)
+
+    raw_size = len(json.dumps(data))
+    columnar_size = len(json.dumps(bars_to_columns(bars)))
+    print(f"{label:<16} {len(bars):>6} bars")
+    print(f"  dict latest   {best_of(lambda: dict_latest(data, key, 1), repeat):9.3f} ms")
+    print(f"  dict to bars  {best_of(lambda: dict_to_bars(data, key), repeat):9.3f} ms")
+    print(f"  parse         {best_of(lambda: parse_series(data, key), repeat):9.3f} ms")
+    print(f"  parse latest  {best_of(lambda: parse_series(data, key, limit=2), repeat):9.3f} ms")
+    print(f"  latest-N      {best_of(lambda: bar_to_dict(bars[-10:], -2), repeat):9.3f} ms")
+    print(f"  JSON bytes    {raw_size:>9} raw, {columnar_size} columnar ({columnar_size / raw_size:.0%})")
+
+def main(full_bars: int, intraday_bars: int, repeat: int) -> None:
+    daily = "Time Series (Daily)"
+    run("daily compact", payload(pd.bdate_range(end="2024-12-31", periods=100), daily, "%Y-%m-%d"), daily, repeat)
+    run("daily full", payload(pd.bdate_range(end="2024-12-31", periods=full_bars), daily, "%Y-%m-%d"), daily, repeat)
+    minute = "Time Series (1min)"
+    index = pd.date_range(end="2024-12-31 16:00", periods=intraday_bars, freq="min")
+    run("intraday 1min", payload(index, minute, "%Y-%m-%d %H:%M:%S"), minute, repeat)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full-bars", type=int, default=5000)
+    parser.add_argument("--intraday-bars", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.full_bars, args.intraday_bars, args.repeat)
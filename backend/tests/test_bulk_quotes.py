@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from app.core.cache import LRUCache, ResponseCache, make_cache_key
+from app.core.config import settings
+from app.core.metrics import BULK_QUOTE_FALLBACKS
+from app.core.rate_limiter import QuotaScheduler
+from app.services import alpha_vantage_service as module
+from app.services.alpha_vantage_service import AlphaVantageService
+
+PREMIUM = {"Error Message": "This is a premium endpoint. Please subscribe to any of the premium plans."}
+
+def fallbacks(reason: str) -> float:
+    return BULK_QUOTE_FALLBACKS._values.get((reason,), 0.0)
+
+class Upstream:
+    """``_request`` stand-in: bulk calls answer ``bulk``, GLOBAL_QUOTE calls a quote per symbol."""
+
+    def __init__(self, bulk: dict):
+        self.bulk = bulk
+        self.functions = []
+
+    async def request(self, params: dict) -> dict:
+        self.functions.append(params["function"])
+        if params["function"] == "REALTIME_BULK_QUOTES":
+            return self.bulk
+        return {"Global Quote": {"01. symbol": params["symbol"], "05. price": "10.0000"}}
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_BULK_QUOTES", True)
+    return AlphaVantageService()
+
+@pytest.mark.parametrize("bulk, reason, bulk_calls_later", [
+    (PREMIUM, "premium", 0),
+    ({"Information": "Please retry later"}, "error", 1),
+])
+def test_fallback_to_single_quotes_is_counted(service, monkeypatch, bulk, reason, bulk_calls_later):
+    upstream = Upstream(bulk)
+    monkeypatch.setattr(service, "_request", upstream.request)
+    before = fallbacks(reason)
+
+    first = asyncio.run(service.get_stock_quotes(["AAPL", "MSFT"], batch_size=2))
+    calls = len(upstream.functions)
+    asyncio.run(service.get_stock_quotes(["IBM"], batch_size=2))
+
+    assert sorted(first["quotes"]) == ["AAPL", "MSFT"] and not first["errors"]
+    assert fallbacks(reason) == before + 1 + bulk_calls_later
+    # A premium-only answer switches later batches straight to per-symbol quotes
+    assert upstream.functions[calls:].count("REALTIME_BULK_QUOTES") == bulk_calls_later
+
+def test_empty_quotes_are_neither_cached_nor_served(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_BULK_QUOTES", False)
+    monkeypatch.setattr(module, "response_cache", ResponseCache(LRUCache()))
+    monkeypatch.setattr(module, "alpha_vantage_quota", QuotaScheduler(per_minute=10 ** 6, per_day=10 ** 9))
+    calls = []
+
+    async def get_json(url, params=None):
+        calls.append(params["symbol"])
+        return {"Global Quote": {}}
+
+    monkeypatch.setattr(module.http_client, "get_json", get_json)
+    service = AlphaVantageService()
+
+    async def main():
+        # An empty quote cached before the guard existed is not served as a quote either
+        await module.response_cache.set(
+            make_cache_key("alphavantage", service._quote_params("OLD")), {"Global Quote": {}}, 60
+        )
+        first = await service.get_stock_quotes(["NOPE", "OLD"])
+        second = await service.get_stock_quotes(["NOPE"])
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert not first["quotes"] and sorted(first["errors"]) == ["NOPE", "OLD"]
+    assert not second["quotes"] and list(second["errors"]) == ["NOPE"]
+    assert calls == ["NOPE", "NOPE"]
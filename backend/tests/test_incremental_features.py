@@ -0,0 +1,86 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.feature_engine import PRICE_COLUMNS, compute_features
+from app.services.incremental_features import IncrementalFeatureState
+from app.services.prediction_service import FEATURE_COLUMNS, MARKET_TZ, PredictionService
+
+def random_history(periods: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, periods)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, periods).astype(float)
+    }, index=pd.bdate_range("2023-01-02", periods=periods, tz=MARKET_TZ, name="Date"))
+
+def test_every_row_matches_the_batch_features():
+    history = random_history(300)
+    expected = compute_features(history)
+    state = IncrementalFeatureState()
+    rows = {}
+    for timestamp, bar in zip(history.index, history[PRICE_COLUMNS].to_dict("records")):
+        row = state.update(bar, timestamp)
+        if row is not None:
+            rows[timestamp] = row
+
+    actual = pd.DataFrame.from_dict(rows, orient="index")[expected.columns]
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+@pytest.fixture
+def service(monkeypatch):
+    service = PredictionService()
+    bars = {"history": random_history(260)}
+    monkeypatch.setattr(service, "_download_history", lambda symbol, days: bars["history"].copy())
+    return service, bars
+
+def assert_latest_matches_prepare_features(service: PredictionService) -> pd.DataFrame:
+    async def main():
+        return await service.latest_features("AAA"), await service.prepare_features("AAA", 365)
+
+    latest, batch = asyncio.run(main())
+    assert list(latest.index) == [batch.index[-1]]
+    np.testing.assert_allclose(latest[FEATURE_COLUMNS].to_numpy()[0], batch[FEATURE_COLUMNS].iloc[-1], rtol=1e-9)
+    return latest
+
+def test_latest_features_follow_new_bars(service):
+    service, bars = service
+    full = random_history(270, seed=1)
+    # Same bars up to 260, then ten more, each revised once before it settles
+    bars["history"] = full.iloc[:260]
+    assert_latest_matches_prepare_features(service)
+    seeded = service.feature_states.get("AAA")
+
+    for end in range(261, 271):
+        revised = full.iloc[:end].copy()
+        revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.01
+        bars["history"] = revised
+        assert_latest_matches_prepare_features(service)
+        bars["history"] = full.iloc[:end]
+        assert_latest_matches_prepare_features(service)
+
+    # Advanced in place, never re-seeded, and always one bar behind the latest
+    assert service.feature_states.get("AAA") is seeded
+    assert seeded.last_timestamp == full.index[-2]
+
+def test_latest_features_reseed_after_readjustment(service):
+    service, bars = service
+    assert_latest_matches_prepare_features(service)
+    seeded = service.feature_states.get("AAA")
+
+    adjusted = bars["history"].copy()
+    adjusted[["Open", "High", "Low", "Close"]] /= 2  # e.g. a 2:1 split
+    bars["history"] = adjusted
+    latest = assert_latest_matches_prepare_features(service)
+
+    assert service.feature_states.get("AAA") is not seeded
+    assert latest['Close'].iloc[0] == adjusted['Close'].iloc[-1]
+
+def test_latest_features_empty_during_warmup(service):
+    service, bars = service
+    bars["history"] = random_history(40)
+    assert asyncio.run(service.latest_features("AAA")).empty
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from aiohttp import web
+from app.core.http_client import http_client
+from app.services.news_index import CompanyNames, NewsIndex, NewsIngestor, published_ts
+from app.services.news_service import NewsService
+
+HOUR = 3600
+
+def parse(value: str) -> float:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+class NewsAPIStandIn:
+    """``/v2/everything`` over an hourly feed, newest first, paged like NewsAPI.
+
+    With ``max_results`` set, pages past that many results fail the way the
+    developer plan does (HTTP 426, ``maximumResultsReached``).
+    """
+
+    def __init__(self, articles: int, max_results: int = None):
+        self.now = float(int(time.time()))
+        self.feed = [
+            {
+                "source": {"id": None, "name": "Stub Wire"},
+                "title": f"Acme story {i}",
+                "url": f"https://news.example/acme/{i}",
+                "publishedAt": datetime.fromtimestamp(self.now - i * HOUR, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            }
+            for i in range(articles)
+        ]
+        self.max_results = max_results
+        self.requests = []
+
+    async def everything(self, request: web.Request) -> web.Response:
+        query = request.query
+        page, page_size = int(query["page"]), int(query["pageSize"])
+        self.requests.append((query.get("from"), query.get("to"), page))
+        if self.max_results is not None and page * page_size > self.max_results:
+            return web.json_response({
+                "status": "error",
+                "code": "maximumResultsReached",
+                "message": f"Developer accounts are limited to a max of {self.max_results} results."
+            }, status=426)
+        since = parse(query["from"])
+        until = parse(query["to"]) if "to" in query else float("inf")
+        matching = [article for article in self.feed if since <= published_ts(article) <= until]
+        return web.json_response({
+            "status": "ok",
+            "totalResults": len(matching),
+            "articles": matching[(page - 1) * page_size:page * page_size]
+        })
+
+async def serve(stand_in: NewsAPIStandIn) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/v2/everything", stand_in.everything)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+def ingest_rounds(tmp_path, stand_in: NewsAPIStandIn, since_hours: int, rounds: int = 1, **options) -> tuple:
+    """Ingest ``ACME`` ``rounds`` times against the stand-in; returns the results and the ingestor."""
+    async def main():
+        runner = await serve(stand_in)
+        port = runner.addresses[0][1]
+        news = NewsService()
+        news.base_url = f"http://127.0.0.1:{port}/v2"
+        names = CompanyNames(str(tmp_path / "company_names.json"))
+        names.set("ACME", "Acme")
+        ingestor = NewsIngestor(news, None, NewsIndex(str(tmp_path)), names, refresh_interval=3600, **options)
+        try:
+            since = stand_in.now - since_hours * HOUR
+            return [await ingestor.ingest("ACME", since) for _ in range(rounds)], ingestor
+        finally:
+            await http_client.close()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+def test_complete_window_covers_since(tmp_path):
+    stand_in = NewsAPIStandIn(articles=100)
+    (result,), ingestor = ingest_rounds(tmp_path, stand_in, since_hours=48, page_size=20, max_pages=5)
+
+    entry = ingestor.index.load("ACME")
+    assert result == {"fetched": 49, "added": 49}
+    assert entry.covered_from == stand_in.now - 48 * HOUR
+    assert len(stand_in.requests) == 3
+
+def test_page_limit_marks_only_what_was_fetched(tmp_path):
+    stand_in = NewsAPIStandIn(articles=200)
+    (first, second), ingestor = ingest_rounds(
+        tmp_path, stand_in, since_hours=168, rounds=2, page_size=20, max_pages=3
+    )
+
+    entry = ingestor.index.load("ACME")
+    assert first == {"fetched": 60, "added": 60}
+    # The second pass backfills below the oldest fetched article instead of trusting ``since``;
+    # the window's end is inclusive, so that article comes back once more
+    assert second == {"fetched": 60, "added": 59}
+    assert parse(stand_in.requests[3][1]) == stand_in.now - 59 * HOUR
+    assert entry.covered_from == entry.ts[0] == stand_in.now - 118 * HOUR
+
+def test_truncated_refresh_after_restart_backfills_the_gap(tmp_path):
+    stand_in = NewsAPIStandIn(articles=200)
+    # The index already holds hours 150-199; after a restart coverage starts at its oldest article
+    NewsIndex(str(tmp_path)).add("ACME", stand_in.feed[150:])
+    (refresh, *backfills), ingestor = ingest_rounds(
+        tmp_path, stand_in, since_hours=168, rounds=3, page_size=20, max_pages=3
+    )
+
+    entry = ingestor.index.load("ACME")
+    assert refresh == {"fetched": 60, "added": 60}
+    assert [result["added"] for result in backfills] == [59, 31]
+    assert set(entry.ts) == {stand_in.now - hour * HOUR for hour in range(200)}
+    assert entry.covered_from == stand_in.now - 168 * HOUR
+
+def test_maximum_results_reached_keeps_earlier_pages(tmp_path):
+    stand_in = NewsAPIStandIn(articles=200, max_results=100)
+    (result,), ingestor = ingest_rounds(tmp_path, stand_in, since_hours=168, page_size=20, max_pages=10)
+
+    entry = ingestor.index.load("ACME")
+    assert result == {"fetched": 100, "added": 100}
+    assert len(entry.ts) == 100
+    assert entry.covered_from == entry.ts[0] == stand_in.now - 99 * HOUR
+
+def test_first_page_error_fails_the_ingest(tmp_path):
+    stand_in = NewsAPIStandIn(articles=200, max_results=0)
+    (result,), ingestor = ingest_rounds(tmp_path, stand_in, since_hours=168, page_size=20)
+
+    assert "error" in result
+    assert ingestor.index.load("ACME").covered_from is None
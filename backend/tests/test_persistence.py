@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.core.database import database
+from app.models.stock import Stock
+from app.services.persistence_service import PersistenceService
+
+def prediction_result(symbol: str, days: int, start: float) -> dict:
+    """A ``predict_future_prices`` result for ``days`` days from tomorrow."""
+    return {
+        "symbol": symbol,
+        "current_price": 100.0,
+        "predictions": [
+            {
+                "date": (datetime.now() + timedelta(days=day)).strftime("%Y-%m-%d"),
+                "predicted_price": start + day,
+                "confidence": 0.9
+            }
+            for day in range(1, days + 1)
+        ],
+        "forecast_mode": "direct",
+        "model_version": "rf-direct-v1",
+        "model_last_bar": "2024-05-31",
+        "model_stale": False,
+        "model_accuracy": 0.55
+    }
+
+def run_with_database(tmp_path, scenario):
+    async def main():
+        await database.connect(f"sqlite+aiosqlite:///{tmp_path / 'stocks.db'}")
+        try:
+            return await scenario(PersistenceService(flush_interval=60, batch_size=2))
+        finally:
+            await database.disconnect()
+
+    return asyncio.run(main())
+
+def test_quotes_round_trip(tmp_path):
+    async def scenario(persistence):
+        persistence.record_quote("aapl", {"Global Quote": {
+            "02. open": "189.0000", "03. high": "191.5000", "04. low": "188.2500", "05. price": "190.1000",
+            "06. volume": "51234567", "07. latest trading day": "2024-06-03", "08. previous close": "189.5000"
+        }})
+        persistence.record_quote("MSFT", {"Global Quote": {"05. price": "415.2000"}})
+        persistence.record_quote("BAD", {"Global Quote": {"05. price": "n/a"}})
+        written = await persistence.flush()
+        async with database.sessionmaker() as session:
+            return written, await persistence.get_fresh_quotes(session, ["AAPL", "msft", "BAD"])
+
+    written, quotes = run_with_database(tmp_path, scenario)
+
+    assert written == 2
+    assert set(quotes) == {"AAPL", "msft"}
+    aapl = quotes["AAPL"]["Global Quote"]
+    assert aapl["03. high"] == "191.5000" and aapl["04. low"] == "188.2500"
+    assert aapl["06. volume"] == "51234567"
+    assert aapl["09. change"] == "0.6000"
+    msft = quotes["msft"]["Global Quote"]
+    assert msft["05. price"] == "415.2000"
+    assert msft["02. open"] is msft["03. high"] is msft["04. low"] is msft["08. previous close"] is None
+    assert "09. change" not in msft
+
+def test_predictions_round_trip(tmp_path):
+    async def scenario(persistence):
+        persistence.record_predictions("AAPL", prediction_result("AAPL", 30, 200.0), "rf-direct-v1")
+        await persistence.flush()
+        # A later 7-day forecast overwrites the first week and keeps the 30-day summary
+        persistence.record_predictions("AAPL", prediction_result("AAPL", 7, 300.0), "rf-direct-v1")
+        await persistence.flush()
+        async with database.sessionmaker() as session:
+            return (
+                await persistence.get_fresh_predictions(session, "AAPL", 7, "rf-direct-v1"),
+                await persistence.get_fresh_predictions(session, "AAPL", 30, "rf-direct-v1"),
+                await persistence.get_fresh_predictions(session, "AAPL", 7, "rf-v1"),
+                await persistence.get_fresh_predictions(session, "AAPL", 7, "rf-direct-v1", max_age=-1),
+                (await session.execute(select(Stock.predicted_price_7d, Stock.predicted_price_30d))).one()
+            )
+
+    week, month, other_model, expired, summary = run_with_database(tmp_path, scenario)
+
+    assert [p["predicted_price"] for p in week["predictions"]] == [300.0 + day for day in range(1, 8)]
+    assert week["forecast_mode"] == "direct"
+    assert week["model_version"] == "rf-direct-v1"
+    assert week["model_last_bar"] == "2024-05-31"
+    assert week["current_price"] == 100.0
+    assert week["source"] == "database"
+    assert [p["predicted_price"] for p in month["predictions"]][6:8] == [307.0, 208.0]
+    assert other_model is None
+    assert expired is None
+    assert tuple(summary) == (307.0, 230.0)
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import stocks
+from app.services.prediction_service import PredictionService
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(stocks.router, prefix="/api/v1/stocks")
+    return TestClient(app)
+
+@pytest.mark.parametrize("days", [-1, 0, 31])
+def test_out_of_range_days_are_rejected(client, monkeypatch, days):
+    async def predict(*args):
+        raise AssertionError("prediction must not run")
+
+    monkeypatch.setattr(stocks.prediction_service, "predict_future_prices", predict)
+
+    single = client.get("/api/v1/stocks/predictions/AAPL", params={"days": days})
+    batch = client.post("/api/v1/stocks/predictions/batch", json={"symbols": ["AAPL"], "days": days})
+
+    assert single.status_code == 422
+    assert batch.status_code == 422
+
+def test_direct_forecast_needs_a_positive_horizon():
+    with pytest.raises(ValueError):
+        PredictionService()._forecast_direct(None, None, -1)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services import prediction_service as module
+from app.services.ohlcv_store import ohlcv_store
+from app.services.prediction_service import MARKET_TZ, STORE_INTERVAL, STORE_SOURCE, PredictionService
+
+def bars(start: str, periods: int, close: float = 100.0, tz=MARKET_TZ) -> pd.DataFrame:
+    index = pd.bdate_range(start, periods=periods, tz=tz, name="Date")
+    prices = close + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "Open": prices, "High": prices + 1, "Low": prices - 1, "Close": prices, "Volume": 1000.0
+    }, index=index)
+
+class FakeTicker:
+    """``yf.Ticker`` returning ``history`` (localized like the real one) for any window."""
+
+    def __init__(self, history: pd.DataFrame, calls: list):
+        self.frame = history
+        self.calls = calls
+
+    def history(self, period=None, start=None):
+        self.calls.append(("history", period, start))
+        if start is not None:
+            return self.frame[self.frame.index >= pd.Timestamp(start, tz=MARKET_TZ)]
+        return self.frame
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlcv_store, "root", str(tmp_path))
+    return ohlcv_store
+
+def stub_yfinance(monkeypatch, full: pd.DataFrame, downloads: dict) -> list:
+    """``Ticker.history`` serves ``full``; ``yf.download`` serves ``downloads`` with naive dates."""
+    calls = []
+    monkeypatch.setattr(module.yf, "Ticker", lambda symbol: FakeTicker(full, calls))
+
+    def download(symbols, start=None, period=None, **kwargs):
+        calls.append(("download", tuple(symbols), period, start))
+        frames = {}
+        for symbol in symbols:
+            frame = downloads[symbol].tz_localize(None)
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            frames[symbol] = frame
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(module.yf, "download", download)
+    return calls
+
+def test_batch_top_up_appends_to_single_symbol_history(store, monkeypatch):
+    service = PredictionService()
+    history = bars("2024-01-01", 300)
+    latest = bars("2024-01-01", 302)
+    calls = stub_yfinance(monkeypatch, history, {"AAA": latest, "BBB": latest})
+    days = (pd.Timestamp.now(tz="UTC") - history.index[0]).days
+
+    # Seed through the single-symbol path, then top up through the batch path
+    service._download_history("AAA", days)
+    service._download_history("BBB", days)
+    histories = service._download_histories(["AAA", "BBB"], days)
+
+    downloads = [call for call in calls if call[0] == "download"]
+    assert downloads == [("download", ("AAA", "BBB"), None, history.index[-2].date().isoformat())]
+    for symbol in ("AAA", "BBB"):
+        stored = store.read_frame(STORE_SOURCE, STORE_INTERVAL, symbol)
+        assert len(stored) == 302
+        assert stored.index.is_unique
+        assert (stored.index.tz_convert(MARKET_TZ) == latest.index).all()
+        assert histories[symbol]['Close'].iloc[-1] == latest['Close'].iloc[-1]
+
+def test_batch_top_up_keeps_longer_history(store, monkeypatch):
+    service = PredictionService()
+    history = bars("2020-01-01", 1500)
+    calls = stub_yfinance(monkeypatch, history, {"AAA": bars("2020-01-01", 1501)})
+    days = (pd.Timestamp.now(tz="UTC") - history.index[0]).days
+
+    service._download_history("AAA", days)
+    service._download_histories(["AAA"], 60)
+
+    assert len(store.read(STORE_SOURCE, STORE_INTERVAL, "AAA")) == 1501
+    assert [call[0] for call in calls] == ["history", "download"]
+
+def test_batch_top_up_redownloads_readjusted_history(store, monkeypatch):
+    service = PredictionService()
+    history = bars("2024-01-01", 300)
+    adjusted = bars("2024-01-01", 301, close=50.0)
+    calls = stub_yfinance(monkeypatch, history, {"AAA": adjusted})
+    days = (pd.Timestamp.now(tz="UTC") - history.index[0]).days
+    service._download_history("AAA", days)
+
+    monkeypatch.setattr(module.yf, "Ticker", lambda symbol: FakeTicker(adjusted, calls))
+    service._download_histories(["AAA"], days)
+
+    stored = store.read_frame(STORE_SOURCE, STORE_INTERVAL, "AAA")
+    assert len(stored) == 301
+    assert stored['Close'].iloc[0] == 50.0
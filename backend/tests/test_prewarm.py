@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import stocks
+from app.core.config import settings
+from app.core.rate_limiter import QuotaScheduler
+from app.services.prewarm import Prewarmer, SymbolPopularity
+
+def test_popularity_keeps_the_most_requested_symbols():
+    popularity = SymbolPopularity(max_symbols=100)
+    hot = [f"HOT{i}" for i in range(10)]
+    for _ in range(5):
+        for symbol in hot:
+            popularity.record(symbol)
+    for i in range(10000):
+        popularity.record(f"COLD{i}")
+
+    assert len(popularity) <= 100
+    assert sorted(popularity.top(10)) == sorted(hot)
+    assert popularity.evicted >= 10000 - 100
+
+class SlowServices:
+    """Alpha Vantage and prediction stand-ins whose calls wait for ``release``."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.active = 0
+        self.max_active = 0
+
+    async def _call(self, *args):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await self.release.wait()
+        self.active -= 1
+        return {}
+
+    get_stock_quote = get_historical_data = get_company_overview = predict_future_prices = _call
+
+def test_runs_never_overlap():
+    async def main():
+        services = SlowServices()
+        quota = QuotaScheduler(per_minute=10 ** 6, per_day=10 ** 9)
+        prewarmer = Prewarmer(services, services, quota, SymbolPopularity(), pinned=["AAPL"])
+        first = asyncio.create_task(prewarmer.run_once())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(prewarmer.run_once())
+        await asyncio.sleep(0.01)
+        busy = prewarmer.busy
+        services.release.set()
+        await asyncio.gather(first, second)
+        return services, prewarmer, busy
+
+    services, prewarmer, busy = asyncio.run(main())
+
+    assert busy
+    assert not prewarmer.busy
+    assert prewarmer.runs == 2
+    # One symbol's four calls run together, but never alongside the other run's
+    assert services.max_active == 4
+
+class FakePrewarmer:
+    def __init__(self, busy: bool):
+        self.busy = busy
+        self.runs = 0
+
+    async def run_once(self):
+        self.runs += 1
+        return {"calls": 0}
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(stocks.router, prefix="/api/v1/stocks")
+    return TestClient(app)
+
+@pytest.mark.parametrize("configured, sent, busy, status", [
+    ("", None, False, 403),
+    ("", "", False, 403),
+    ("secret", None, False, 403),
+    ("secret", "wrong", False, 403),
+    ("secret", "secret", True, 409),
+    ("secret", "secret", False, 200),
+])
+def test_manual_run_requires_the_token_and_an_idle_prewarmer(client, monkeypatch, configured, sent, busy, status):
+    prewarmer = FakePrewarmer(busy)
+    monkeypatch.setattr(settings, "PREWARM_ADMIN_TOKEN", configured)
+    monkeypatch.setattr(stocks, "prewarmer", prewarmer)
+    headers = {"X-Admin-Token": sent} if sent is not None else {}
+
+    response = client.post("/api/v1/stocks/prewarm/run", headers=headers)
+
+    assert response.status_code == status
+    assert prewarmer.runs == (1 if status == 200 else 0)
@@ -0,0 +1,73 @@
+import asyncio
+from collections import Counter
+from app.core.rate_limiter import QuotaScheduler
+from app.services.quote_stream import QuoteStreamHub
+
+SYMBOLS = [f"SYM{i}" for i in range(10)]
+
+class Upstream:
+    """Stub quote source: the n-th poll of a symbol returns price n; polls past ``limit`` never return."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.calls = Counter()
+
+    async def fetch_quote(self, symbol: str) -> dict:
+        if self.calls[symbol] >= self.limit:
+            await asyncio.get_running_loop().create_future()
+        self.calls[symbol] += 1
+        await asyncio.sleep(0)
+        return {"Global Quote": {"01. symbol": symbol, "05. price": f"{self.calls[symbol]:.4f}"}}
+
+def make_hub(upstream: Upstream) -> QuoteStreamHub:
+    quota = QuotaScheduler(per_minute=10 ** 9, per_day=10 ** 12)
+    return QuoteStreamHub(upstream.fetch_quote, quota, min_interval=0.0)
+
+async def wait_for_polls(hub: QuoteStreamHub, polls: int) -> None:
+    while hub.polls < polls:
+        await asyncio.sleep(0)
+
+def price(event: dict) -> str:
+    return event["quote"]["Global Quote"]["05. price"]
+
+def test_every_subscriber_gets_the_conflated_latest_quote():
+    async def main():
+        upstream = Upstream(limit=5)
+        hub = make_hub(upstream)
+        subscriptions = [hub.subscribe(SYMBOLS[i % 10:i % 10 + 3]) for i in range(5000)]
+        await wait_for_polls(hub, 5 * len(SYMBOLS))
+        # Nobody read while the five quotes per symbol arrived
+        batches = [await subscription.get(timeout=0) for subscription in subscriptions]
+        await hub.stop()
+        return upstream, hub, subscriptions, batches
+
+    upstream, hub, subscriptions, batches = asyncio.run(main())
+
+    assert upstream.calls == Counter({symbol: 5 for symbol in SYMBOLS})
+    assert hub.polls == 5 * len(SYMBOLS)
+    for subscription, events in zip(subscriptions, batches):
+        assert sorted(event["symbol"] for event in events) == sorted(subscription.symbols)
+        assert all(price(event) == "5.0000" for event in events)
+        assert subscription.conflated == 4 * len(subscription.symbols)
+
+def test_late_subscribers_share_the_running_poller():
+    async def main():
+        upstream = Upstream(limit=1)
+        hub = make_hub(upstream)
+        early = [hub.subscribe(["AAPL", "MSFT"]) for _ in range(2000)]
+        await wait_for_polls(hub, 2)
+        late = [hub.subscribe(["msft", " aapl "]) for _ in range(2000)]
+        batches = [await subscription.get(timeout=0) for subscription in early + late]
+        stats = hub.stats()
+        for subscription in early + late:
+            hub.unsubscribe(subscription)
+        pollers_left = len(hub._pollers)
+        await hub.stop()
+        return upstream, stats, batches, pollers_left
+
+    upstream, stats, batches, pollers_left = asyncio.run(main())
+
+    assert upstream.calls == Counter({"AAPL": 1, "MSFT": 1})
+    assert stats["symbols"] == 2 and stats["subscriptions"] == 4000
+    assert all(sorted(event["symbol"] for event in events) == ["AAPL", "MSFT"] for events in batches)
+    assert pollers_left == 0
@@ -0,0 +1,85 @@
+import asyncio
+from app.core.config import settings
+from app.core.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_BULK, PRIORITY_INTERACTIVE, QuotaScheduler
+from app.services import alpha_vantage_service
+from app.services.ohlcv_store import ohlcv_store
+
+def test_grants_in_priority_order():
+    async def main():
+        quota = QuotaScheduler(per_minute=1, per_day=100)
+        await quota.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await quota.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.ensure_future(waiter("background", PRIORITY_BACKGROUND)),
+            asyncio.ensure_future(waiter("interactive", PRIORITY_INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        for _ in tasks:
+            quota._tokens = 1.0
+            quota._dispatch()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "background"]
+
+def test_cancelled_after_grant_returns_the_token():
+    async def main():
+        quota = QuotaScheduler(per_minute=1, per_day=100)
+        await quota.acquire()
+        task = asyncio.ensure_future(quota.acquire())
+        await asyncio.sleep(0)
+        assert quota.stats()["queue_depth"] == 1
+
+        # Grant the token, then cancel the waiter before it gets to resume
+        quota._tokens = 1.0
+        quota._dispatch()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled(), quota.stats()
+
+    cancelled, stats = asyncio.run(main())
+    assert cancelled
+    assert stats["remaining_minute"] == 1
+    assert stats["remaining_day"] == 99
+
+def test_cancelled_while_queued_takes_no_token():
+    async def main():
+        quota = QuotaScheduler(per_minute=1, per_day=100)
+        await quota.acquire()
+        task = asyncio.ensure_future(quota.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return quota.stats()
+
+    stats = asyncio.run(main())
+    assert stats["queue_depth"] == 0
+    assert stats["remaining_day"] == 99
+
+def test_full_history_fetches_run_at_bulk_priority(tmp_path, monkeypatch):
+    quota = QuotaScheduler(per_minute=10 ** 6, per_day=10 ** 9)
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(ohlcv_store, "root", str(tmp_path))
+    monkeypatch.setattr(alpha_vantage_service, "alpha_vantage_quota", quota)
+
+    async def get_json(url, params=None):
+        return {"Error Message": "Invalid API call"}
+
+    monkeypatch.setattr(alpha_vantage_service.http_client, "get_json", get_json)
+    service = alpha_vantage_service.AlphaVantageService()
+
+    async def main():
+        await service.get_historical_data("AAPL", output_size="compact")
+        await service.get_historical_data("AAPL", output_size="full")
+        await service.get_daily_bars("MSFT")
+
+    asyncio.run(main())
+
+    assert quota.granted[PRIORITY_INTERACTIVE] == 1
+    assert quota.granted[PRIORITY_BULK] == 2
@@ -0,0 +1,47 @@
+import pytest
+from app.services.sentiment_engine import SentimentEngine
+
+@pytest.fixture
+def engine():
+    return SentimentEngine(cache_entries=100)
+
+def scores(engine: SentimentEngine, *texts: str) -> list:
+    return engine.score_texts(list(texts)).tolist()
+
+def test_terms_match_whole_words_only(engine):
+    assert scores(engine, "Company update on supply chain", "Shares up on strong results") == [
+        [0.0, 0.0], [2.0, 0.0]
+    ]
+
+def test_longest_phrase_wins(engine):
+    assert scores(engine, "Retailer issues profit warning", "Record profit for the quarter", "Profit doubles") == [
+        [0.0, 2.0], [3.0, 0.0], [2.0, 0.0]
+    ]
+
+def test_negated_terms_count_against_their_direction(engine):
+    assert scores(
+        engine,
+        "Sales did not rise",
+        "No layoffs planned",
+        "Merger failed to boost shares",
+        "Drug fails to win approval"
+    ) == [[0.0, 0.75], [1.5, 0.0], [0.0, 0.75], [2.0, 0.75]]
+
+def test_texts_in_a_batch_stay_separate(engine):
+    # Neither the phrase "record profit" nor the negation "not rise" spans two texts
+    assert scores(engine, "Q3 record", "profit fell", "Outlook is not", "rise in sales") == [
+        [0.0, 0.0], [2.0, 1.0], [0.0, 0.0], [1.0, 0.0]
+    ]
+
+def test_articles_are_scored_once(engine):
+    seen = [{"title": "Stock soars", "description": "after upgrade"}, {"title": "Shares fall", "description": None}]
+
+    first = engine.score(seen).tolist()
+    again = engine.score(seen).tolist()
+    assert engine.scored == 2
+    mixed = engine.score([seen[1], {"title": "Lawsuit filed"}]).tolist()
+
+    assert first == again == [[5.0, 0.0], [0.0, 1.0]]
+    assert mixed == [[0.0, 1.0], [0.0, 2.0]]
+    assert engine.scored == 3
+    assert engine.stats()["texts_scored"] == 3
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.services.alpha_vantage_service import AlphaVantageService
+
+CALLERS = 50
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"price": 1.0}
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(CALLERS)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result == {"price": 1.0} for result in results)
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": CALLERS - 1}
+
+def test_finished_key_starts_a_new_call():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        flight = SingleFlight()
+        return await flight.do("AAPL", fetch), await flight.do("AAPL", fetch)
+
+    assert asyncio.run(main()) == (1, 2)
+
+def test_error_reaches_every_caller():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(CALLERS)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("AAPL", fetch))
+        second = asyncio.ensure_future(flight.do("AAPL", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == ("done", True)
+
+def test_alpha_vantage_requests_coalesce(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    service = AlphaVantageService()
+    calls = []
+
+    async def fetch(key, params):
+        calls.append(params["symbol"])
+        await asyncio.sleep(0.01)
+        return {"Global Quote": {"01. symbol": params["symbol"]}}
+
+    monkeypatch.setattr(service, "_fetch", fetch)
+
+    async def main():
+        return await asyncio.gather(
+            *(service.get_stock_quote("AAPL") for _ in range(CALLERS)),
+            *(service.get_stock_quote("MSFT") for _ in range(CALLERS))
+        )
+
+    results = asyncio.run(main())
+    assert sorted(calls) == ["AAPL", "MSFT"]
+    assert [result["Global Quote"]["01. symbol"] for result in results] == ["AAPL"] * CALLERS + ["MSFT"] * CALLERS
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_alpha_vantage_results_are_not_shared_between_params(monkeypatch, cache_enabled):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", cache_enabled)
+    service = AlphaVantageService()
+    calls = []
+
+    async def fetch(key, params):
+        calls.append(params["symbol"])
+        return {"symbol": params["symbol"]}
+
+    monkeypatch.setattr(service, "_fetch", fetch)
+    symbols = [f"SYM{i}" for i in range(5)]
+
+    async def main():
+        return await asyncio.gather(*(service._request({"function": "OVERVIEW", "symbol": s}) for s in symbols))
+
+    assert [result["symbol"] for result in asyncio.run(main())] == symbols
+    assert sorted(calls) == symbols
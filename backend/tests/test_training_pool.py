@@ -0,0 +1,16 @@
+import numpy as np
+from app.services.training_pool import fit_random_forest
+
+def test_model_is_refitted_on_every_row_after_scoring():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    X[:, 0] = 100 + np.cumsum(rng.normal(loc=0.5, size=200))  # trending up
+    y = X[:, 0] + rng.normal(scale=0.1, size=200)
+
+    model, scaler, metrics = fit_random_forest(X, y, close_column=0)
+
+    assert scaler.n_samples_seen_ == len(X)
+    assert np.isclose(scaler.mean_[0], X[:, 0].mean())
+    # Only the latest bars reach the top of the range; a holdout-only model never saw it
+    assert model.predict(scaler.transform(X[[y.argmax()]]))[0] > np.sort(y)[-5]
+    assert {"train_score", "test_score", "mae", "mape", "directional_accuracy"} <= set(metrics)